@@ -1,33 +1,63 @@
 import streamlit as st
-import pandas as pd
 import os
-import plotly.express as px
-from PIL import Image
-import base64
+import functools
 from datetime import datetime
-import gspread
-from gspread_dataframe import set_with_dataframe
-import pytz
-
-# --- FUNÇÃO PARA CODIFICAR IMAGEM (PARA O PLANO DE FUNDO) ---
-@st.cache_data
-def get_base64_of_bin_file(bin_file):
+from ativos import ler_manifesto, preparar_ativos, url_do_ativo
+from instrumentacao import Medidor
+
+# --- CONTADORES DE RECARGA DOS DADOS EM CACHE ---
+@st.cache_resource
+def estado_do_cache():
+    """Contadores de recargas a frio e histórico de salvamentos, compartilhados entre as sessões."""
+    return {"recargas": {}, "chamadas": {}, "salvamentos": []}
+
+@st.cache_resource
+def medidor_do_processo():
+    """Tempos das execuções recentes da página e chamadas à API do Sheets, compartilhados entre as sessões."""
+    return Medidor()
+
+def contar_chamadas(funcao):
+    """Conta as chamadas de uma função em cache; as que não terminam em registrar_recarga foram acertos."""
+    @functools.wraps(funcao)
+    def funcao_contada(*args, **kwargs):
+        chamadas = estado_do_cache()["chamadas"]
+        chamadas[funcao.__name__] = chamadas.get(funcao.__name__, 0) + 1
+        return funcao(*args, **kwargs)
+    return funcao_contada
+
+def registrar_recarga(funcao, estado=None):
+    """Conta uma recarga a frio (cache miss) da função, no total e no último salvamento.
+
+    Fora da execução da página (na thread do atualizador), `estado` deve ser informado.
+    """
+    estado = estado or estado_do_cache()
+    estado["recargas"][funcao] = estado["recargas"].get(funcao, 0) + 1
+    if estado["salvamentos"]:
+        recargas_salvamento = estado["salvamentos"][-1]["recargas"]
+        recargas_salvamento[funcao] = recargas_salvamento.get(funcao, 0) + 1
+
+# --- IMAGENS DA PÁGINA (ARQUIVOS ESTÁTICOS EM static/, VER ativos.py) ---
+@st.cache_resource
+def ativos_da_pagina():
+    """Manifesto das imagens otimizadas; na primeira execução do processo gera as que faltam."""
     try:
-        with open(bin_file, 'rb') as f:
-            data = f.read()
-        return base64.b64encode(data).decode()
-    except FileNotFoundError:
-        return None
-
-def set_png_as_page_bg(png_file):
-    bin_str = get_base64_of_bin_file(png_file)
-    if bin_str is None:
+        return preparar_ativos()
+    except OSError:
+        return ler_manifesto()  # pasta sem permissão de escrita: usa as versões já geradas
+
+def set_page_bg(nome_ativo):
+    """Plano de fundo pela URL do arquivo estático (WebP, com JPEG como alternativa), sem embutir a imagem no CSS."""
+    manifesto = ativos_da_pagina()
+    webp, jpeg = url_do_ativo(manifesto, nome_ativo), url_do_ativo(manifesto, nome_ativo, "jpeg")
+    if webp is None:
         return
-        
+    alternativas = [f'url("{webp}") type("image/webp")'] + ([f'url("{jpeg}") type("image/jpeg")'] if jpeg else [])
+
     page_bg_img = f'''
     <style>
     .stApp {{
-        background-image: url("data:image/png;base64,{bin_str}");
+        background-image: url("{jpeg or webp}");
+        background-image: image-set({", ".join(alternativas)});
         background-size: cover;
         background-repeat: no-repeat;
         background-attachment: scroll;
@@ -51,11 +81,10 @@ def check_password():
         # 2. Usar um container para um visual de "card"
         with st.container(border=True):
 
-            # Adiciona a imagem do logo (ajuste o caminho se necessário)
-            try:
-                st.image("assets/logo_sidebar.png", width=150)
-            except Exception as e:
-                st.write("") # Não mostra nada se a imagem não for encontrada
+            # Adiciona a imagem do logo (não mostra nada se ela não foi gerada)
+            logo = url_do_ativo(ativos_da_pagina(), "logo")
+            if logo:
+                st.image(logo, width=150)
 
             st.subheader("Acesso ao Sistema de Avaliação")
 
@@ -82,175 +111,307 @@ def check_password():
     # Se o código chegar até aqui, significa que o usuário não está logado.
     return False
 
-# --- CONFIGURAÇÕES DA PÁGINA ---
-try:
-    page_icon = Image.open("assets/logo_sidebar.png")
-except FileNotFoundError:
-    page_icon = "📊"
+# --- ARMAZENAMENTO DOS VOTOS E FILA DE GRAVAÇÃO ---
+# Fora da proteção por senha para que a fila possa ser retomada já na tela de
+# senha (ver retomar_gravacoes_pendentes); os módulos da aplicação são
+# importados dentro das funções, então a tela de senha só os carrega se houver
+# avaliações pendentes.
+@st.cache_resource
+def connect_to_gsheet():
+    """Conecta ao Google Sheets usando as credenciais do Streamlit Secrets."""
+    from cliente_sheets import conectar
+
+    registrar_recarga("connect_to_gsheet")
+    try:
+        creds = st.secrets["gcp_service_account"]
+        # Uma sessão autorizada por processo, com cota por minuto e novas tentativas (ver cliente_sheets.py)
+        sa = conectar(creds)
+        medidor_do_processo().instrumentar_sessao(sa.http_client.session)
+        sh = sa.open(creds["sheet_name"])
+        return sh
+    except Exception as e:
+        st.error(f"Erro ao conectar com o Google Sheets: {e}")
+        st.error("Verifique se o arquivo secrets.toml está configurado corretamente.")
+        return None
+
+@st.cache_resource
+def abrir_cache_votos():
+    """Abre a cópia local (SQLite) da aba de votos, compartilhada entre as sessões."""
+    from cache_votos import CacheVotos
+
+    return CacheVotos()
+
+@st.cache_resource
+def abrir_backend():
+    """Armazenamento dos votos definido em `backend_votos` nos secrets: "google_sheets" (padrão) ou "sqlite" (local, sem rede).
+
+    No SQLite, os projetos vêm da lista `projetos` dos secrets ou do arquivo
+    `caminho_projetos` (padrão: projetos.txt, um por linha); sem nenhum dos
+    dois, valem os projetos LCP que já têm votos.
+    """
+    from backends import CAMINHO_PROJETOS_LOCAL, BackendGoogleSheets, BackendSQLite, ler_arquivo_de_projetos
+    from cache_votos import CAMINHO_BANCO_LOCAL, CacheVotos
+
+    if st.secrets.get("backend_votos", "google_sheets") == "sqlite":
+        projetos = list(st.secrets.get("projetos", []))
+        if not projetos:
+            caminho_projetos = st.secrets.get("caminho_projetos", CAMINHO_PROJETOS_LOCAL)
+            projetos = ler_arquivo_de_projetos(caminho_projetos)
+            if projetos is None and "caminho_projetos" in st.secrets:
+                st.error(f"Arquivo de projetos não encontrado: {caminho_projetos}")
+        return BackendSQLite(CacheVotos(st.secrets.get("caminho_sqlite", CAMINHO_BANCO_LOCAL)), projetos)
+    spreadsheet = connect_to_gsheet()
+    if spreadsheet is None:
+        return None
+    return BackendGoogleSheets(spreadsheet, abrir_cache_votos())
+
+@st.cache_resource
+def atualizador_de_dados(_backend):
+    """Thread única do processo que recarrega votos e projetos em segundo plano."""
+    from atualizador import AtualizadorDados
+
+    estado = estado_do_cache()
+    return AtualizadorDados(_backend, ao_recarregar=lambda nome: registrar_recarga(nome, estado))
+
+@st.cache_resource
+def fila_de_gravacao(_backend):
+    """Fila local das avaliações enviadas; a thread dela grava no backend e atualiza o retrato a cada lote."""
+    from fila_gravacao import FilaGravacao
+
+    atualizador = atualizador_de_dados(_backend)
+    estado = estado_do_cache()
+    return FilaGravacao(_backend, ao_gravar=lambda: registrar_salvamento(atualizador, estado))
+
+def registrar_salvamento(atualizador, estado=None):
+    """Abre um registro no histórico de salvamentos e recarrega os votos na hora, para a próxima execução já vê-los."""
+    estado = estado or estado_do_cache()
+    estado["salvamentos"].append({"versao": None, "momento": datetime.now(), "recargas": {}})
+    del estado["salvamentos"][:-20]
+    salvamento = estado["salvamentos"][-1]
+    salvamento["versao"] = atualizador.atualizar_votos().versao
+
+@st.cache_resource
+def retomar_gravacoes_pendentes():
+    """Uma vez por processo: se a fila em disco tem avaliações de antes de uma queda ou reinício, abre o backend e a fila para enviá-las."""
+    from fila_gravacao import contar_pendentes
+
+    if contar_pendentes() == 0:
+        return False
+    backend = abrir_backend()
+    if backend is None:
+        return False
+    fila_de_gravacao(backend)
+    return True
 
+# --- CONFIGURAÇÕES DA PÁGINA ---
 st.set_page_config(
     page_title="AVALIAÇÃO DE FORNECEDORES",
-    page_icon=page_icon,
+    # URL do arquivo estático: o Streamlit repassa o endereço, sem abrir a imagem a cada execução
+    page_icon=url_do_ativo(ativos_da_pagina(), "icone", "png") or "📊",
     layout="wide"
 )
 
+# --- MEDIÇÃO DA EXECUÇÃO (ver instrumentacao.py) ---
+execucao = medidor_do_processo().nova_execucao()
+execucao.fase("verificação de senha")
+
 # --- INÍCIO DA PROTEÇÃO POR SENHA ---
 if check_password():
 
+    # --- IMPORTAÇÕES DA APLICAÇÃO ---
+    # Só depois do login: a tela de senha não paga o pandas, o gspread e o resto
+    # (ver benchmarks/bench_inicializacao.py). Nas execuções seguintes já estão em sys.modules.
+    import pandas as pd
+    import gspread
+    from armazenamento import COLUNAS_VOTOS, votos_para_exibicao
+    from atualizador import RETRATO_VAZIO
+    from backends import BackendGoogleSheets
+    from exportacao import TIPOS_MIME, exportar, lotes_do_dataframe
+    from formulario import CRITERIOS_POR_CATEGORIA, LAYOUT_FORMULARIO
+    from importacao import COLUNAS_OBRIGATORIAS, COLUNAS_REJEITADAS, lotes_de_avaliacoes, separar_ja_gravadas, validar_arquivo
+    from constantes import ANOS_AVALIACAO, EMPRESAS, OPCOES_VOTO, PERGUNTAS
+    from relatorios import filtrar_resumo, paginar, total_de_paginas
+
     # --- DADOS E CONSTANTES ---
     ADMIN_KEYS = [('gabriel', 'paulino'), ('rodrigo', 'saito')]
-    EMPRESAS = sorted([
-        "ABSAFE ENGENHARIA E SEGURANCA", "ASSESSORIA TECNICA ATENE LTDA", "ATUS ENGENHARIA LDA", "BECOMEX CONSULTORIA LTDA",
-        "BONA - TERCEIRIZACAO DE MAO-DE-OBRA PARA LOGISTICA LTDA", "CASTELL COMERCIAL DE EQUIPAMENTOS", "CAVE ENGENHARIA E OBRAS LTDA",
-        "CHARLES ELBLINK ME", "CLIMAVENT COMERCIO", "CONDUTIVA ENGENHARIA ELETRICA LTDA", "COPE E CIA LTDA",
-        "ENGECOMP MANUTENCAO INDUSTRIAL LTDA", "ESTRUTEZZA INDUSTRIA E COMERCIO LTDA", "FRM ENGENHARIA LTDA",
-        "GIISAPTEC SOLUCOES INDUSTRIAIS LTDA", "JOSE FERNANDO ALVES JUNIOR EPP", "LOCALLTAINER LOCACOES DE CONTAINERS LTDA.",
-        "M GARCIA SERRALHERia E CALDEIRARIA LTDA", "MAMUTH TRANSPORTE DE MAQUINAS LTDA", "MANTEST ENGENHARIA ELETRICA LTDA",
-        "MARCATO GESTAO EMPRESarial E TERCEIRIZACAO DE SERVICOS EIRELLI", "MENSURA ENGENHARIA LTDA", "MP ENGENHARIA ELETRICA LTDA.",
-        "NOVAC CONSTRUCOES EMPREENDIMENTOS LTDA", "ODOURNET BRASIL LTDA.", "PEOPLE TEAM LTDA",
-        "PROENG MONTAGENS E MANUTENCAO INDUSTRIAL LTDA", "RICAMIL ENGENHARIA E SERVICOS LTDA", "RIDARP CONSTRUCOES LTDA",
-        "ROCKWELL AUTOMATION DO BRASIL LTDA", "RYCE ENGENHARIA & CONSTRUCAO LTDA.",
-        "SGS INDUSTRIAL - INSTALACOES, TESTES E COMISSIONAMENTOS LTDA", "SICK SOLUCAO EM SENSORES LTDA",
-        "SIEMENS INFRAESTRUTURA E INDUSTRIA LTDA", "SOS SERVICE COMERCIO E ENGENHARIA LTDA", "SPI INTEGRACAO DE SISTEMAS LTDA",
-        "TEC AND TEC LATAM AMERICA LTDA", "TITAN INDUSTRIA E COMERCIO DE FERRAMENTAS E PERIFERICOS LTDA",
-        "TOPICO LOCACOES DE GALPOES E EQUIPAMENTOS PARA INDUSTRIAS S.A", "VENDART SOLUCOES INDUSTRIAIS LTDA",
-        "VENDOR TRADUCOES TECNICAS E COMERCIO LTDA", "VIVA EQUIPAMENTOS INDUSTRIAIS E COMERCIO LTDA",
-        "WORK'S ENGENHARIA E MONTAGENS INDUSTRIAIS LTDA"
-    ])
-    PERGUNTAS = {
-        "SAFETY": { "1.1": "Accidents / near miss", "1.2": "Work Permit (LTR, PPT) performance", "1.3": "EHS documentation (like training certifications and clinic exams (ASO).", "1.4": "Leadership - Safety technician is on work execution", "1.5": "Safety audit" },
-        "QUALITY": { "2.1": "Delivering jobs on time", "2.2": "Executions comply with designs", "2.3": "Housekeeping during work execution and after", "2.4": "Work tools condition (personal and equipments)", "2.5": "Delivery jobs on cost" },
-        "PEOPLE": { "3.1": "Crew sizing according to approved contracts", "3.2": "Workteam knowledge meet the minimum technical requirements", "3.3": "Leadership - Supervisors is on work execution" },
-        "DOCUMENTATION": { "4.1": "Supplier is following accordinly with SAM system requirements (evidences like schedules, measurements, pictures, reports, ART)", "4.2": "Suppliers delivery all the documentation (Company and employees) on time, according to the plan.", "4.3": "Suppliers deliver all the project documentation required (Ex: As Built, Drawings, Data sheets, Manuals, etc)." }
-    }
-    OPCOES_VOTO = ['1', '2', '3', '4', '5', 'N/A']
-    ANOS_AVALIACAO = list(range(2020, 2031))
-    RUBRICA = {
-        "SAFETY" : {
-            "1.1": ["1 OSHA Accident", "1 Serious Accident and 0 OSHA Accident", "0 Accident and 2 or more near miss", "0 Accident and 1 near miss", "0 near miss / accidents"],
-            "1.2": ["rarely shows commitment with LTR and PPTs, needs constants improvements and guidances", "sometimes shows commitment with LTR and PPTs, but still needs improvements and guidances.", "shows commitment with LTR and PPTs, requiring punctual orientations.", "Often shows commitment with LTR and PPTs, sharing best practices and process improvements to contributes with safety.", "shows fully commitment with LTR and PPTs, being a partner to the safety and a benchmarking for other companies."],
-            "1.3": ["rarely delivery to the EHS on time, needs constants improvements and guidances", "sometimes delivery to the EHS on time, but still needs improvements and guidances.", "delivery to the EHS on time, requiring punctual orientations.", "Often delivery to the EHS on time, sharing best practices and process improvements to contributes with safety.", "shows fully commitment to delivery on time, being a partner to the safety and a benchmarking for other companies."],
-            "1.4": ["rarely leadership is present on the job", "sometimes leadership is present on the job, but still needs improvements and guidances.", "leadership is present on the job, requiring punctual orientations.", "Often leadership is present on the job, providing technical support and safety conditions to their associates.", "shows fully commitment to provide leadership full time by service, being a benchmarking for other companies."],
-            "1.5": ["rarely shows commitment with objectives and procedures, needs constants improvements and guidances", "sometimes shows commitment with objectives and procedures, but still needs improvements and guidances.", "shows commitment with objectives and procedures, requiring punctual orientations.", "Often shows commitment with objectives and procedures, sharing best practices and process improvements to contributes with business success.", "shows fully commitment with objectives and procedures, being a partner to the business and a benchmarking for other companies."]
-        },
-        "QUALITY": {
-            "2.1": ["rarely shows commitment to delivery on time, needs constants improvements and guidances", "sometimes shows commitment to delivery on time, but still needs improvements and guidances.", "shows commitment to delivery on time, requiring punctual orientations.", "Often shows commitment to delivery on time, applying proactive actions to mitigate delays.", "shows fully commitment to delivery on time, being a partner to the business and a benchmarking for other companies."],
-            "2.2": ["rarely shows commitment to execute services according to design, needs constants improvements and guidances", "sometimes shows commitment to execute services according to design, but still needs improvements and guidances.", "shows commitment to execute services according to design, requiring punctual orientations.", "Often shows commitment to execute services according to design, avoiding reworks.", "shows fully commitment to execute services according to design, avoiding reworks and being a benchmarking for other companies."],
-            "2.3": ["rarely shows commitment with housekeeping, needs constants improvements and guidances", "sometimes shows commitment with housekeeping, but still needs improvements and guidances.", "shows commitment with housekeeping, requiring punctual orientations.", "Often shows commitment with housekeeping, sharing best practices to contributes with safety.", "shows fully commitment with housekeeping, being a partner to the safety and a benchmarking for other companies."],
-            "2.4": ["rarely shows commitment to provide tools and personal protection according to standards, needs constants improvements and guidances", "sometimes shows commitment to provide tools and personal protection according to standards, but still needs improvements and guidances.", "shows commitment to provide tools and personal protection according to standards, requiring punctual orientations.", "Often shows commitment to provide tools and personal protection according to standards, providing safety conditions to their associates.", "shows fully commitment to provide tools and personal protection according to standards, providing safety conditions to their associates and being a benchmarking for other companies."],
-            "2.5": ["Overcost > 21%", "15% < Overcost < 20%", "10% < Overcost < 0%", "0%", "Deliver the project with saving"]
-        },
-        "PEOPLE": {
-            "3.1": ["rarely shows commitment to provide resources according to service complexity, needs constants improvements and guidances", "sometimes shows commitment to provide resources according to service complexity, but still needs improvements and guidances.", "shows commitment to provide resources according to service complexity, requiring punctual orientations.", "Often shows commitment to provide resources according to service complexity, with flexibility to mobilize resources quickly in order to avoid any impacts for the business.", "shows fully commitment with objectives and procedures, providing resources according to service complexity, with flexibility to mobilize resources quickly in order to avoid any impacts for the business, being a partner to the business and a benchmarking for other companies."],
-            "3.2": ["Full team (leadership and operational) shows low level of qualification, needs replacement.", "operational team are fully dependent of leadership to execute the service, needs improvements.", "shows commitment to provide resources according to service complexity, requiring punctual orientations.", "Often shows commitment to provide resources according to service complexity and requested qualification, presenting plans of development in order to avoid any impacts for the business.", "shows fully commitment with objectives and procedures, providing resources according to service complexity and high qualification of resources required."],
-            "3.3": ["rarely leadership is present on the job", "sometimes leadership is present on the job, but still needs improvements and guidances.", "leadership is present on the job, requiring punctual orientations.", "Often leadership is present on the job, providing technical support and safety conditions to their associates.", "shows fully commitment to provide leadership full time by service, being a benchmarking for other companies."]
-        },
-        "DOCUMENTATION": {
-            "4.1": ["rarely shows commitment to provide adequate evidences, needs constants improvements and guidances", "sometimes shows commitment to provide adequate evidences, but still needs improvements and guidances.", "shows commitment to provide to provide adequate evidences, requiring punctual orientations.", "Often shows commitment to provide adequate evidences, sharing best practices and process improvements to contributes with business success.", "shows fully commitment to provide adequate evidences, being a partner to the business and a benchmarking for other companies."],
-            "4.2": ["More than 30 days of delay comparing to the plan, to deliver all the documentation", "More than 15 days of delay comparing to the plan, to deliver all the documentation", "Maximum of 5 days of delay comparing to the plan, to deliver all the documentation", "Deliver all the documentation on time, comparing to the plan.", "Deliver all the documentation anticipated"],
-            "4.3": ["do not deliver the project documentation according to the contract / scope of work.", "missing no critical project documentation", "deliver all the project documentation according to the contract / scope of work", "deliver more project documentation than requested", "exceed the deliver expectatives"]
-        }
-    }
-
-    # --- FUNÇÕES DE DADOS (PARA GOOGLE SHEETS) ---
-    @st.cache_resource
-    def connect_to_gsheet():
-        """Conecta ao Google Sheets usando as credenciais do Streamlit Secrets."""
+
+    def ler_retrato(backend):
+        """Retrato mais recente dos votos e projetos. Só espera pela rede na primeira carga do processo (com limite de tempo)."""
+        if backend is None:
+            return RETRATO_VAZIO
+        atualizador = atualizador_de_dados(backend)
+        retrato = atualizador.aguardar_primeiro_retrato()
+        if not atualizador.carregado:
+            st.info("⏳ Carregando os dados da planilha... Atualize a página em alguns instantes para ver as avaliações.")
+        if "votos" in retrato.erros:
+            st.error(f"Erro ao carregar os dados da planilha: {retrato.erros['votos']}")
+        return retrato
+
+    def lista_de_projetos(retrato):
+        """Lista de projetos LCP do retrato (vazia se não há nenhum), com as mesmas mensagens de erro de quando era carregada na página."""
+        erro = retrato.erros.get("projetos")
+        if isinstance(erro, gspread.exceptions.WorksheetNotFound):
+            st.error("ERRO: Abas 'Capex' ou 'AME - Quarterly' não encontradas na Planilha Google.")
+        elif erro is not None:
+            st.error(f"Ocorreu um erro ao processar os projetos da planilha: {erro}")
+        return retrato.projetos
+
+    def excluir_avaliacao(backend, id_avaliacao):
+        """Registra a exclusão (lápide) da avaliação; o armazenamento só é regravado quando as lápides passam do limiar."""
         try:
-            creds = st.secrets["gcp_service_account"]
-            sa = gspread.service_account_from_dict(creds)
-            sh = sa.open(creds["sheet_name"])
-            return sh
+            backend.excluir_avaliacoes([id_avaliacao])
         except Exception as e:
-            st.error(f"Erro ao conectar com o Google Sheets: {e}")
-            st.error("Verifique se o arquivo secrets.toml está configurado corretamente.")
-            return None
+            st.error(f"Erro ao salvar os dados na planilha: {e}")
+            return False
+        registrar_salvamento(atualizador_de_dados(backend))
+        return True
 
-    @st.cache_data(ttl=60)
-    def carregar_votos(_spreadsheet):
-        """Carrega os votos da primeira aba da planilha do Google."""
+    def compactar_armazenamento(backend):
         try:
-            if _spreadsheet is None:
-                return pd.DataFrame() 
-
-            worksheet = _spreadsheet.get_worksheet(0)
-            df = pd.DataFrame(worksheet.get_all_records())
-            
-            colunas_necessarias = ["user_name", "id_avaliacao", "ano_avaliacao", "projeto", "empresa", "categoria", "pergunta_id", "pergunta_texto", "voto", "comentario"]
-            if df.empty:
-                return pd.DataFrame(columns=colunas_necessarias)
-            
-            for col in colunas_necessarias:
-                if col not in df.columns:
-                    df[col] = pd.NA
-                    
-            df['id_avaliacao'] = pd.to_datetime(df['id_avaliacao'], errors='coerce')
-            
-            if 'ano_avaliacao' in df.columns:
-                df['ano_avaliacao'] = pd.to_numeric(df['ano_avaliacao'], errors='coerce')
-                df.dropna(subset=['ano_avaliacao'], inplace=True)
-                df['ano_avaliacao'] = df['ano_avaliacao'].astype(int).astype(str)
-            
-            return df
+            backend.compactar()
         except Exception as e:
-            st.error(f"Erro ao carregar os dados da planilha: {e}")
-            return pd.DataFrame()
+            st.error(f"Erro ao salvar os dados na planilha: {e}")
+            return False
+        registrar_salvamento(atualizador_de_dados(backend))
+        return True
 
-    def salvar_votos(spreadsheet, df_to_save):
-        """Salva o DataFrame completo na primeira aba da planilha."""
+    def apagar_todos_os_votos(backend):
         try:
-            worksheet = spreadsheet.get_worksheet(0)
-            worksheet.clear()
-            df_to_save['id_avaliacao'] = df_to_save['id_avaliacao'].astype(str)
-            set_with_dataframe(worksheet, df_to_save, include_index=False, allow_formulas=False)
-            st.cache_data.clear()
-            st.cache_resource.clear()
+            backend.apagar_tudo()
         except Exception as e:
             st.error(f"Erro ao salvar os dados na planilha: {e}")
+            return False
+        registrar_salvamento(atualizador_de_dados(backend))
+        return True
 
-    @st.cache_data(ttl=600)
-    def carregar_projetos(_spreadsheet):
-        """Carrega a lista de projetos das abas 'Capex' e 'AME - Quarterly' da Planilha Google."""
+    def validar_importacao(backend, arquivo):
+        """Lê e valida o arquivo enviado; as avaliações já gravadas no armazenamento são recusadas."""
         try:
-            # Carrega a aba Capex, informando que o cabeçalho está na linha 4
-            worksheet_capex = _spreadsheet.worksheet("Capex")
-            data_capex = worksheet_capex.get_all_values()
-            headers_capex = data_capex[3]
-            df_capex = pd.DataFrame(data_capex[4:], columns=headers_capex)
-            
-            # Carrega a aba AME - Quarterly, informando que o cabeçalho está na linha 4
-            worksheet_ame = _spreadsheet.worksheet("AME - Quarterly")
-            data_ame = worksheet_ame.get_all_values()
-            headers_ame = data_ame[3]
-            df_ame = pd.DataFrame(data_ame[4:], columns=headers_ame)
-
-            projetos_capex = []
-            if 'WBS' in df_capex.columns and 'PROJECT NAME' in df_capex.columns:
-                df_capex.dropna(subset=['WBS', 'PROJECT NAME'], inplace=True)
-                df_capex = df_capex[df_capex['WBS'].astype(str).str.strip() != '']
-                projetos_capex = (df_capex['WBS'].astype(str) + " - " + df_capex['PROJECT NAME'].astype(str)).tolist()
-            
-            projetos_ame = []
-            if 'WBS' in df_ame.columns and 'PROJECT NAME' in df_ame.columns:
-                df_ame.dropna(subset=['WBS', 'PROJECT NAME'], inplace=True)
-                df_ame = df_ame[df_ame['WBS'].astype(str).str.strip() != '']
-                projetos_ame = (df_ame['WBS'].astype(str) + " - " + df_ame['PROJECT NAME'].astype(str)).tolist()
-
-            todos_projetos = projetos_capex + projetos_ame
-            projetos_lcp = [proj for proj in todos_projetos if proj.strip().startswith("LCP")]
-            projetos_finais = sorted(list(set(projetos_lcp)))
-            
-            if not projetos_finais:
-                return ["Nenhum projeto LCP encontrado na planilha."]
-                
-            return projetos_finais
-            
-        except gspread.exceptions.WorksheetNotFound:
-            st.error("ERRO: Abas 'Capex' ou 'AME - Quarterly' não encontradas na Planilha Google.")
-            return ["ERRO: Verifique as abas na Planilha Google."]
+            backend.sincronizar()
+            return validar_arquivo(arquivo, arquivo.name, backend.avaliacoes_gravadas)
         except Exception as e:
-            st.error(f"Ocorreu um erro ao processar os projetos da planilha: {e}")
-            return [f"ERRO: {e}"]
+            st.error(f"Erro ao ler o arquivo de importação: {e}")
+            return None
+
+    def importar_avaliacoes(backend, importacao):
+        """Grava as avaliações aceitas em lotes de avaliações inteiras, registrando o progresso em `importacao`.
+
+        A cada lote gravado, as avaliações dele saem de importacao["votos"]. Se
+        um lote falhar, importar de novo continua dele: antes, as avaliações
+        que já chegaram ao armazenamento (a escrita pode ter sido feita mesmo
+        com erro) são descartadas, então nada é gravado duas vezes.
+        """
+        total = importacao["importadas"] + importacao["avaliacoes"]
+        progresso = st.progress(importacao["importadas"] / total, text="Importando avaliações...")
+        try:
+            backend.sincronizar()
+            votos, ja_gravadas = separar_ja_gravadas(importacao["votos"], backend.avaliacoes_gravadas)
+            importacao["votos"] = votos
+            importacao["importadas"] += ja_gravadas["id_avaliacao"].nunique()
+            importacao["avaliacoes"] = votos["id_avaliacao"].nunique()
+            for lote in lotes_de_avaliacoes(votos):
+                backend.acrescentar(lote)
+                importacao["votos"] = importacao["votos"].drop(lote.index)
+                importacao["importadas"] += lote["id_avaliacao"].nunique()
+                importacao["avaliacoes"] -= lote["id_avaliacao"].nunique()
+                progresso.progress(importacao["importadas"] / total, text=f"{importacao['importadas']} de {total} avaliações gravadas")
+        except Exception as e:
+            st.error(
+                f"Erro ao salvar os dados na planilha: {e}. {importacao['importadas']} de {total} avaliação(ões) já gravada(s); "
+                "importe de novo para gravar as restantes."
+            )
+            if importacao["importadas"]:
+                registrar_salvamento(atualizador_de_dados(backend))
+            return False
+        registrar_salvamento(atualizador_de_dados(backend))
+        return True
+
+    def registrar_votos(backend, df_novos_votos):
+        """Coloca a nova avaliação na fila local; a gravação no armazenamento acontece em segundo plano."""
+        if backend is None:
+            st.error("Erro ao registrar a avaliação: sem conexão com o armazenamento dos votos.")
+            return False
+        try:
+            fila_de_gravacao(backend).enfileirar(df_novos_votos)
+            return True
+        except Exception as e:
+            st.error(f"Erro ao registrar a avaliação: {e}")
+            return False
+
+    # --- GRÁFICOS ---
+    GRAFICOS_POR_VEZ = 12
+
+    def reiniciar_limite_graficos():
+        """Um filtro novo do relatório de médias volta a mostrar só os primeiros gráficos."""
+        st.session_state.pop("limite_graficos", None)
+
+    @contar_chamadas
+    @st.cache_data(max_entries=50)
+    def figura_medias(media_por_categoria, empresas):
+        """Uma única figura com um painel por fornecedor (em vez de uma figura para cada um).
+
+        O cache é indexado pelas médias filtradas e pela lista de fornecedores exibidos,
+        então a mesma combinação de filtros não reconstrói a figura.
+        """
+        registrar_recarga("figura_medias")
+        import plotly.express as px  # só a aba de médias desenha gráficos
+
+        df_grafico = media_por_categoria[media_por_categoria['empresa'].isin(empresas)]
+        linhas = -(-len(empresas) // 3)
+        fig = px.bar(
+            df_grafico, x='categoria', y='media_avaliacao', color='categoria', text_auto='.2f',
+            facet_col='empresa', facet_col_wrap=3, category_orders={'empresa': list(empresas)},
+            facet_row_spacing=min(0.08, 0.5 / linhas), facet_col_spacing=0.05, height=320 * linhas
+        )
+        fig.for_each_annotation(lambda anotacao: anotacao.update(text=anotacao.text.split("=", 1)[-1], font_size=12))
+        fig.update_yaxes(range=[0, 5], title=None)
+        fig.update_xaxes(title=None)
+        fig.update_layout(showlegend=False, margin=dict(t=40))
+        return fig
+
+    # --- COMPONENTES DE TELA ---
+    # --- EXPORTAÇÃO ---
+    def botoes_de_exportacao(nome_arquivo, cabecalho, gerar_lotes, chave, titulo="Dados"):
+        """Botões de download em CSV e XLSX. O arquivo só é gerado (em lotes) quando o botão é clicado."""
+        colunas = st.columns(len(TIPOS_MIME))
+        for coluna, formato in zip(colunas, TIPOS_MIME):
+            with coluna:
+                st.download_button(
+                    f"⬇️ Baixar {formato.upper()}",
+                    data=lambda formato=formato: exportar(cabecalho, gerar_lotes(), formato, titulo),
+                    file_name=f"{nome_arquivo}_{datetime.now().strftime('%Y%m%d_%H%M')}.{formato}",
+                    mime=TIPOS_MIME[formato],
+                    key=f"{chave}_{formato}",
+                )
+
+    def filtrar_e_paginar(df_resumo, chave):
+        """Mostra busca, filtros e paginação de uma lista de avaliações e devolve só as linhas da página atual."""
+        busca = st.text_input("Buscar por projeto, empresa ou avaliador:", key=f"{chave}_busca")
+        col_f1, col_f2, col_f3, col_f4 = st.columns(4)
+        with col_f1:
+            anos = st.multiselect("Ano(s):", sorted(df_resumo['ano_avaliacao'].dropna().unique().tolist()), key=f"{chave}_anos")
+        with col_f2:
+            projetos = st.multiselect("Projeto(s):", sorted(df_resumo['projeto'].dropna().unique().tolist()), key=f"{chave}_projetos")
+        with col_f3:
+            empresas = st.multiselect("Fornecedor(es):", sorted(df_resumo['empresa'].dropna().unique().tolist()), key=f"{chave}_empresas")
+        with col_f4:
+            avaliadores = st.multiselect("Avaliador(es):", sorted(df_resumo['user_name'].dropna().unique().tolist()), key=f"{chave}_avaliadores")
+
+        df_filtrado = filtrar_resumo(df_resumo, busca, anos, projetos, empresas, avaliadores)
+
+        col_pagina, col_tamanho, col_total = st.columns([1, 1, 2])
+        with col_tamanho:
+            tamanho_pagina = st.selectbox("Itens por página:", [10, 25, 50, 100], key=f"{chave}_tamanho")
+        paginas = total_de_paginas(len(df_filtrado), tamanho_pagina)
+        # Um filtro novo pode reduzir o número de páginas abaixo da página que estava selecionada
+        if st.session_state.get(f"{chave}_pagina", 1) > paginas:
+            st.session_state[f"{chave}_pagina"] = paginas
+        with col_pagina:
+            pagina = st.number_input("Página:", min_value=1, max_value=paginas, step=1, key=f"{chave}_pagina")
+        with col_total:
+            st.caption(f"{len(df_filtrado)} avaliação(ões) encontrada(s) | página {pagina} de {paginas}")
+
+        return paginar(df_filtrado, pagina, tamanho_pagina)
 
     # --- GERENCIAMENTO DE ESTADO ---
     if 'user_name' not in st.session_state:
@@ -262,7 +423,9 @@ if check_password():
 
     # --- LÓGICA DE EXIBIÇÃO ---
     if not st.session_state.user_name:
-        set_png_as_page_bg('assets/login_fundo.jpg')
+        execucao.fase("imagem de fundo")
+        set_page_bg("fundo_login")
+        execucao.fase("tela de entrada")
         st.markdown("""<style> h1, label { color: black !important; background-color: rgba(255, 255, 255, 0.7); padding: 10px; border-radius: 10px; font-weight: bold !important; } </style>""", unsafe_allow_html=True)
         st.title("Bem-vindo ao Sistema de Avaliação de Fornecedores")
         with st.form("login_form"):
@@ -277,21 +440,32 @@ if check_password():
                 else:
                     st.error("Por favor, insira seu nome para continuar.")
     else:
-        spreadsheet = connect_to_gsheet()
-        df_votos_geral = carregar_votos(spreadsheet)
+        execucao.fase("conexão")
+        backend = abrir_backend()
+        if backend is not None:
+            fila_de_gravacao(backend)  # a fila nasce com o backend e já envia o que ficou pendente
+        execucao.fase("carga dos votos")
+        retrato = ler_retrato(backend)
+        df_votos_geral = retrato.votos
         
-        lista_projetos_lcp = carregar_projetos(spreadsheet)
-        set_png_as_page_bg('assets/main_background.png')
+        execucao.fase("carga dos projetos")
+        lista_projetos_lcp = lista_de_projetos(retrato)
+        execucao.fase("imagem de fundo")
+        set_page_bg("fundo_principal")
+        execucao.fase("cabeçalho e menu")
 
         col1, col2 = st.columns([3, 1])
         with col1:
             st.title("RELATÓRIO DE AVALIAÇÃO DE FORNECEDORES")
             st.info("ENGENHARIA DE PROJETOS")
         with col2:
-            if os.path.exists("assets/banner_votacao.jpg"):
-                st.image("assets/banner_votacao.jpg", width=250) 
+            banner = url_do_ativo(ativos_da_pagina(), "banner")
+            if banner:
+                st.image(banner, width=250)
                 
-        st.sidebar.image("assets/logo_sidebar.png")
+        logo = url_do_ativo(ativos_da_pagina(), "logo")
+        if logo:
+            st.sidebar.image(logo)
         st.sidebar.success(f"Logado como:\n**{st.session_state.user_name}**")
         if st.session_state.is_admin:
             st.sidebar.warning("👑 **Nível de Acesso:** Administrador")
@@ -327,9 +501,16 @@ if check_password():
             key="tabs_radio" 
         )
 
+        execucao.fase(st.session_state.active_tab)
         if st.session_state.active_tab == "📝 NOVA AVALIAÇÃO":
             st.header(f"Registrar Nova Avaliação de Projeto")
             st.info("Passo 1: Selecione o contexto da avaliação (Ano, Projeto e Fornecedor).")
+            if not lista_projetos_lcp:
+                # Sem projeto selecionável o formulário não abre, então nada é registrado com um projeto inválido
+                if backend is not None and backend.nome == "sqlite":
+                    st.error("Nenhum projeto disponível para avaliação. Configure `projetos` ou `caminho_projetos` nos secrets.")
+                else:
+                    st.error("Nenhum projeto LCP encontrado na planilha.")
 
             col_ano, col_proj, col_emp = st.columns(3)
             with col_ano:
@@ -337,7 +518,7 @@ if check_password():
                 default_index = ANOS_AVALIACAO.index(ano_atual) if ano_atual in ANOS_AVALIACAO else 0
                 ano_selecionado = st.selectbox("Ano da Avaliação*", options=ANOS_AVALIACAO, index=default_index)
             with col_proj:
-                projeto = st.selectbox("Projeto*", options=lista_projetos_lcp, index=None, placeholder="Selecione um projeto...")
+                projeto = st.selectbox("Projeto*", options=lista_projetos_lcp, index=None, placeholder="Selecione um projeto..." if lista_projetos_lcp else "Nenhum projeto disponível")
             with col_emp:
                 empresa_selecionada = st.selectbox("Fornecedor*", options=EMPRESAS, index=None, placeholder="Escolha uma empresa...")
             
@@ -349,31 +530,24 @@ if check_password():
                 with st.form(key="form_nova_avaliacao", clear_on_submit=True):
                     st.subheader(f"Avaliação para: {empresa_selecionada} (Projeto: {projeto} / Ano: {ano_selecionado})")
                     
-                    for categoria, perguntas_categoria in PERGUNTAS.items():
+                    for categoria, perguntas_e_chaves, chave_comentario in LAYOUT_FORMULARIO:
                         col_titulo, col_botao_criterios = st.columns([4, 1])
                         with col_titulo:
                             st.markdown(f"#### {categoria}")
                         with col_botao_criterios:
                             with st.popover(f"📘 Ver Critérios de {categoria}"):
-                                st.markdown(f"### Critérios para: **{categoria}**")
-                                legenda_geral = {"Nota": ["1", "2", "3", "4", "5"], "Significado": ["Needs improvement", "Meets partially the expectations", "Meets the expectations", "Exceed partially the expectations", "Exceed the expectations"]}
-                                st.table(pd.DataFrame(legenda_geral).set_index('Nota'))
-                                st.markdown("---")
-                                for pid, ptexto in perguntas_categoria.items():
-                                    st.markdown(f"##### Pergunta {pid}: {ptexto}")
-                                    if categoria in RUBRICA and pid in RUBRICA[categoria]:
-                                        st.table(pd.DataFrame({'Nota': range(1, 6), 'Descrição do Critério': RUBRICA[categoria][pid]}).set_index('Nota'))
-                                    else:
-                                        st.warning("Critérios para esta pergunta não definidos.")
-
-                        for pid, ptexto in perguntas_categoria.items():
-                            st.radio(f"**{pid}** - {ptexto}", OPCOES_VOTO, horizontal=True, key=f"vote_{categoria}_{pid}", index=5)
-                        st.text_area("Comentários sobre esta categoria (opcional):", key=f"comment_{categoria}", height=100)
+                                st.markdown(CRITERIOS_POR_CATEGORIA[categoria])
+
+                        for chave, rotulo in perguntas_e_chaves:
+                            st.radio(rotulo, OPCOES_VOTO, horizontal=True, key=chave, index=5)
+                        st.text_area("Comentários sobre esta categoria (opcional):", key=chave_comentario, height=100)
                         st.divider()
                     
                     submitted = st.form_submit_button("Registrar Avaliação")
                     
                     if submitted:
+                        import pytz
+
                         fuso_horario_sp = pytz.timezone("America/Sao_Paulo")
                         id_da_avaliacao = datetime.now(fuso_horario_sp)
                         novos_votos = []
@@ -398,13 +572,11 @@ if check_password():
                                 })
                         
                         df_novos_votos = pd.DataFrame(novos_votos)
-                        df_votos_atualizado = pd.concat([df_votos_geral, df_novos_votos], ignore_index=True)
                         
-                        salvar_votos(spreadsheet, df_votos_atualizado)
-
-                        st.success(f"Avaliação para '{empresa_selecionada}' registrada com sucesso!")
-                        st.balloons()
-                        st.rerun()
+                        if registrar_votos(backend, df_novos_votos):
+                            st.success(f"Avaliação para '{empresa_selecionada}' registrada com sucesso! Ela aparece nas outras abas assim que for gravada na planilha.")
+                            st.balloons()
+                            st.rerun()
             else:
                 st.warning("Por favor, selecione o Ano, o Projeto e o Fornecedor para iniciar a avaliação.")
 
@@ -414,7 +586,7 @@ if check_password():
             if df_votos_geral.empty:
                 st.info("Nenhuma avaliação de projeto foi registrada ainda.")
             else:
-                df_resumo_publico = df_votos_geral[['id_avaliacao', 'ano_avaliacao', 'projeto', 'empresa', 'user_name']].drop_duplicates().sort_values(by='id_avaliacao', ascending=False)
+                df_resumo_publico = filtrar_e_paginar(retrato.resumo, "projetos_avaliados")
                 for index, row in df_resumo_publico.iterrows():
                     with st.expander(f"**Projeto:** {row['projeto']} | **Empresa:** {row['empresa']}"):
                         st.markdown(f"- **Avaliador:** {row['user_name']}")
@@ -429,52 +601,46 @@ if check_password():
                 st.info("Ainda não há votos registrados.")
             else:
                 st.info("Filtre os dados para analisar o desempenho em cenários específicos.")
+                df_agregados = retrato.agregados
                 col_f1, col_f2, col_f3 = st.columns(3)
                 with col_f1:
-                    anos_disponiveis = sorted(df_votos_geral['ano_avaliacao'].unique().tolist())
-                    anos_filtrados = st.multiselect("Filtrar por Ano(s):", anos_disponiveis)
+                    anos_disponiveis = sorted(df_agregados['ano_avaliacao'].unique().tolist())
+                    anos_filtrados = st.multiselect("Filtrar por Ano(s):", anos_disponiveis, on_change=reiniciar_limite_graficos)
                 with col_f2:
-                    projetos_disponiveis = sorted(df_votos_geral['projeto'].unique().tolist())
-                    projetos_filtrados = st.multiselect("Filtrar por Projeto(s):", projetos_disponiveis)
+                    projetos_disponiveis = sorted(df_agregados['projeto'].unique().tolist())
+                    projetos_filtrados = st.multiselect("Filtrar por Projeto(s):", projetos_disponiveis, on_change=reiniciar_limite_graficos)
                 with col_f3:
-                    empresas_disponiveis = sorted(df_votos_geral['empresa'].unique().tolist())
-                    empresas_filtradas = st.multiselect("Filtrar por Fornecedor(es):", empresas_disponiveis)
-
-                df_filtrado = df_votos_geral.copy()
-                if anos_filtrados:
-                    df_filtrado = df_filtrado[df_filtrado['ano_avaliacao'].isin(anos_filtrados)]
-                if projetos_filtrados:
-                    df_filtrado = df_filtrado[df_filtrado['projeto'].isin(projetos_filtrados)]
-                if empresas_filtradas:
-                    df_filtrado = df_filtrado[df_filtrado['empresa'].isin(empresas_filtradas)]
-
-                df_calculo = df_filtrado[df_filtrado['voto'] != 'N/A'].copy()
+                    empresas_disponiveis = sorted(df_agregados['empresa'].unique().tolist())
+                    empresas_filtradas = st.multiselect("Filtrar por Fornecedor(es):", empresas_disponiveis, on_change=reiniciar_limite_graficos)
+
+                # Consulta indexada na base local, sobre a tabela de agregados
+                execucao.fase("📊 RELATÓRIO DE MÉDIAS: cálculo")
+                media_por_categoria = backend.medias(anos_filtrados, projetos_filtrados, empresas_filtradas)
+                execucao.fase("📊 RELATÓRIO DE MÉDIAS: desenho")
                 
-                if df_calculo.empty:
+                if media_por_categoria.empty:
                     st.warning("Nenhum dado encontrado para os filtros selecionados.")
                 else:
-                    df_calculo['voto'] = pd.to_numeric(df_calculo['voto'])
-                    media_por_categoria = df_calculo.groupby(['empresa', 'categoria'])['voto'].mean().reset_index()
-                    media_por_categoria.rename(columns={'voto': 'media_avaliacao'}, inplace=True)
-                    
                     st.subheader("Gráficos Individuais por Fornecedor")
                     empresas_avaliadas = sorted(media_por_categoria['empresa'].unique())
-                    
-                    num_cols = len(empresas_avaliadas)
-                    cols = st.columns(min(num_cols, 3) if num_cols > 0 else 1)
-                    
-                    for i, empresa in enumerate(empresas_avaliadas):
-                        df_empresa = media_por_categoria[media_por_categoria['empresa'] == empresa]
-                        fig = px.bar(df_empresa, x='categoria', y='media_avaliacao', color='categoria', title=empresa, text_auto='.2f')
-                        fig.update_layout(yaxis_range=[0, 5], xaxis_title=None, yaxis_title="Média", showlegend=False, title_font_size=14, title_x=0.05)
-                        with cols[i % 3]:
-                            st.plotly_chart(fig, use_container_width=True)
+
+                    limite = st.session_state.setdefault("limite_graficos", GRAFICOS_POR_VEZ)
+                    empresas_exibidas = tuple(empresas_avaliadas[:limite])
+                    st.plotly_chart(figura_medias(media_por_categoria, empresas_exibidas), use_container_width=True)
+
+                    if len(empresas_avaliadas) > limite:
+                        st.caption(f"Exibindo {limite} de {len(empresas_avaliadas)} fornecedores.")
+                        if st.button("Mostrar mais fornecedores"):
+                            st.session_state.limite_graficos = limite + GRAFICOS_POR_VEZ
+                            st.rerun()
                             
                     if len(empresas_avaliadas) > 0:
                         st.markdown("---")
                         st.subheader("Tabela Geral de Médias")
                         tabela_pivot = media_por_categoria.pivot_table(index='empresa', columns='categoria', values='media_avaliacao').round(2)
                         st.dataframe(tabela_pivot, use_container_width=True)
+                        tabela_exportada = tabela_pivot.reset_index()
+                        botoes_de_exportacao("medias", list(tabela_exportada.columns), lambda: lotes_do_dataframe(tabela_exportada), "exportar_medias", "Médias")
         
         elif st.session_state.active_tab == "🏆 RANKING":
             st.header("🏆 Ranking Geral de Fornecedores")
@@ -482,17 +648,17 @@ if check_password():
                 st.info("Nenhuma avaliação registrada para gerar o ranking.")
             else:
                 st.info("Este ranking considera a média de todas as avaliações e o número de avaliações únicas recebidas.")
-                df_calculo_ranking = df_votos_geral[df_votos_geral['voto'] != 'N/A'].copy()
-                df_calculo_ranking['voto'] = pd.to_numeric(df_calculo_ranking['voto'])
-                df_media = df_calculo_ranking.groupby('empresa')['voto'].mean().reset_index()
-                df_media.rename(columns={'voto': 'Média Geral'}, inplace=True)
-                df_contagem = df_votos_geral.groupby('empresa')['id_avaliacao'].nunique().reset_index()
-                df_contagem.rename(columns={'id_avaliacao': 'Nº de Avaliações'}, inplace=True)
-                ranking = pd.merge(df_media, df_contagem, on='empresa')
-                ranking_ordenado = ranking.sort_values(by='Média Geral', ascending=False).reset_index(drop=True)
-                ranking_ordenado.index += 1
-                ranking_ordenado['Média Geral'] = ranking_ordenado['Média Geral'].map('{:.2f}'.format)
-                st.dataframe(ranking_ordenado, use_container_width=True)
+                execucao.fase("🏆 RANKING: cálculo")
+                # O ranking vem pronto no retrato (compartilhado): numera as posições sem alterá-lo
+                ranking_ordenado = retrato.ranking.set_axis(range(1, len(retrato.ranking) + 1))
+                execucao.fase("🏆 RANKING: desenho")
+                # O mesmo ranking na tela e na exportação; a média é só formatada na exibição
+                st.dataframe(
+                    ranking_ordenado, use_container_width=True,
+                    column_config={"Média Geral": st.column_config.NumberColumn(format="%.2f")},
+                )
+                ranking_exportado = ranking_ordenado.rename_axis('Posição').reset_index()
+                botoes_de_exportacao("ranking", list(ranking_exportado.columns), lambda: lotes_do_dataframe(ranking_exportado), "exportar_ranking", "Ranking")
 
         elif st.session_state.active_tab == "⚙️ DADOS E ADMINISTRAÇÃO":
             st.header("Painel de Administração e Dados")
@@ -504,31 +670,41 @@ if check_password():
             if df_votos_geral.empty:
                 st.info("Nenhuma participação registrada ainda.")
             else:
-                df_votos_geral_sorted = df_votos_geral.dropna(subset=['id_avaliacao']).sort_values(by='id_avaliacao', ascending=False)
-                
-                for group_keys, df_grupo in df_votos_geral_sorted.groupby(['id_avaliacao', 'ano_avaliacao', 'projeto', 'empresa', 'user_name']):
-                    id_aval, ano, proj, emp, user_name = group_keys
-                    with st.expander(f"**Data:** {id_aval.strftime('%d/%m/%Y %H:%M')} | **Avaliador:** {user_name} | **Projeto:** {proj}"):
-                        st.markdown(f"**Empresa Avaliada:** {emp} | **Ano da Avaliação:** {ano}")
+                st.caption("As notas e os comentários de cada avaliação só são carregados ao abrir o detalhe.")
+                df_resumo_admin = filtrar_e_paginar(retrato.resumo.dropna(subset=['id_avaliacao']), "resumo_admin")
+
+                for index, row in df_resumo_admin.iterrows():
+                    id_aval = row['id_avaliacao']
+                    abrir = st.toggle(
+                        f"**Data:** {id_aval.strftime('%d/%m/%Y %H:%M')} | **Avaliador:** {row['user_name']} | **Projeto:** {row['projeto']}",
+                        # O mesmo id pode aparecer em mais de uma linha do resumo (outro avaliador, projeto ou empresa);
+                        # a chave leva todas as colunas do resumo, que juntas não se repetem
+                        key=f"detalhe_{id_aval.isoformat()}_{row['user_name']}_{row['projeto']}_{row['empresa']}_{row['ano_avaliacao']}",
+                    )
+                    if not abrir:
+                        continue
+                    with st.container(border=True):
+                        df_grupo = df_votos_geral.iloc[retrato.linhas_por_avaliacao[id_aval]]
+                        st.markdown(f"**Empresa Avaliada:** {row['empresa']} | **Ano da Avaliação:** {row['ano_avaliacao']}")
                         st.markdown("**Notas:**")
-                        st.dataframe(df_grupo[['categoria', 'pergunta_texto', 'voto']].drop_duplicates().set_index('categoria'))
+                        st.dataframe(votos_para_exibicao(df_grupo)[['categoria', 'pergunta_texto', 'voto']].drop_duplicates().set_index('categoria'))
                         comentarios = df_grupo[['categoria', 'comentario']].drop_duplicates()
                         comentarios = comentarios[comentarios['comentario'].notna() & (comentarios['comentario'] != '')]
                         if not comentarios.empty:
                             st.markdown("**Comentários:**")
-                            for _, row in comentarios.iterrows():
-                                st.markdown(f"- **{row['categoria']}:** *{row['comentario']}*")
+                            for _, comentario in comentarios.iterrows():
+                                st.markdown(f"- **{comentario['categoria']}:** *{comentario['comentario']}*")
             st.markdown("---")
             
             st.subheader("Administração de Avaliações")
             if not df_votos_geral.empty:
-                df_admin_view = df_votos_geral.dropna(subset=['id_avaliacao', 'user_name']).copy()
+                # O resumo já tem uma linha por avaliação; não há cópia dos votos por sessão
+                df_admin_view = retrato.resumo.dropna(subset=['id_avaliacao', 'user_name'])
                 usuarios_com_voto = sorted(df_admin_view['user_name'].unique())
                 user_selecionado_admin = st.selectbox("1. Selecione o Engenheiro:", usuarios_com_voto, index=None, placeholder="Escolha um usuário...")
                 
                 if user_selecionado_admin:
-                    df_usuario = df_admin_view[df_admin_view['user_name'] == user_selecionado_admin]
-                    avaliacoes_unicas = df_usuario[['projeto', 'empresa', 'ano_avaliacao', 'id_avaliacao']].drop_duplicates().sort_values(by='id_avaliacao', ascending=False)
+                    avaliacoes_unicas = backend.avaliacoes_do_usuario(user_selecionado_admin)
                     
                     mapa_exclusao = {
                         f"Data: {row['id_avaliacao'].strftime('%d/%m/%y %H:%M')} | Ano: {row['ano_avaliacao']} | Projeto: {row['projeto']} | Empresa: {row['empresa']}": row['id_avaliacao']
@@ -543,21 +719,128 @@ if check_password():
                             id_para_apagar = mapa_exclusao[avaliacao_para_apagar_str]
                             st.warning(f"Você está prestes a apagar a avaliação de '{user_selecionado_admin}' registrada em {avaliacao_para_apagar_str.split(' | ')[0].replace('Data: ', '')}.")
                             if st.button("Confirmar Exclusão Definitiva", type="primary"):
-                                df_final = df_votos_geral[df_votos_geral['id_avaliacao'] != id_para_apagar]
-                                salvar_votos(spreadsheet, df_final)
-                                st.rerun()
+                                if excluir_avaliacao(backend, id_para_apagar):
+                                    st.rerun()
+
+            if backend is not None:
+                exclusoes = backend.situacao_exclusoes()
+                st.caption(
+                    f"Exclusões aguardando compactação: {exclusoes['avaliacoes']} avaliação(ões), {exclusoes['linhas']} linha(s). "
+                    f"A planilha é regravada sem elas automaticamente a partir de {backend.limiar_compactacao} exclusões."
+                )
+                if exclusoes['avaliacoes'] and st.button("Compactar agora"):
+                    if compactar_armazenamento(backend):
+                        st.rerun()
+
+            st.markdown("---")
+            st.subheader("Importar Avaliações Antigas")
+            if backend is not None:
+                st.caption(
+                    f"Planilha XLSX ou CSV com uma linha por pergunta e, na primeira linha, as colunas: {', '.join(COLUNAS_OBRIGATORIAS)} "
+                    "(pergunta_texto e comentario são opcionais). Avaliações incompletas, com alguma linha inválida ou já registradas são recusadas inteiras."
+                )
+                arquivo_importacao = st.file_uploader("Arquivo de avaliações", type=["xlsx", "csv"], key="arquivo_importacao")
+                if arquivo_importacao is None:
+                    st.session_state.pop("importacao", None)
+                else:
+                    if st.button("Validar arquivo"):
+                        resultado = validar_importacao(backend, arquivo_importacao)
+                        st.session_state.importacao = resultado and {"arquivo": arquivo_importacao.file_id, "importadas": 0, **resultado}
+                    resultado = st.session_state.get("importacao")
+                    if resultado and resultado["arquivo"] == arquivo_importacao.file_id:
+                        col_imp1, col_imp2, col_imp3 = st.columns(3)
+                        col_imp1.metric("Linhas lidas", resultado["linhas"])
+                        col_imp2.metric("Avaliações aceitas", resultado["avaliacoes"])
+                        col_imp3.metric("Linhas rejeitadas", len(resultado["rejeitadas"]))
+                        if not resultado["rejeitadas"].empty:
+                            st.dataframe(resultado["rejeitadas"].head(1000), use_container_width=True, hide_index=True)
+                            botoes_de_exportacao("importacao_rejeitadas", COLUNAS_REJEITADAS, lambda: lotes_do_dataframe(resultado["rejeitadas"]), "exportar_rejeitadas", "Rejeitadas")
+                        if resultado["importadas"]:
+                            st.info(f"{resultado['importadas']} avaliação(ões) deste arquivo já gravada(s); a importação continua das restantes.")
+                        if resultado["avaliacoes"] and st.button(f"Importar {resultado['avaliacoes']} avaliação(ões)", type="primary"):
+                            if importar_avaliacoes(backend, resultado):
+                                st.session_state.pop("importacao")
+                                st.success(f"{resultado['importadas']} avaliação(ões) importada(s).")
+
+            st.markdown("---")
+            st.subheader("Fila de Gravação")
+            if backend is not None:
+                fila = fila_de_gravacao(backend)
+                situacao = fila.situacao()
+                col_fila1, col_fila2, col_fila3 = st.columns(3)
+                col_fila1.metric("Avaliações na fila", situacao["profundidade"])
+                col_fila2.metric("Atraso da mais antiga", f"{situacao['atraso']:.0f} s")
+                if situacao["ultimo_envio"]:
+                    col_fila3.metric("Último envio", datetime.fromtimestamp(situacao["ultimo_envio"]).strftime('%H:%M:%S'))
+                if situacao["profundidade"]:
+                    st.dataframe(fila.pendentes(), use_container_width=True, hide_index=True)
+                    if st.button("Tentar enviar agora"):
+                        fila.solicitar_envio()
+                        st.rerun()
+
+            st.markdown("---")
+            st.subheader("Recargas de Cache")
+            estado_cache = estado_do_cache()
+            if retrato.atualizado_em:
+                st.caption(f"Versão atual dos dados: {retrato.versao} (atualizada em {retrato.atualizado_em.strftime('%d/%m/%Y %H:%M:%S')}). Cada linha mostra as recargas ocorridas desde o salvamento.")
+            # Chamadas só são contadas nas funções com @contar_chamadas; acertos = chamadas atendidas pelo cache
+            st.dataframe(pd.DataFrame([
+                {
+                    "Função": funcao,
+                    "Recargas": total,
+                    "Chamadas": estado_cache["chamadas"].get(funcao),
+                    "Acertos": estado_cache["chamadas"][funcao] - total if funcao in estado_cache["chamadas"] else None,
+                }
+                for funcao, total in estado_cache["recargas"].items()
+            ]), use_container_width=True, hide_index=True)
+            if estado_cache["salvamentos"]:
+                st.dataframe(pd.DataFrame([
+                    {"Versão": salvamento["versao"], "Momento": salvamento["momento"].strftime('%d/%m/%Y %H:%M:%S'), **salvamento["recargas"]}
+                    for salvamento in reversed(estado_cache["salvamentos"])
+                ]).fillna(0), use_container_width=True, hide_index=True)
+
+            st.markdown("---")
+            st.subheader("Desempenho das Execuções")
+            medidor = medidor_do_processo()
+            st.caption(f"Tempo de cada fase nas últimas {medidor.execucoes.maxlen} execuções da página (todas as sessões deste processo).")
+            st.dataframe(medidor.percentis(), use_container_width=True, hide_index=True)
+            if medidor.api_por_thread:
+                st.markdown("**Chamadas à API do Google Sheets desde o início do processo:**")
+                st.dataframe(pd.DataFrame([
+                    {"Thread": thread, "Chamadas": totais["chamadas"], "KB trafegados": round(totais["bytes"] / 1024, 1)}
+                    for thread, totais in list(medidor.api_por_thread.items())
+                ]), use_container_width=True, hide_index=True)
+            if isinstance(backend, BackendGoogleSheets):
+                st.markdown("**Cliente do Google Sheets (cota por minuto, novas tentativas e latência):**")
+                st.dataframe(pd.DataFrame(backend.spreadsheet.client.situacao()), use_container_width=True, hide_index=True)
+            st.checkbox(
+                f"Gravar cada fase medida em {os.path.relpath(medidor.caminho_log)}", value=medidor.gravar_log, key="gravar_metricas",
+                on_change=lambda: setattr(medidor, "gravar_log", st.session_state.gravar_metricas),
+            )
 
             st.markdown("---")
             st.subheader("Visualizar Todos os Dados Brutos")
-            st.dataframe(df_votos_geral, use_container_width=True)
+            st.dataframe(votos_para_exibicao(df_votos_geral), use_container_width=True)
+            if backend is not None:
+                # Mesmos filtros do Resumo Detalhado das Avaliações, acima
+                filtros_exportacao = {
+                    "busca": st.session_state.get("resumo_admin_busca", ""),
+                    **{filtro: st.session_state.get(f"resumo_admin_{filtro}", []) for filtro in ("anos", "projetos", "empresas", "avaliadores")},
+                }
+                st.caption("A exportação usa a busca e os filtros do Resumo Detalhado das Avaliações.")
+                botoes_de_exportacao("votos", COLUNAS_VOTOS, lambda: backend.lotes_de_votos(**filtros_exportacao), "exportar_votos", "Votos")
             st.markdown("---")
             
             st.subheader("Zona de Perigo: Apagar Todo o Histórico")
             st.warning("🚨 CUIDADO: Esta ação apagará **TODAS AS AVALIAÇÕES** permanentemente.")
             if st.checkbox("Eu entendo e quero apagar todos os dados."):
                 if st.button("APAGAR TUDO", type="primary"):
-                    colunas = ['user_name', 'id_avaliacao', 'ano_avaliacao', 'projeto', 'empresa', 'categoria', 'pergunta_id', 'pergunta_texto', 'voto', 'comentario']
-                    df_vazio = pd.DataFrame(columns=colunas)
-                    salvar_votos(spreadsheet, df_vazio)
-                    st.success("Todo o histórico de votos foi apagado da planilha.")
-                    st.rerun()
\ No newline at end of file
+                    if apagar_todos_os_votos(backend):
+                        st.success("Todo o histórico de votos foi apagado da planilha.")
+                        st.rerun()
+
+execucao.encerrar()
+
+# --- GRAVAÇÕES PENDENTES ---
+# Depois de a página ser desenhada, para que nem a tela de senha espere por ela
+retomar_gravacoes_pendentes()
\ No newline at end of file
@@ -0,0 +1,247 @@
+"""Rotinas de leitura e escrita dos votos na planilha do Google.
+
+As funções deste módulo recebem a worksheet do gspread (ou qualquer objeto
+com a mesma interface) e não dependem do Streamlit, para poderem ser usadas
+e testadas fora da aplicação.
+"""
+import hashlib
+import json
+import os
+
+import gspread
+import pandas as pd
+
+from constantes import TEXTOS_PERGUNTAS
+
+COLUNAS_VOTOS = ["user_name", "id_avaliacao", "ano_avaliacao", "projeto", "empresa", "categoria", "pergunta_id", "pergunta_texto", "voto", "comentario"]
+
+# Representação em memória: sem pergunta_texto, dimensões como category e voto como Int8 (N/A = nulo)
+COLUNAS_COMPACTAS = [col for col in COLUNAS_VOTOS if col != 'pergunta_texto']
+DIMENSOES = ['user_name', 'ano_avaliacao', 'projeto', 'empresa', 'categoria', 'pergunta_id', 'comentario']
+TIPOS_COMPACTOS = {'id_avaliacao': 'datetime64[ns]', 'voto': 'Int8'}
+
+# Abas de onde vem a lista de projetos; o cabeçalho delas fica na linha 4
+ABAS_PROJETOS = ["Capex", "AME - Quarterly"]
+LINHA_CABECALHO_PROJETOS = 4
+COLUNAS_PROJETOS = ["WBS", "PROJECT NAME"]
+CAMINHO_INDICE_PROJETOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "projetos.json")
+
+# Aba com as lápides das avaliações excluídas (uma linha por exclusão), lidas de forma incremental
+ABA_EXCLUSOES = "Exclusões"
+COLUNAS_EXCLUSOES = ["id_avaliacao", "excluida_em"]
+
+
+def letra_coluna(numero):
+    """Converte o número da coluna (1 = A) para a letra usada na notação A1."""
+    letras = ""
+    while numero > 0:
+        numero, resto = divmod(numero - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def preparar_votos(df):
+    """Converte os votos lidos da planilha (tudo texto) para a representação compacta usada na aplicação.
+
+    As dimensões repetidas viram `category`, o voto vira inteiro pequeno
+    anulável (N/A = nulo) e o texto da pergunta não é guardado por linha:
+    vem de TEXTOS_PERGUNTAS quando precisa ser exibido (ver votos_para_exibicao).
+    """
+    if df.empty:
+        return pd.DataFrame({
+            col: pd.Series(dtype=TIPOS_COMPACTOS.get(col, 'category')) for col in COLUNAS_COMPACTAS
+        })
+
+    for col in COLUNAS_VOTOS:
+        if col not in df.columns:
+            df[col] = pd.NA
+
+    df = df[COLUNAS_COMPACTAS].copy()
+    df['ano_avaliacao'] = pd.to_numeric(df['ano_avaliacao'], errors='coerce')
+    df.dropna(subset=['ano_avaliacao'], inplace=True)
+    df['ano_avaliacao'] = df['ano_avaliacao'].astype(int).astype(str)
+
+    df['id_avaliacao'] = pd.to_datetime(df['id_avaliacao'], errors='coerce')
+    df['voto'] = pd.to_numeric(df['voto'], errors='coerce').round().astype(TIPOS_COMPACTOS['voto'])
+    for col in DIMENSOES:
+        df[col] = df[col].astype('category')
+    return df.reset_index(drop=True)
+
+
+def votos_para_exibicao(df):
+    """Devolve os votos no formato da planilha para exibição: texto da pergunta e 'N/A' nos votos nulos."""
+    df = df.copy()
+    df.insert(df.columns.get_loc('pergunta_id') + 1, 'pergunta_texto', df['pergunta_id'].astype(object).map(TEXTOS_PERGUNTAS).fillna(df['pergunta_id'].astype(object)))
+    df['voto'] = df['voto'].astype(object).where(df['voto'].notna(), 'N/A').astype(str)
+    return df
+
+
+def _valor_celula(valor):
+    """Converte um valor do DataFrame para o texto enviado à planilha."""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return ""
+    valor = str(valor)
+    # Nada de fórmulas vindas do usuário: o texto é gravado com USER_ENTERED
+    if valor.startswith("="):
+        return "'" + valor
+    return valor
+
+
+def linhas_para_planilha(df, cabecalho):
+    """Ordena as colunas conforme o cabeçalho da planilha e devolve as linhas como listas de texto."""
+    df = df.reindex(columns=cabecalho)
+    return [[_valor_celula(v) for v in linha] for linha in df.itertuples(index=False, name=None)]
+
+
+def votos_como_texto(df):
+    """Linhas dos votos como listas de texto, na ordem de COLUNAS_VOTOS (nulos viram texto vazio)."""
+    df = df.reindex(columns=COLUNAS_VOTOS).astype(object)
+    return df.where(df.notna(), "").astype(str).values.tolist()
+
+
+def acrescentar_votos(worksheet, df_novos, cabecalho=None):
+    """Acrescenta somente as linhas novas ao final da aba, em uma única chamada de append.
+
+    `cabecalho` é o cabeçalho já conhecido da aba (o da base local); sem ele,
+    a primeira linha é lida antes. Se a aba ainda não tiver cabeçalho, ele é
+    enviado junto com as linhas. Retorna o número de linhas de votos enviadas.
+    """
+    if df_novos.empty:
+        return 0
+
+    cabecalho = cabecalho or worksheet.row_values(1)
+    linhas = []
+    if not cabecalho:
+        cabecalho = COLUNAS_VOTOS + [col for col in df_novos.columns if col not in COLUNAS_VOTOS]
+        linhas.append(cabecalho)
+    linhas.extend(linhas_para_planilha(df_novos, cabecalho))
+
+    worksheet.append_rows(linhas, value_input_option="USER_ENTERED")
+    return len(df_novos)
+
+
+def regravar_abas(spreadsheet, linhas_por_aba):
+    """Apaga as abas e grava nelas as linhas informadas ({título: linhas}): uma chamada para limpar e uma para gravar.
+
+    Use apenas para exclusões feitas pelo administrador (compactação e apagar tudo).
+    """
+    spreadsheet.values_batch_clear(body={"ranges": [f"'{titulo}'" for titulo in linhas_por_aba]})
+    dados = [{"range": f"'{titulo}'!A1", "values": linhas} for titulo, linhas in linhas_por_aba.items() if linhas]
+    if dados:
+        spreadsheet.values_batch_update(body={"valueInputOption": "USER_ENTERED", "data": dados})
+
+
+def ler_votos_e_exclusoes(spreadsheet, titulo_votos, intervalo_votos, inicio_exclusoes):
+    """Lê, em uma única chamada, as linhas da aba de votos e as lápides a partir da posição informada.
+
+    `intervalo_votos` é um intervalo A1 da aba de votos (None = a aba inteira);
+    a aba de exclusões precisa existir (ver abrir_aba_de_exclusoes). Retorna (linhas, ids).
+    """
+    intervalos = [
+        f"'{titulo_votos}'" + (f"!{intervalo_votos}" if intervalo_votos else ""),
+        f"'{ABA_EXCLUSOES}'!A{inicio_exclusoes + 2}:A",
+    ]
+    resposta = spreadsheet.values_batch_get(intervalos)
+    votos, exclusoes = [intervalo.get('values') or [] for intervalo in resposta.get('valueRanges', [{}, {}])]
+    return votos, [linha[0] if linha else "" for linha in exclusoes]
+
+
+# --- EXCLUSÕES (LÁPIDES) ---
+def abrir_aba_de_exclusoes(spreadsheet):
+    """Aba de exclusões, criada com o cabeçalho na primeira vez que for usada."""
+    try:
+        return spreadsheet.worksheet(ABA_EXCLUSOES)
+    except gspread.exceptions.WorksheetNotFound:
+        worksheet = spreadsheet.add_worksheet(ABA_EXCLUSOES, rows=100, cols=len(COLUNAS_EXCLUSOES))
+        worksheet.append_rows([COLUNAS_EXCLUSOES], value_input_option="RAW")
+        return worksheet
+
+
+def registrar_exclusoes(worksheet, ids_avaliacao, momento):
+    """Acrescenta uma lápide por avaliação na aba de exclusões: uma escrita pequena, sem regravar os votos."""
+    linhas = [[str(id_avaliacao), str(momento)] for id_avaliacao in ids_avaliacao]
+    # RAW: o id precisa voltar exatamente como foi escrito, sem virar data na planilha
+    worksheet.append_rows(linhas, value_input_option="RAW")
+
+
+# --- LISTA DE PROJETOS ---
+def _localizar_colunas_projetos(spreadsheet):
+    """Lê só a linha de cabeçalho das abas de projetos (uma chamada) e devolve a letra das colunas WBS e PROJECT NAME."""
+    intervalos = [f"'{aba}'!{LINHA_CABECALHO_PROJETOS}:{LINHA_CABECALHO_PROJETOS}" for aba in ABAS_PROJETOS]
+    resposta = spreadsheet.values_batch_get(intervalos)
+    colunas = {}
+    for aba, intervalo in zip(ABAS_PROJETOS, resposta.get('valueRanges', [])):
+        cabecalho = [str(valor).strip() for valor in (intervalo.get('values') or [[]])[0]]
+        if all(col in cabecalho for col in COLUNAS_PROJETOS):
+            colunas[aba] = [letra_coluna(cabecalho.index(col) + 1) for col in COLUNAS_PROJETOS]
+    return colunas
+
+
+def _ler_colunas_projetos(spreadsheet, colunas):
+    """Lê as colunas WBS e PROJECT NAME de todas as abas em uma única chamada.
+
+    Cada coluna é lida a partir da linha de cabeçalho, para conferir se ela
+    continua no mesmo lugar; se alguma mudou, retorna None.
+    """
+    intervalos = [
+        f"'{aba}'!{letra}{LINHA_CABECALHO_PROJETOS}:{letra}"
+        for aba, letras in colunas.items() for letra in letras
+    ]
+    if not intervalos:
+        return []
+    resposta = spreadsheet.values_batch_get(intervalos, params={"majorDimension": "COLUMNS"})
+    valores = [(intervalo.get('values') or [[]])[0] for intervalo in resposta.get('valueRanges', [])]
+
+    projetos = []
+    for wbs, nomes in zip(valores[0::2], valores[1::2]):
+        cabecalho = [str(coluna[0]).strip() if coluna else "" for coluna in (wbs, nomes)]
+        if cabecalho != COLUNAS_PROJETOS:
+            return None
+        wbs, nomes = wbs[1:], nomes[1:]
+        nomes = nomes + [""] * (len(wbs) - len(nomes))
+        projetos.extend(f"{codigo} - {nome}" for codigo, nome in zip(wbs, nomes) if str(codigo).strip() != "")
+    return projetos
+
+
+def _assinatura_projetos(colunas, valores):
+    """Hash das posições e dos valores das colunas de projetos: muda só quando as abas de projetos mudam."""
+    return hashlib.sha256(json.dumps([colunas, valores], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def carregar_indice_projetos(spreadsheet, caminho=CAMINHO_INDICE_PROJETOS):
+    """Lista ordenada dos projetos LCP das abas de projetos, guardada localmente em `caminho`.
+
+    Cada carga lê só as colunas WBS e PROJECT NAME (uma chamada), nas
+    posições guardadas no índice; o cabeçalho só é procurado de novo se elas
+    mudarem. Se a assinatura desses valores for a mesma do índice, a lista
+    guardada é devolvida sem ser refeita nem regravada. A assinatura depende
+    só das abas de projetos, então os votos gravados na primeira aba não a
+    invalidam.
+    """
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            indice = json.load(arquivo)
+    except (FileNotFoundError, ValueError):
+        indice = {}
+
+    try:
+        colunas = indice.get("colunas") or _localizar_colunas_projetos(spreadsheet)
+        todos_projetos = _ler_colunas_projetos(spreadsheet, colunas)
+        if todos_projetos is None:
+            colunas = _localizar_colunas_projetos(spreadsheet)
+            todos_projetos = _ler_colunas_projetos(spreadsheet, colunas)
+    except gspread.exceptions.APIError as e:
+        # Intervalo com nome de aba inexistente volta como 400 da API de valores
+        if getattr(getattr(e, "response", None), "status_code", None) == 400:
+            raise gspread.exceptions.WorksheetNotFound(str(e)) from e
+        raise
+
+    assinatura = _assinatura_projetos(colunas, todos_projetos)
+    if indice.get("assinatura") == assinatura:
+        return indice["projetos"]
+
+    projetos = sorted({proj for proj in todos_projetos if proj.strip().startswith("LCP")})
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump({"assinatura": assinatura, "colunas": colunas, "projetos": projetos}, arquivo, ensure_ascii=False)
+    return projetos
@@ -0,0 +1,134 @@
+"""Versões otimizadas das imagens de assets/, servidas como arquivos estáticos do Streamlit (pasta static/).
+
+Cada imagem usada pela página é reduzida para a largura em que aparece no
+layout (o dobro, para telas de alta densidade) e recomprimida em WebP; os
+fundos ganham também um JPEG, alternativa para navegadores sem WebP. Os
+arquivos vão para static/ com um trecho do hash no nome, então a URL muda
+quando a imagem muda e o navegador pode guardá-los em cache sem risco.
+
+A página referencia os arquivos pela URL (/app/static/...; exige
+server.enableStaticServing no .streamlit/config.toml) em vez de embutir a
+imagem em base64 no CSS de cada execução.
+
+O manifesto static/ativos.json guarda, para cada ativo, a assinatura
+(hash da origem e dos parâmetros), os arquivos gerados e os tamanhos.
+preparar_ativos() só gera o que falta ou cuja origem mudou.
+
+Uso (na raiz do repositório): python ativos.py
+"""
+import hashlib
+import json
+import os
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+PASTA_ORIGEM = os.path.join(RAIZ, "assets")
+PASTA_ESTATICA = os.path.join(RAIZ, "static")
+NOME_MANIFESTO = "ativos.json"
+URL_ESTATICA = "/app/static/"
+
+# nome: (arquivo em assets/, largura máxima em px, formatos gerados)
+ATIVOS = {
+    "fundo_login": ("login_fundo.jpg", 1920, ("webp", "jpeg")),
+    "fundo_principal": ("main_background.png", 1920, ("webp", "jpeg")),
+    "banner": ("banner_votacao.jpg", 500, ("webp",)),  # exibido com 250 px
+    "logo": ("logo_sidebar.png", 640, ("webp",)),  # barra lateral e tela de senha (150 px)
+    "icone": ("logo_sidebar.png", 64, ("png",)),  # ícone da aba do navegador
+}
+OPCOES_FORMATO = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 6},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+    "png": {"format": "PNG", "optimize": True},
+}
+EXTENSOES = {"webp": "webp", "jpeg": "jpg", "png": "png"}
+
+
+def assinatura(caminho_origem, largura, formatos):
+    """Hash do arquivo de origem e dos parâmetros de geração (muda se qualquer um mudar)."""
+    resumo = hashlib.sha256()
+    with open(caminho_origem, "rb") as arquivo:
+        resumo.update(arquivo.read())
+    resumo.update(json.dumps([largura, [OPCOES_FORMATO[formato] for formato in formatos]]).encode())
+    return resumo.hexdigest()[:12]
+
+
+def gerar_ativo(nome, caminho_origem, largura, formatos, destino=PASTA_ESTATICA):
+    """Reduz a imagem para no máximo `largura` px e grava um arquivo por formato; retorna a entrada do manifesto."""
+    from PIL import Image
+
+    marca = assinatura(caminho_origem, largura, formatos)
+    with Image.open(caminho_origem) as original:
+        imagem = original.copy()
+    if imagem.width > largura:
+        imagem = imagem.resize((largura, round(imagem.height * largura / imagem.width)), Image.LANCZOS)
+    arquivos, tamanhos = {}, {}
+    for formato in formatos:
+        arquivo = f"{nome}.{marca}.{EXTENSOES[formato]}"
+        saida = imagem.convert("RGB") if formato == "jpeg" and imagem.mode != "RGB" else imagem
+        saida.save(os.path.join(destino, arquivo), **OPCOES_FORMATO[formato])
+        arquivos[formato] = arquivo
+        tamanhos[formato] = os.path.getsize(os.path.join(destino, arquivo))
+    return {
+        "assinatura": marca, "origem": os.path.basename(caminho_origem), "arquivos": arquivos,
+        "largura": imagem.width, "altura": imagem.height, "bytes": tamanhos,
+    }
+
+
+def ler_manifesto(destino=PASTA_ESTATICA):
+    try:
+        with open(os.path.join(destino, NOME_MANIFESTO), encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def preparar_ativos(origem=PASTA_ORIGEM, destino=PASTA_ESTATICA):
+    """Manifesto dos ativos prontos em `destino`, gerando só os que faltam ou cuja origem mudou.
+
+    Ativos cuja imagem de origem não existe ficam de fora do manifesto (a
+    página segue sem eles). Arquivos de versões anteriores são apagados.
+    """
+    manifesto = ler_manifesto(destino)
+    mudou = False
+    for nome, (arquivo, largura, formatos) in ATIVOS.items():
+        caminho = os.path.join(origem, arquivo)
+        if not os.path.exists(caminho):
+            mudou |= manifesto.pop(nome, None) is not None
+            continue
+        atual = manifesto.get(nome)
+        if (
+            atual is not None and atual["assinatura"] == assinatura(caminho, largura, formatos)
+            and all(os.path.exists(os.path.join(destino, gerado)) for gerado in atual["arquivos"].values())
+        ):
+            continue
+        os.makedirs(destino, exist_ok=True)
+        manifesto[nome] = gerar_ativo(nome, caminho, largura, formatos, destino)
+        mudou = True
+
+    if mudou:
+        with open(os.path.join(destino, NOME_MANIFESTO), "w", encoding="utf-8") as saida:
+            json.dump(manifesto, saida, ensure_ascii=False, indent=2)
+        em_uso = {gerado for entrada in manifesto.values() for gerado in entrada["arquivos"].values()}
+        for arquivo in os.listdir(destino):
+            if arquivo.split(".")[0] in ATIVOS and arquivo not in em_uso:
+                os.remove(os.path.join(destino, arquivo))
+    return manifesto
+
+
+def url_do_ativo(manifesto, nome, formato="webp"):
+    """URL do arquivo estático do ativo (None se ele não foi gerado)."""
+    arquivo = manifesto.get(nome, {}).get("arquivos", {}).get(formato)
+    return URL_ESTATICA + arquivo if arquivo else None
+
+
+def main():
+    manifesto = preparar_ativos()
+    print(f"{'ativo':>16} | {'origem':>20} | {'origem (KB)':>11} | {'dimensões':>10} | gerados (KB)")
+    print("-" * 90)
+    for nome, entrada in manifesto.items():
+        origem_kb = os.path.getsize(os.path.join(PASTA_ORIGEM, entrada["origem"])) / 1024
+        gerados = ", ".join(f"{formato} {tamanho / 1024:.1f}" for formato, tamanho in entrada["bytes"].items())
+        print(f"{nome:>16} | {entrada['origem']:>20} | {origem_kb:>11.1f} | {entrada['largura']:>4}x{entrada['altura']:<5} | {gerados}")
+
+
+if __name__ == "__main__":
+    main()
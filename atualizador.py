@@ -0,0 +1,166 @@
+"""Atualização dos dados da planilha em segundo plano.
+
+Uma única thread por processo recarrega os votos e a lista de projetos em
+intervalos fixos e publica um Retrato novo trocando uma única referência.
+As execuções da página apenas leem o retrato mais recente e não esperam
+pela rede (a não ser na primeira carga do processo, e no máximo
+ESPERA_PRIMEIRO_RETRATO segundos). As cargas rodam sem lock; ele só é
+tomado para trocar o retrato publicado.
+
+O retrato é compartilhado por todas as sessões do processo, junto com os
+índices derivados dos votos (agregados, resumo e posição das linhas de cada
+avaliação). Ninguém deve alterá-lo: filtros sempre geram objetos novos.
+"""
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import pandas as pd
+
+from armazenamento import preparar_votos
+from cache_votos import COLUNAS_AGREGADOS
+from relatorios import ranking_geral, resumo_avaliacoes
+
+ESPERA_PRIMEIRO_RETRATO = 20  # segundos que uma página espera pela primeira carga antes de seguir com o retrato vazio
+
+# Dados publicados pelo atualizador (somente leitura):
+# - votos: DataFrame compacto de todos os votos;
+# - agregados: somas e contagens por (ano, projeto, empresa, categoria);
+# - resumo: uma linha por avaliação, da mais recente para a mais antiga;
+# - linhas_por_avaliacao: id_avaliacao -> posições (iloc) das linhas dessa avaliação em `votos`;
+# - ranking: ranking_geral dos agregados (calculado aqui para não repetir os agrupamentos a cada execução);
+# - erros: última falha de cada carga ("votos", "projetos"); quando uma carga falha, os dados anteriores continuam.
+Retrato = namedtuple(
+    "Retrato", ["versao", "votos", "agregados", "resumo", "linhas_por_avaliacao", "ranking", "projetos", "atualizado_em", "erros"]
+)
+
+
+def indices_dos_votos(votos, agregados):
+    """Campos do retrato que dependem dos votos: calculados uma vez por versão, não uma vez por sessão."""
+    return {
+        "votos": votos,
+        "agregados": agregados,
+        "resumo": resumo_avaliacoes(votos),
+        "linhas_por_avaliacao": votos.groupby('id_avaliacao', observed=True).indices if not votos.empty else {},
+        "ranking": ranking_geral(agregados),
+    }
+
+
+RETRATO_VAZIO = Retrato(
+    versao=0, projetos=[], atualizado_em=None, erros={},
+    **indices_dos_votos(preparar_votos(pd.DataFrame()), pd.DataFrame(columns=COLUNAS_AGREGADOS)),
+)
+
+
+class AtualizadorDados:
+    """Thread que mantém o retrato dos votos e dos projetos atualizado a partir de um backend (ver backends.py)."""
+
+    def __init__(self, backend, intervalo_votos=60, intervalo_projetos=600, ao_recarregar=None):
+        self._backend = backend
+        self.intervalo_votos = intervalo_votos
+        self.intervalo_projetos = intervalo_projetos
+        self._ao_recarregar = ao_recarregar or (lambda nome: None)
+
+        self._retrato = RETRATO_VAZIO
+        self._votos_carregados = False
+        self._proximo_votos = self._proximo_projetos = 0
+        self._lock = threading.Lock()  # só para trocar o retrato
+        self._cargas_de_votos = 0  # numera as cargas, para uma carga mais antiga não sobrescrever uma mais nova
+        self._carga_publicada = 0
+        self._pronto = threading.Event()
+        self._acordar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="atualizador-dados", daemon=True)
+        self._thread.start()
+
+    @property
+    def retrato(self):
+        """Retrato mais recente; nunca bloqueia."""
+        return self._retrato
+
+    @property
+    def carregado(self):
+        """Se a primeira carga do processo já terminou (com sucesso ou erro)."""
+        return self._pronto.is_set()
+
+    def aguardar_primeiro_retrato(self, timeout=ESPERA_PRIMEIRO_RETRATO):
+        """Bloqueia até a primeira carga do processo terminar ou o tempo acabar (ver `carregado`)."""
+        self._pronto.wait(timeout)
+        return self._retrato
+
+    def atualizar_votos(self):
+        """Recarrega os votos imediatamente, na thread de quem chamou (usado logo após um salvamento)."""
+        self._atualizar_votos(forcar=True)
+        return self._retrato
+
+    def solicitar_atualizacao(self):
+        """Pede à thread para recarregar tudo na próxima volta, sem esperar."""
+        self._proximo_votos = self._proximo_projetos = 0
+        self._acordar.set()
+
+    # --- CARGAS ---
+    def _atualizar_votos(self, forcar=False):
+        with self._lock:
+            self._cargas_de_votos += 1
+            carga = self._cargas_de_votos
+        try:
+            marca_antes = self._backend.marca
+            tipo = self._backend.sincronizar()
+            self._ao_recarregar(f"votos ({tipo})")
+            # Nada de novo na planilha: o retrato atual continua valendo
+            if not forcar and self._votos_carregados and tipo in ("incremental", "local") and self._backend.marca == marca_antes:
+                return
+            indices = indices_dos_votos(preparar_votos(self._backend.votos()), self._backend.agregados())
+            self._publicar(indices=indices, erro=("votos", None), carga=carga)
+            self._votos_carregados = True
+        except Exception as e:
+            self._publicar(erro=("votos", e), carga=carga)
+
+    def _atualizar_projetos(self):
+        try:
+            projetos = self._backend.projetos()
+            self._ao_recarregar("projetos")
+            self._publicar(projetos=projetos, erro=("projetos", None))
+        except Exception as e:
+            self._publicar(erro=("projetos", e))
+
+    def _publicar(self, indices=None, projetos=None, erro=None, carga=None):
+        """Monta o retrato novo a partir do atual e troca a referência de uma vez.
+
+        `carga` é o número da carga de votos; se uma carga iniciada depois já
+        publicou, esta chegou atrasada e é descartada.
+        """
+        with self._lock:
+            if carga is not None:
+                if carga < self._carga_publicada:
+                    return
+                self._carga_publicada = carga
+            atual = self._retrato
+            erros = dict(atual.erros)
+            if erro is not None:
+                nome, excecao = erro
+                if excecao is None:
+                    erros.pop(nome, None)
+                else:
+                    erros[nome] = excecao
+            self._retrato = atual._replace(
+                versao=atual.versao + (indices is not None or projetos is not None),
+                projetos=atual.projetos if projetos is None else projetos,
+                atualizado_em=datetime.now(),
+                erros=erros,
+                **(indices or {}),
+            )
+
+    def _executar(self):
+        while True:
+            if time.monotonic() >= self._proximo_votos:
+                self._atualizar_votos()
+                self._proximo_votos = time.monotonic() + self.intervalo_votos
+            if time.monotonic() >= self._proximo_projetos:
+                self._atualizar_projetos()
+                self._proximo_projetos = time.monotonic() + self.intervalo_projetos
+            self._pronto.set()
+
+            espera = min(self._proximo_votos, self._proximo_projetos) - time.monotonic()
+            self._acordar.wait(max(espera, 0))
+            self._acordar.clear()
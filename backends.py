@@ -0,0 +1,235 @@
+"""Backends de armazenamento dos votos: Google Sheets ou SQLite local.
+
+Os dois usam a mesma base SQLite indexada (CacheVotos) para leitura e
+consultas. No Google Sheets ela é um espelho da primeira aba da planilha,
+atualizado de forma incremental; no SQLite ela é o próprio armazenamento e
+funciona sem rede (testes e instalações locais).
+
+Excluir uma avaliação grava só uma lápide; as leituras já a ignoram. Quando
+as lápides passam de LIMIAR_COMPACTACAO, o armazenamento é compactado
+(regravado apenas com os votos ativos).
+"""
+import os
+import threading
+from datetime import datetime
+
+from armazenamento import (
+    ABA_EXCLUSOES, CAMINHO_INDICE_PROJETOS, COLUNAS_EXCLUSOES, COLUNAS_VOTOS, abrir_aba_de_exclusoes, acrescentar_votos,
+    carregar_indice_projetos, ler_votos_e_exclusoes, linhas_para_planilha, regravar_abas, registrar_exclusoes, votos_como_texto,
+)
+
+# Avaliações excluídas (lápides) acumuladas antes de regravar o armazenamento sem elas
+LIMIAR_COMPACTACAO = 50
+# Projetos do backend SQLite: um por linha (ver ler_arquivo_de_projetos)
+CAMINHO_PROJETOS_LOCAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "projetos.txt")
+
+
+class ArmazenamentoAlterado(RuntimeError):
+    """O armazenamento recebeu linhas durante a compactação; nada foi regravado."""
+
+
+class BackendVotos:
+    """Interface comum. As leituras e consultas vêm da base local `banco` (CacheVotos)."""
+
+    nome = ""
+
+    def __init__(self, banco, limiar_compactacao=LIMIAR_COMPACTACAO):
+        self.banco = banco
+        self.limiar_compactacao = limiar_compactacao
+
+    # --- OPERAÇÕES DE CADA BACKEND ---
+    def sincronizar(self):
+        """Traz as novidades do armazenamento para a base local; retorna o tipo de leitura feita."""
+        raise NotImplementedError
+
+    def acrescentar(self, df_novos_votos):
+        """Grava as linhas de uma nova avaliação."""
+        raise NotImplementedError
+
+    def excluir_avaliacoes(self, ids_avaliacao):
+        """Registra a exclusão (lápide) das avaliações informadas (ids como datas)."""
+        raise NotImplementedError
+
+    def compactar(self):
+        """Regrava o armazenamento sem as avaliações excluídas e descarta as lápides."""
+        raise NotImplementedError
+
+    def apagar_tudo(self):
+        raise NotImplementedError
+
+    def projetos(self):
+        """Lista ordenada dos projetos LCP disponíveis para avaliação."""
+        raise NotImplementedError
+
+    def compactar_se_preciso(self):
+        if self.banco.situacao_exclusoes()["avaliacoes"] < self.limiar_compactacao:
+            return False
+        try:
+            self.compactar()
+        except ArmazenamentoAlterado:
+            return False  # outro processo gravou no meio; a compactação fica para a próxima exclusão
+        return True
+
+    # --- LEITURAS E CONSULTAS (BASE LOCAL) ---
+    @property
+    def marca(self):
+        """Muda quando a base local recebe linhas ou exclusões."""
+        return self.banco.marca
+
+    def situacao_exclusoes(self):
+        return self.banco.situacao_exclusoes()
+
+    def votos(self):
+        """Todos os votos, como texto, na ordem de gravação."""
+        return self.banco.dataframe()
+
+    def agregados(self):
+        return self.banco.agregados()
+
+    def avaliacoes_gravadas(self, ids_avaliacao):
+        """Quais dos ids informados já estão na base local (consultar depois de sincronizar)."""
+        return self.banco.avaliacoes_gravadas(ids_avaliacao)
+
+    def lotes_de_votos(self, **filtros):
+        return self.banco.lotes_de_votos(**filtros)
+
+    def avaliacoes_do_usuario(self, user_name):
+        return self.banco.avaliacoes_do_usuario(user_name)
+
+    def medias(self, anos=None, projetos=None, empresas=None):
+        return self.banco.medias(anos, projetos, empresas)
+
+
+class BackendGoogleSheets(BackendVotos):
+    """Votos na primeira aba da planilha e projetos nas abas 'Capex' e 'AME - Quarterly'.
+
+    As abas de votos e de exclusões são localizadas uma vez (uma leitura dos
+    metadados da planilha) e reaproveitadas; se uma chamada falhar, são
+    localizadas de novo na próxima. Cada sincronização é uma única leitura
+    (votos e lápides juntos) e cada gravação, uma única escrita.
+
+    As escritas do processo (fila de gravação, exclusões, compactação) passam
+    por um mesmo lock, então nenhuma gravação local cai no meio de uma
+    compactação. Gravações de outros processos são detectadas relendo o fim
+    das abas logo antes de regravá-las (ver compactar).
+    """
+
+    nome = "google_sheets"
+
+    def __init__(self, spreadsheet, banco, caminho_indice_projetos=CAMINHO_INDICE_PROJETOS, limiar_compactacao=LIMIAR_COMPACTACAO):
+        super().__init__(banco, limiar_compactacao)
+        self.spreadsheet = spreadsheet
+        self.caminho_indice_projetos = caminho_indice_projetos
+        self._abas = None
+        self._escrita = threading.RLock()
+
+    def _abas_de_votos_e_exclusoes(self):
+        if self._abas is None:
+            abas = self.spreadsheet.worksheets()
+            exclusoes = next((aba for aba in abas if aba.title == ABA_EXCLUSOES), None) or abrir_aba_de_exclusoes(self.spreadsheet)
+            self._abas = (abas[0], exclusoes)
+        return self._abas
+
+    @property
+    def worksheet(self):
+        return self._abas_de_votos_e_exclusoes()[0]
+
+    def _chamar(self, operacao, *args):
+        try:
+            return operacao(*args)
+        except Exception:
+            self._abas = None  # aba renomeada, apagada ou reordenada: localiza de novo na próxima chamada
+            raise
+
+    def sincronizar(self):
+        def ler(intervalo_votos, inicio_exclusoes):
+            return ler_votos_e_exclusoes(self.spreadsheet, self.worksheet.title, intervalo_votos, inicio_exclusoes)
+
+        return self._chamar(self.banco.sincronizar, ler)
+
+    def acrescentar(self, df_novos_votos):
+        # A base local recebe as linhas na próxima sincronização (incremental)
+        with self._escrita:
+            return self._chamar(lambda: acrescentar_votos(self.worksheet, df_novos_votos, self.banco.cabecalho))
+
+    def excluir_avaliacoes(self, ids_avaliacao):
+        # A base local recebe a lápide na sincronização, junto com as de outros processos
+        with self._escrita:
+            self._chamar(lambda: registrar_exclusoes(self._abas_de_votos_e_exclusoes()[1], ids_avaliacao, datetime.now()))
+            self.sincronizar()
+            self.compactar_se_preciso()
+
+    def compactar(self):
+        """Regrava as abas só com os votos ativos; levanta ArmazenamentoAlterado se outro processo gravou no meio.
+
+        Limpar e regravar não é atômico na API. Logo antes de regravar, o fim
+        das duas abas é lido de novo: linhas de votos ou lápides que chegaram
+        depois da sincronização seriam apagadas, então a compactação é
+        abandonada. Resta só a janela entre essa leitura e a limpeza.
+        """
+        with self._escrita:
+            self.sincronizar()
+            cabecalho = self.banco.cabecalho or COLUNAS_VOTOS
+            linhas_por_aba = {
+                self.worksheet.title: [cabecalho] + linhas_para_planilha(self.banco.dataframe(), cabecalho),
+                ABA_EXCLUSOES: [COLUNAS_EXCLUSOES],
+            }
+            # A última linha conhecida é a (linhas_lidas + 1) da aba; qualquer valor abaixo dela é novo
+            novas, lapides = self._chamar(
+                ler_votos_e_exclusoes, self.spreadsheet, self.worksheet.title,
+                f"A{self.banco.linhas_lidas + 2}:A", self.banco.exclusoes_lidas,
+            )
+            if novas or lapides:
+                raise ArmazenamentoAlterado(
+                    "A planilha recebeu gravações durante a compactação; nada foi regravado. Tente de novo."
+                )
+            self._chamar(regravar_abas, self.spreadsheet, linhas_por_aba)
+            self.banco.compactar()
+
+    def apagar_tudo(self):
+        with self._escrita:
+            self._chamar(lambda: regravar_abas(self.spreadsheet, {self.worksheet.title: [COLUNAS_VOTOS], ABA_EXCLUSOES: [COLUNAS_EXCLUSOES]}))
+
+    def projetos(self):
+        return carregar_indice_projetos(self.spreadsheet, self.caminho_indice_projetos)
+
+
+def ler_arquivo_de_projetos(caminho=CAMINHO_PROJETOS_LOCAL):
+    """Projetos listados no arquivo, um por linha (linhas vazias e iniciadas por # são ignoradas); None se ele não existe."""
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            return [linha.strip() for linha in arquivo if linha.strip() and not linha.lstrip().startswith("#")]
+    except FileNotFoundError:
+        return None
+
+
+class BackendSQLite(BackendVotos):
+    """Tudo na base local: não há o que sincronizar e as gravações são transações SQLite."""
+
+    nome = "sqlite"
+
+    def __init__(self, banco, projetos=None, limiar_compactacao=LIMIAR_COMPACTACAO):
+        super().__init__(banco, limiar_compactacao)
+        self._projetos = sorted(projetos) if projetos else None
+
+    def sincronizar(self):
+        return "local"
+
+    def acrescentar(self, df_novos_votos):
+        return self.banco.acrescentar_linhas(votos_como_texto(df_novos_votos))
+
+    def excluir_avaliacoes(self, ids_avaliacao):
+        self.banco.aplicar_exclusoes(ids_avaliacao)
+        self.compactar_se_preciso()
+
+    def compactar(self):
+        self.banco.compactar()
+
+    def apagar_tudo(self):
+        self.banco.limpar()
+
+    def projetos(self):
+        """Projetos configurados ou, sem configuração, os projetos que já têm votos."""
+        if self._projetos is not None:
+            return self._projetos
+        return [projeto for projeto in self.banco.valores_distintos("projeto") if projeto.strip().startswith("LCP")]
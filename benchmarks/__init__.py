@@ -0,0 +1 @@
+"""Medições de desempenho da aplicação. Rode os scripts com `python -m benchmarks.<nome>` na raiz do repositório."""
@@ -0,0 +1,152 @@
+"""API do Google Sheets em memória: uma requests.Session que responde às URLs chamadas pelo gspread.
+
+Os dados ficam em uma PlanilhaFalsa (benchmarks/planilha_falsa.py); a sessão
+traduz as chamadas REST (metadados, values.get, values:batchGet, append,
+values:batchClear, values:batchUpdate e addSheet) para ela. Assim o
+gspread, o ClienteHTTP (cliente_sheets.py) e os backends rodam inteiros,
+sem rede.
+
+A sessão imita também a cota por minuto da API: passando do limite de
+leituras ou de escritas na janela, responde 429 como a API real. Os hooks
+de resposta da sessão são chamados, como em uma sessão de verdade (é por
+eles que o Medidor conta as chamadas).
+"""
+import json
+import re
+import threading
+import time
+from collections import Counter, deque
+from urllib.parse import unquote, urlparse
+
+import requests
+from requests.hooks import dispatch_hook
+
+from benchmarks.planilha_falsa import AbaFalsa
+
+_URL_SHEETS = re.compile(r"^/v4/spreadsheets/(?P<id>[^/:]+)(?P<resto>.*)$")
+
+
+class SessaoSheetsFalsa(requests.Session):
+    """Sessão HTTP que atende a API do Sheets a partir da `planilha` (PlanilhaFalsa)."""
+
+    def __init__(self, planilha, id_planilha="planilha-falsa", limite_leituras=None, limite_escritas=None, janela=60.0, latencia=0.0):
+        super().__init__()
+        self.planilha = planilha
+        self.id_planilha = id_planilha
+        self.limites = {"leitura": limite_leituras, "escrita": limite_escritas}
+        self.janela = janela
+        self.latencia = latencia
+        self.chamadas = Counter()
+        self.respostas_429 = 0
+        self._momentos = {"leitura": deque(), "escrita": deque()}
+        self._lock = threading.Lock()
+
+    def request(self, method, url, params=None, data=None, headers=None, files=None, json=None, timeout=None, **kwargs):
+        method = method.upper()
+        pedido = requests.Request(method, url, params=params, json=json).prepare()
+        if self.latencia:
+            time.sleep(self.latencia)
+        if self._acima_da_cota("leitura" if method == "GET" else "escrita"):
+            self.respostas_429 += 1
+            resposta = self._resposta(pedido, 429, {"error": {
+                "code": 429, "status": "RESOURCE_EXHAUSTED",
+                "message": "Quota exceeded for quota metric 'Requests' and limit 'Requests per minute per user'",
+            }})
+        else:
+            try:
+                resposta = self._resposta(pedido, 200, self._atender(method, url, params or {}, json or {}))
+            except LookupError as e:
+                resposta = self._resposta(pedido, 400, {"error": {"code": 400, "status": "INVALID_ARGUMENT", "message": str(e)}})
+        return dispatch_hook("response", self.hooks, resposta)
+
+    def _acima_da_cota(self, tipo):
+        limite = self.limites[tipo]
+        if limite is None:
+            return False
+        with self._lock:
+            agora = time.monotonic()
+            momentos = self._momentos[tipo]
+            while momentos and momentos[0] <= agora - self.janela:
+                momentos.popleft()
+            if len(momentos) >= limite:
+                return True
+            momentos.append(agora)
+            return False
+
+    @staticmethod
+    def _resposta(pedido, status, corpo):
+        resposta = requests.Response()
+        resposta.status_code = status
+        resposta._content = json.dumps(corpo).encode("utf-8")
+        resposta.headers["Content-Type"] = "application/json"
+        resposta.url = pedido.url
+        resposta.request = pedido
+        return resposta
+
+    # --- ROTAS ---
+    def _atender(self, method, url, params, corpo):
+        caminho = urlparse(url).path
+        rota = _URL_SHEETS.match(caminho)
+        if rota is None or rota.group("id") != self.id_planilha:
+            raise LookupError(f"URL desconhecida: {method} {url}")
+        resto = rota.group("resto")
+
+        if resto == "" and method == "GET":
+            self.chamadas["spreadsheets.get"] += 1
+            return self._metadados()
+        if resto == ":batchUpdate":
+            self.chamadas["spreadsheets.batchUpdate"] += 1
+            return {"replies": [self._pedido_de_atualizacao(pedido) for pedido in corpo["requests"]]}
+        if resto == "/values:batchGet":
+            self.chamadas["values.batchGet"] += 1
+            ranges = params["ranges"] if isinstance(params["ranges"], list) else [params["ranges"]]
+            return self.planilha.values_batch_get(ranges, params)
+        if resto == "/values:batchClear":
+            self.chamadas["values.batchClear"] += 1
+            self.planilha.values_batch_clear(body=corpo)
+            return {"spreadsheetId": self.id_planilha, "clearedRanges": corpo["ranges"]}
+        if resto == "/values:batchUpdate":
+            self.chamadas["values.batchUpdate"] += 1
+            self.planilha.values_batch_update(body=corpo)
+            return {"spreadsheetId": self.id_planilha, "totalUpdatedRows": sum(len(dados["values"]) for dados in corpo["data"])}
+
+        intervalo = unquote(resto[len("/values/"):]) if resto.startswith("/values/") else None
+        if intervalo is None:
+            raise LookupError(f"URL desconhecida: {method} {url}")
+        if intervalo.endswith(":append"):
+            self.chamadas["values.append"] += 1
+            aba, _ = self.planilha.aba_e_intervalo(intervalo[:-len(":append")])
+            aba.append_rows(corpo["values"])
+            return {"spreadsheetId": self.id_planilha, "updates": {"updatedRows": len(corpo["values"])}}
+        if intervalo.endswith(":clear"):
+            self.chamadas["values.clear"] += 1
+            aba, _ = self.planilha.aba_e_intervalo(intervalo[:-len(":clear")])
+            aba.clear()
+            return {"spreadsheetId": self.id_planilha}
+        self.chamadas["values.get"] += 1
+        (resposta,) = self.planilha.values_batch_get([intervalo], params)["valueRanges"]
+        return resposta
+
+    def _metadados(self):
+        return {
+            "spreadsheetId": self.id_planilha,
+            "properties": {"title": "Planilha falsa", "locale": "pt_BR", "timeZone": "America/Sao_Paulo"},
+            "sheets": [
+                {"properties": {
+                    "sheetId": indice, "title": aba.title, "index": indice, "sheetType": "GRID",
+                    "gridProperties": {"rowCount": max(len(aba.valores), 1000), "columnCount": 26},
+                }}
+                for indice, aba in enumerate(self.planilha.abas)
+            ],
+        }
+
+    def _pedido_de_atualizacao(self, pedido):
+        if "addSheet" not in pedido:
+            raise LookupError(f"Pedido de batchUpdate não suportado: {list(pedido)}")
+        titulo = pedido["addSheet"]["properties"]["title"]
+        self.planilha.abas.append(AbaFalsa(titulo))
+        indice = len(self.planilha.abas) - 1
+        return {"addSheet": {"properties": {
+            "sheetId": indice, "title": titulo, "index": indice, "sheetType": "GRID",
+            "gridProperties": {"rowCount": 1000, "columnCount": 26},
+        }}}
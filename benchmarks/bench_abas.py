@@ -0,0 +1,162 @@
+"""Tempo de cada etapa da página, por tamanho do histórico, com votos sintéticos e a planilha em memória.
+
+Etapas medidas (o mesmo código que a aplicação executa):
+- carga completa: a aba de votos inteira copiada para a base local (primeira carga do processo);
+- carga incremental: uma avaliação nova acrescentada à aba e sincronizada;
+- conversão: base local -> DataFrame compacto (preparar_votos);
+- índices do retrato: agregados, resumo e linhas de cada avaliação;
+- ranking: aba 🏆 RANKING;
+- médias: aba 📊 RELATÓRIO DE MÉDIAS (consulta filtrada + tabela pivot);
+- projetos avaliados: filtro e primeira página da lista de avaliações;
+- admin: detalhe de uma avaliação + lista de avaliações de um avaliador.
+
+Cada etapa roda `--repeticoes` vezes e a mediana é informada (as cargas
+completas rodam uma vez). Com --csv, os resultados são acrescentados ao
+arquivo junto com o commit atual; com --base <commit>, a tabela mostra
+também a razão em relação ao resultado daquele commit no mesmo arquivo.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.bench_abas [--tamanhos 1000 10000 100000 1000000] [--repeticoes 5] [--csv resultados.csv] [--base abc1234]
+"""
+import argparse
+import csv
+import os
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from armazenamento import COLUNAS_VOTOS, preparar_votos
+from atualizador import indices_dos_votos
+from backends import BackendGoogleSheets
+from benchmarks.gerador import gerar_votos
+from benchmarks.planilha_falsa import planilha_com_votos
+from cache_votos import CacheVotos
+from constantes import PERGUNTAS
+from relatorios import filtrar_resumo, paginar, ranking_geral
+
+TAMANHOS_PADRAO = [1_000, 10_000, 100_000, 1_000_000]
+COLUNAS_CSV = ["commit", "data", "etapa", "linhas", "segundos"]
+
+
+def commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def mediana(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def medir_tamanho(n_linhas, repeticoes, pasta_temporaria):
+    """Tempos (segundos) de cada etapa para um histórico de `n_linhas` votos."""
+    votos_brutos = gerar_votos(n_linhas)
+    planilha = planilha_com_votos(votos_brutos)
+    backend = BackendGoogleSheets(planilha, CacheVotos(":memory:"), caminho_indice_projetos=os.path.join(pasta_temporaria, f"projetos_{n_linhas}.json"))
+    tempos = {}
+
+    tempos["carga completa"] = mediana(backend.sincronizar, 1)
+
+    # Uma avaliação nova (uma linha por pergunta) no fim da aba, como o formulário grava
+    n_perguntas = sum(len(perguntas) for perguntas in PERGUNTAS.values())
+    nova = gerar_votos(n_perguntas, semente=n_linhas)
+    nova['id_avaliacao'] = str(pd.Timestamp.now(tz="America/Sao_Paulo"))
+    planilha.get_worksheet(0).valores.extend(nova[COLUNAS_VOTOS].astype(str).values.tolist())
+    tempos["carga incremental"] = mediana(backend.sincronizar, 1)
+
+    brutos = backend.votos()
+    votos = preparar_votos(brutos)
+    tempos["conversão"] = mediana(lambda: preparar_votos(brutos), repeticoes)
+
+    agregados = backend.agregados()
+    indices = indices_dos_votos(votos, agregados)
+    tempos["índices do retrato"] = mediana(lambda: indices_dos_votos(votos, agregados), repeticoes)
+
+    tempos["ranking"] = mediana(lambda: ranking_geral(agregados), repeticoes)
+
+    anos = sorted(agregados['ano_avaliacao'].unique().tolist())[-2:]
+
+    def medias():
+        media_por_categoria = backend.medias(anos=anos)
+        media_por_categoria.pivot_table(index='empresa', columns='categoria', values='media_avaliacao').round(2)
+
+    tempos["médias"] = mediana(medias, repeticoes)
+
+    resumo = indices["resumo"]
+    tempos["projetos avaliados"] = mediana(lambda: paginar(filtrar_resumo(resumo, busca="LCP-10", anos=anos), 1, 25), repeticoes)
+
+    id_avaliacao = resumo['id_avaliacao'].iloc[0]
+    avaliador = resumo['user_name'].iloc[0]
+
+    def admin():
+        votos.iloc[indices["linhas_por_avaliacao"][id_avaliacao]]
+        backend.avaliacoes_do_usuario(avaliador)
+
+    tempos["admin"] = mediana(admin, repeticoes)
+    return tempos
+
+
+def ler_base(caminho, commit):
+    """Resultados de um commit anterior gravados no CSV: {(etapa, linhas): segundos}."""
+    if not caminho or not commit or not os.path.exists(caminho):
+        return {}
+    with open(caminho, newline="", encoding="utf-8") as arquivo:
+        return {
+            (linha["etapa"], int(linha["linhas"])): float(linha["segundos"])
+            for linha in csv.DictReader(arquivo) if linha["commit"] == commit
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_PADRAO)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--csv", help="arquivo onde os resultados são acrescentados")
+    parser.add_argument("--base", help="commit (já gravado no --csv) para comparar")
+    args = parser.parse_args()
+
+    base = ler_base(args.csv, args.base)
+    commit = commit_atual()
+    resultados = {}
+    pasta_temporaria = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".cache", "benchmarks")
+    os.makedirs(pasta_temporaria, exist_ok=True)
+    for n_linhas in args.tamanhos:
+        resultados[n_linhas] = medir_tamanho(n_linhas, args.repeticoes, pasta_temporaria)
+
+    etapas = list(next(iter(resultados.values())))
+    print(f"commit {commit or '?'} — tempos em ms (mediana de {args.repeticoes})" + (f", entre parênteses a razão em relação a {args.base}" if base else ""))
+    print(f"{'etapa':>20} | " + " | ".join(f"{n:>18,}" for n in args.tamanhos))
+    print("-" * (23 + 21 * len(args.tamanhos)))
+    for etapa in etapas:
+        celulas = []
+        for n_linhas in args.tamanhos:
+            segundos = resultados[n_linhas][etapa]
+            celula = f"{segundos * 1000:.1f}"
+            if (etapa, n_linhas) in base:
+                celula += f" ({segundos / base[(etapa, n_linhas)]:.2f}x)"
+            celulas.append(f"{celula:>18}")
+        print(f"{etapa:>20} | " + " | ".join(celulas))
+
+    if args.csv:
+        novo = not os.path.exists(args.csv)
+        with open(args.csv, "a", newline="", encoding="utf-8") as arquivo:
+            escritor = csv.writer(arquivo)
+            if novo:
+                escritor.writerow(COLUNAS_CSV)
+            data = datetime.now().isoformat(timespec="seconds")
+            for n_linhas, tempos in resultados.items():
+                for etapa, segundos in tempos.items():
+                    escritor.writerow([commit, data, etapa, n_linhas, f"{segundos:.6f}"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Bytes enviados ao navegador a cada execução da página e tempo da execução, por tela do Avaliacao.py.
+
+Cada tela roda pelo AppTest do Streamlit e é reexecutada como acontece a
+cada interação. Os bytes são os das mensagens (protobuf) de todos os
+elementos desenhados, que o servidor reenvia ao navegador a cada execução;
+imagens servidas por URL (arquivos estáticos) entram só com o endereço e
+são baixadas uma vez, com cache do navegador.
+
+Telas: a de senha, a do nome do avaliador (com o fundo de login) e a
+página principal (com o fundo principal, banner e logo; backend SQLite vazio).
+
+Com --raiz, mede outra cópia do repositório (por exemplo, um `git worktree`
+de um commit anterior), para comparar.
+
+Uso (na raiz do repositório): python -m benchmarks.bench_ativos [--repeticoes 20] [--raiz CAMINHO]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from streamlit.testing.v1 import AppTest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bytes_dos_elementos(no):
+    """Tamanho serializado do elemento e de todos os filhos."""
+    proto = getattr(no, "proto", None)
+    tamanho = len(proto.SerializeToString()) if proto is not None else 0
+    return tamanho + sum(bytes_dos_elementos(filho) for filho in getattr(no, "children", {}).values())
+
+
+def telas():
+    caminho_sqlite = os.path.join(tempfile.mkdtemp(), "votos.sqlite")
+    return {
+        "senha": {},
+        "nome do avaliador": {"password_correct": True},
+        "página principal": {"password_correct": True, "user_name": "AVALIADOR DE TESTE", "is_admin": False, "_sqlite": caminho_sqlite},
+    }
+
+
+def medir(raiz, estado, repeticoes):
+    at = AppTest.from_file(os.path.join(raiz, "Avaliacao.py"), default_timeout=120)
+    for chave, valor in estado.items():
+        if chave == "_sqlite":
+            at.secrets["backend_votos"] = "sqlite"
+            at.secrets["caminho_sqlite"] = valor
+        else:
+            at.session_state[chave] = valor
+    at.run()  # primeira execução: importações e caches
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        at.run()
+        tempos.append(time.perf_counter() - inicio)
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return bytes_dos_elementos(at.main) + bytes_dos_elementos(at.sidebar), statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--raiz", default=RAIZ, help="cópia do repositório a medir (padrão: esta)")
+    args = parser.parse_args()
+    raiz = os.path.abspath(args.raiz)
+    sys.path.insert(0, raiz)
+    os.chdir(raiz)
+
+    print(f"Execuções de {os.path.join(raiz, 'Avaliacao.py')} (mediana de {args.repeticoes} reexecuções)")
+    print(f"{'tela':>18} | {'bytes por execução':>18} | {'execução (ms)':>13}")
+    print("-" * 55)
+    for nome, estado in telas().items():
+        tamanho, tempo = medir(raiz, estado, args.repeticoes)
+        print(f"{nome:>18} | {tamanho:>18,} | {tempo * 1000:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Chamadas à API por operação do backend Google Sheets e comportamento sob a cota por minuto.
+
+Tudo roda com o gspread de verdade, através do ClienteHTTP (cliente_sheets.py),
+contra a API em memória (benchmarks/api_sheets_falsa.py):
+
+1. quantas chamadas cada operação do backend faz (sincronizar, gravar uma
+   avaliação como a fila de gravação faz, excluir, compactar);
+2. várias threads sincronizando ao mesmo tempo contra uma API que responde
+   429 acima de --limite chamadas por --janela segundos: com a cota do
+   cliente igual ao limite (espera antes de chamar) e sem cota no cliente
+   (só as novas tentativas depois do 429).
+
+Uso (na raiz do repositório):
+    python -m benchmarks.bench_cliente_sheets [--linhas 20000] [--threads 4] [--sincronizacoes 15] [--limite 20] [--janela 2]
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+
+from backends import BackendGoogleSheets
+from benchmarks.api_sheets_falsa import SessaoSheetsFalsa
+from benchmarks.gerador import gerar_votos
+from benchmarks.planilha_falsa import planilha_com_votos
+from cache_votos import CacheVotos
+from cliente_sheets import conectar
+from constantes import PERGUNTAS
+
+
+def abrir(planilha, opcoes_api=None, opcoes_cliente=None):
+    """Sessão da API em memória e a planilha aberta pelo gspread através do ClienteHTTP."""
+    sessao = SessaoSheetsFalsa(planilha, **(opcoes_api or {}))
+    return sessao, conectar(None, sessao=sessao, **(opcoes_cliente or {})).open_by_key(sessao.id_planilha)
+
+
+def chamadas_por_operacao(n_linhas):
+    df = gerar_votos(n_linhas)
+    sessao, spreadsheet = abrir(planilha_com_votos(df))
+    backend = BackendGoogleSheets(spreadsheet, CacheVotos(":memory:"), caminho_indice_projetos=":memory:", limiar_compactacao=10**9)
+    n_perguntas = sum(len(perguntas) for perguntas in PERGUNTAS.values())
+
+    def nova_avaliacao():
+        nova = gerar_votos(n_perguntas, semente=int(time.time_ns() % 10**6))
+        nova['id_avaliacao'] = str(pd.Timestamp.now(tz="America/Sao_Paulo"))
+        return nova
+
+    def gravar_como_a_fila():
+        nova = nova_avaliacao()
+        backend.sincronizar()
+        backend.avaliacoes_gravadas(pd.to_datetime(nova['id_avaliacao'].unique()))
+        backend.acrescentar(nova)
+        backend.sincronizar()  # atualização do retrato depois da gravação
+
+    ids = pd.to_datetime(df['id_avaliacao'].unique())
+    operacoes = [
+        ("primeira sincronização (completa)", backend.sincronizar),
+        ("sincronização sem novidades", backend.sincronizar),
+        ("gravação de uma avaliação (fila)", gravar_como_a_fila),
+        ("exclusão de uma avaliação", lambda: backend.excluir_avaliacoes([ids[0]])),
+        ("compactação", backend.compactar),
+    ]
+    print(f"Chamadas à API por operação ({n_linhas:,} votos)")
+    for nome, operacao in operacoes:
+        antes = Counter(sessao.chamadas)
+        operacao()
+        diferenca = Counter(sessao.chamadas)
+        diferenca.subtract(antes)
+        detalhes = ", ".join(f"{chave} {n}" for chave, n in diferenca.items() if n)
+        print(f"  {nome:<36} {sum(diferenca.values()):>3}  ({detalhes})")
+
+
+def sob_cota(n_linhas, n_threads, sincronizacoes, limite, janela):
+    df = gerar_votos(n_linhas)
+    print(f"\n{n_threads} threads x {sincronizacoes} sincronizações; a API aceita {limite} leituras a cada {janela:g} s")
+    print(f"{'cliente':>22} | {'tempo (s)':>9} | {'429 da API':>10} | {'novas tentativas':>16} | {'espera cota (s)':>15} | {'falhas':>6}")
+    print("-" * 94)
+    for nome, cota in (("com cota (= limite)", limite), ("sem cota (só backoff)", 10**9)):
+        planilha = planilha_com_votos(df)
+        sessao, spreadsheet = abrir(
+            planilha,
+            opcoes_api={"limite_leituras": limite, "janela": janela},
+            opcoes_cliente={"cota_leituras": cota, "janela": janela, "espera_inicial": janela / 8, "espera_maxima": janela * 4},
+        )
+        backends = [BackendGoogleSheets(spreadsheet, CacheVotos(":memory:"), caminho_indice_projetos=":memory:") for _ in range(n_threads)]
+        falhas = []
+
+        def sincronizar(backend):
+            for _ in range(sincronizacoes):
+                try:
+                    backend.sincronizar()
+                except Exception as e:
+                    falhas.append(e)
+
+        time.sleep(janela)  # janela da API livre da abertura da planilha
+        inicio = time.perf_counter()
+        threads = [threading.Thread(target=sincronizar, args=(backend,)) for backend in backends]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        tempo = time.perf_counter() - inicio
+        (leitura,) = [linha for linha in spreadsheet.client.situacao() if linha["tipo"] == "leitura"]
+        print(
+            f"{nome:>22} | {tempo:>9.1f} | {sessao.respostas_429:>10} | {leitura['novas tentativas']:>16} | "
+            f"{leitura['espera pela cota (s)']:>15.1f} | {len(falhas):>6}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=20_000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--sincronizacoes", type=int, default=15)
+    parser.add_argument("--limite", type=int, default=20, help="leituras aceitas pela API por janela")
+    parser.add_argument("--janela", type=float, default=2.0, help="janela da cota, em segundos (a real é de 60 s)")
+    args = parser.parse_args()
+
+    chamadas_por_operacao(args.linhas)
+    sob_cota(args.linhas, args.threads, args.sincronizacoes, args.limite, args.janela)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compara a memória e o tempo de conversão da representação antiga (tudo object) com a compacta.
+
+Uso (na raiz do repositório): python -m benchmarks.bench_esquema_votos [n_linhas ...]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from armazenamento import preparar_votos
+from benchmarks.gerador import gerar_votos
+
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000]
+
+
+def preparar_votos_antigo(df):
+    """Conversão feita pelo carregar_votos original: só id_avaliacao e ano_avaliacao mudam de tipo."""
+    df = df.copy()
+    df['id_avaliacao'] = pd.to_datetime(df['id_avaliacao'], errors='coerce')
+    df['ano_avaliacao'] = pd.to_numeric(df['ano_avaliacao'], errors='coerce')
+    df.dropna(subset=['ano_avaliacao'], inplace=True)
+    df['ano_avaliacao'] = df['ano_avaliacao'].astype(int).astype(str)
+    return df
+
+
+def cronometrar(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def notas_validas_antigo(df):
+    """O que cada aba de análise refazia: filtrar 'N/A' e converter o voto para número."""
+    df_calculo = df[df['voto'] != 'N/A'].copy()
+    df_calculo['voto'] = pd.to_numeric(df_calculo['voto'])
+    return df_calculo
+
+
+def notas_validas_compacto(df):
+    return df[df['voto'].notna()]
+
+
+def main(tamanhos):
+    print(f"{'linhas':>10} | {'repr.':>9} | {'memória (MB)':>12} | {'conversão (s)':>13} | {'notas válidas (s)':>17}")
+    print("-" * 75)
+    for n_linhas in tamanhos:
+        bruto = gerar_votos(n_linhas)
+        for nome, preparar, notas_validas in (
+            ("antiga", preparar_votos_antigo, notas_validas_antigo),
+            ("compacta", preparar_votos, notas_validas_compacto),
+        ):
+            df, tempo_conversao = cronometrar(preparar, bruto.copy())
+            _, tempo_notas = cronometrar(notas_validas, df)
+            memoria = df.memory_usage(deep=True).sum() / 1024 ** 2
+            print(f"{n_linhas:>10,} | {nome:>9} | {memoria:>12.1f} | {tempo_conversao:>13.3f} | {tempo_notas:>17.4f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or TAMANHOS_PADRAO)
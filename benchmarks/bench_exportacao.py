@@ -0,0 +1,61 @@
+"""Pico de memória e tempo da exportação em lotes comparada a montar o arquivo inteiro com o pandas.
+
+O pico é medido com tracemalloc (alocações do Python, incluindo as do
+pandas e do openpyxl) e não conta os votos já guardados na base SQLite.
+O tracemalloc deixa tudo várias vezes mais lento: os tempos servem só para
+comparar os dois modos entre si.
+
+Uso (na raiz do repositório): python -m benchmarks.bench_exportacao [n_linhas ...]
+"""
+import io
+import sys
+import time
+import tracemalloc
+
+from armazenamento import COLUNAS_VOTOS
+from benchmarks.gerador import gerar_votos
+from cache_votos import CacheVotos
+from exportacao import exportar
+
+TAMANHOS_PADRAO = [10_000, 100_000]
+
+
+def medir(funcao):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    arquivo = funcao()
+    tempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arquivo.seek(0, io.SEEK_END)
+    return pico / 1024 ** 2, tempo, arquivo.tell() / 1024 ** 2
+
+
+def exportar_pandas(banco, formato):
+    """Como seria sem os lotes: DataFrame completo e arquivo completo em memória."""
+    df = banco.dataframe()
+    destino = io.BytesIO()
+    if formato == "csv":
+        destino.write(df.to_csv(index=False).encode("utf-8-sig"))
+    else:
+        df.to_excel(destino, index=False, engine="openpyxl")
+    return destino
+
+
+def main(tamanhos):
+    print(f"{'linhas':>9} | {'formato':>7} | {'modo':>7} | {'pico (MB)':>9} | {'tempo (s)':>9} | {'arquivo (MB)':>12}")
+    print("-" * 69)
+    for n_linhas in tamanhos:
+        banco = CacheVotos(":memory:")
+        banco.acrescentar_linhas(gerar_votos(n_linhas)[COLUNAS_VOTOS].values.tolist())
+        for formato in ("csv", "xlsx"):
+            for modo, funcao in (
+                ("pandas", lambda: exportar_pandas(banco, formato)),
+                ("lotes", lambda: exportar(COLUNAS_VOTOS, banco.lotes_de_votos(), formato)),
+            ):
+                pico, tempo, tamanho = medir(funcao)
+                print(f"{n_linhas:>9,} | {formato:>7} | {modo:>7} | {pico:>9.1f} | {tempo:>9.2f} | {tamanho:>12.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or TAMANHOS_PADRAO)
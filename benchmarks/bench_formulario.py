@@ -0,0 +1,100 @@
+"""Tempo de desenho do formulário de NOVA AVALIAÇÃO: critérios montados a cada execução x prontos (formulario.py).
+
+Cada versão do formulário roda como um script do Streamlit (AppTest), só com
+o formulário e os popovers de critérios, e é reexecutada como acontece a cada
+interação com um widget. Informa a mediana do tempo de uma execução.
+
+Uso (na raiz do repositório): python -m benchmarks.bench_formulario [--repeticoes 30]
+"""
+import argparse
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+
+def formulario_antigo():
+    """O formulário como era: uma legenda e um DataFrame por pergunta, montados a cada execução."""
+    import pandas as pd
+    import streamlit as st
+
+    from constantes import OPCOES_VOTO, PERGUNTAS, RUBRICA
+
+    with st.form(key="form_nova_avaliacao", clear_on_submit=True):
+        for categoria, perguntas_categoria in PERGUNTAS.items():
+            col_titulo, col_botao_criterios = st.columns([4, 1])
+            with col_titulo:
+                st.markdown(f"#### {categoria}")
+            with col_botao_criterios:
+                with st.popover(f"📘 Ver Critérios de {categoria}"):
+                    st.markdown(f"### Critérios para: **{categoria}**")
+                    legenda_geral = {"Nota": ["1", "2", "3", "4", "5"], "Significado": ["Needs improvement", "Meets partially the expectations", "Meets the expectations", "Exceed partially the expectations", "Exceed the expectations"]}
+                    st.table(pd.DataFrame(legenda_geral).set_index('Nota'))
+                    st.markdown("---")
+                    for pid, ptexto in perguntas_categoria.items():
+                        st.markdown(f"##### Pergunta {pid}: {ptexto}")
+                        if categoria in RUBRICA and pid in RUBRICA[categoria]:
+                            st.table(pd.DataFrame({'Nota': range(1, 6), 'Descrição do Critério': RUBRICA[categoria][pid]}).set_index('Nota'))
+                        else:
+                            st.warning("Critérios para esta pergunta não definidos.")
+
+            for pid, ptexto in perguntas_categoria.items():
+                st.radio(f"**{pid}** - {ptexto}", OPCOES_VOTO, horizontal=True, key=f"vote_{categoria}_{pid}", index=5)
+            st.text_area("Comentários sobre esta categoria (opcional):", key=f"comment_{categoria}", height=100)
+            st.divider()
+        st.form_submit_button("Registrar Avaliação")
+
+
+def formulario_novo():
+    """O formulário atual: critérios e rótulos prontos desde a importação de formulario.py."""
+    import streamlit as st
+
+    from constantes import OPCOES_VOTO
+    from formulario import CRITERIOS_POR_CATEGORIA, LAYOUT_FORMULARIO
+
+    with st.form(key="form_nova_avaliacao", clear_on_submit=True):
+        for categoria, perguntas_e_chaves, chave_comentario in LAYOUT_FORMULARIO:
+            col_titulo, col_botao_criterios = st.columns([4, 1])
+            with col_titulo:
+                st.markdown(f"#### {categoria}")
+            with col_botao_criterios:
+                with st.popover(f"📘 Ver Critérios de {categoria}"):
+                    st.markdown(CRITERIOS_POR_CATEGORIA[categoria])
+
+            for chave, rotulo in perguntas_e_chaves:
+                st.radio(rotulo, OPCOES_VOTO, horizontal=True, key=chave, index=5)
+            st.text_area("Comentários sobre esta categoria (opcional):", key=chave_comentario, height=100)
+            st.divider()
+        st.form_submit_button("Registrar Avaliação")
+
+
+def medir(script, repeticoes):
+    """Mediana (segundos) de uma reexecução do script."""
+    at = AppTest.from_function(script, default_timeout=60)
+    at.run()  # primeira execução: importações
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        at.run()
+        tempos.append(time.perf_counter() - inicio)
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'versão':>8} | {'execução (ms)':>13}")
+    print("-" * 25)
+    resultados = {}
+    for nome, script in (("antigo", formulario_antigo), ("novo", formulario_novo)):
+        resultados[nome] = medir(script, args.repeticoes)
+        print(f"{nome:>8} | {resultados[nome] * 1000:>13.1f}")
+    print(f"razão novo/antigo: {resultados['novo'] / resultados['antigo']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Tempo da importação em lote de um histórico sintético (XLSX e CSV) e número de escritas no armazenamento.
+
+O arquivo traz algumas linhas inválidas (empresa, voto, ano e pergunta fora
+das listas de constantes.py) e uma parte das avaliações já gravada, para
+que a validação por avaliação também seja exercitada. A gravação vai para a
+planilha em memória (backend Google Sheets), em lotes de avaliações inteiras
+como na aplicação, e conta as chamadas recebidas.
+
+Uso (na raiz do repositório): python -m benchmarks.bench_importacao [n_linhas ...]
+"""
+import sys
+import tempfile
+import time
+
+from openpyxl import Workbook
+
+from armazenamento import COLUNAS_VOTOS
+from backends import BackendGoogleSheets
+from benchmarks.gerador import gerar_votos
+from benchmarks.planilha_falsa import planilha_com_votos
+from cache_votos import CacheVotos
+from constantes import PERGUNTAS
+from importacao import lotes_de_avaliacoes, validar_arquivo
+
+TAMANHOS_PADRAO = [50_000]
+LINHAS_POR_AVALIACAO = sum(len(perguntas) for perguntas in PERGUNTAS.values())
+
+
+def arquivos_de_teste(n_linhas):
+    """O mesmo histórico em XLSX e em CSV (arquivos temporários), com uma linha inválida a cada mil."""
+    df = gerar_votos(n_linhas, semente=n_linhas)
+    invalidas = df.index[::1000]
+    df.loc[invalidas[0::4], "empresa"] = "FORNECEDOR DESCONHECIDO"
+    df.loc[invalidas[1::4], "voto"] = "7"
+    df.loc[invalidas[2::4], "ano_avaliacao"] = "1999"
+    df.loc[invalidas[3::4], "pergunta_id"] = "9.9"
+
+    xlsx = tempfile.TemporaryFile()
+    pasta = Workbook(write_only=True)
+    aba = pasta.create_sheet("Votos")
+    aba.append(COLUNAS_VOTOS)
+    for linha in df[COLUNAS_VOTOS].itertuples(index=False, name=None):
+        aba.append(linha)
+    pasta.save(xlsx)
+
+    csv = tempfile.TemporaryFile()
+    csv.write(df[COLUNAS_VOTOS].to_csv(index=False).encode("utf-8-sig"))
+    return df, {"xlsx": xlsx, "csv": csv}
+
+
+def main(tamanhos):
+    print(f"{'linhas':>8} | {'formato':>7} | {'validação (s)':>13} | {'gravação (s)':>12} | {'aceitas':>8} | {'rejeitadas':>10} | {'chamadas na gravação':>20}")
+    print("-" * 98)
+    for n_linhas in tamanhos:
+        df, arquivos = arquivos_de_teste(n_linhas)
+        for formato, arquivo in arquivos.items():
+            # Um décimo das avaliações já está na planilha
+            planilha = planilha_com_votos(df.iloc[:n_linhas // 10 // LINHAS_POR_AVALIACAO * LINHAS_POR_AVALIACAO])
+            backend = BackendGoogleSheets(planilha, CacheVotos(":memory:"))
+            backend.sincronizar()
+
+            arquivo.seek(0)
+            inicio = time.perf_counter()
+            resultado = validar_arquivo(arquivo, f"historico.{formato}", backend.avaliacoes_gravadas)
+            validacao = time.perf_counter() - inicio
+
+            aba = planilha.get_worksheet(0)
+            chamadas_antes = sum(aba.chamadas.values())
+            inicio = time.perf_counter()
+            for lote in lotes_de_avaliacoes(resultado["votos"]):
+                backend.acrescentar(lote)
+            gravacao = time.perf_counter() - inicio
+            print(
+                f"{n_linhas:>8,} | {formato:>7} | {validacao:>13.2f} | {gravacao:>12.2f} | {len(resultado['votos']):>8,} | "
+                f"{len(resultado['rejeitadas']):>10,} | {sum(aba.chamadas.values()) - chamadas_antes:>20}"
+            )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or TAMANHOS_PADRAO)
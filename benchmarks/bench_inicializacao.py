@@ -0,0 +1,103 @@
+"""Partida a frio do Avaliacao.py: tempo de importação e tempo até a tela de senha aparecer.
+
+Cada medida roda em um processo novo do Python (nada em sys.modules), com o
+script executado pelo AppTest do Streamlit, como no primeiro acesso depois
+de o servidor subir:
+
+- "tela de senha": execução do script sem login; é o que a pessoa espera até
+  ver o formulário de senha (primeira pintura);
+- "após o login": primeira execução já logada (backend SQLite vazio), onde
+  passam a ser importados o pandas, o gspread e os módulos da aplicação.
+
+Para cada cenário: tempo do processo inteiro, importação do Streamlit,
+primeira execução do script (com as importações dele), uma reexecução (já
+com tudo importado) e os módulos pesados que o próprio script carregou.
+
+Com --raiz, mede outra cópia do repositório (por exemplo, um `git worktree`
+de um commit anterior), para comparar.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.bench_inicializacao [--repeticoes 5] [--raiz CAMINHO]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CENARIOS = ["tela de senha", "após o login"]
+MODULOS_PESADOS = ["pandas", "numpy", "gspread", "plotly.express", "openpyxl", "PIL", "pytz", "requests"]
+
+
+def medir_no_processo(cenario, raiz):
+    """Roda no processo filho: importa o Streamlit, executa o script duas vezes e devolve as medidas."""
+    sys.path.insert(0, raiz)
+    os.chdir(raiz)
+    inicio = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    importacao_streamlit = time.perf_counter() - inicio
+
+    at = AppTest.from_file(os.path.join(raiz, "Avaliacao.py"), default_timeout=120)
+    if cenario == "após o login":
+        at.secrets["backend_votos"] = "sqlite"
+        at.secrets["caminho_sqlite"] = os.path.join(tempfile.mkdtemp(), "votos.sqlite")
+        at.session_state["password_correct"] = True
+    modulos_antes = set(sys.modules)
+    inicio = time.perf_counter()
+    at.run()
+    primeira = time.perf_counter() - inicio
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    inicio = time.perf_counter()
+    at.run()
+    reexecucao = time.perf_counter() - inicio
+    return {
+        "importação do streamlit": importacao_streamlit,
+        "primeira execução": primeira,
+        "reexecução": reexecucao,
+        "módulos": [modulo for modulo in MODULOS_PESADOS if modulo in sys.modules and modulo not in modulos_antes],
+    }
+
+
+def medir(cenario, raiz):
+    """Uma medida em um processo novo; acrescenta o tempo do processo inteiro."""
+    inicio = time.perf_counter()
+    processo = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_inicializacao", "--filho", cenario, "--raiz", raiz],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    )
+    medida = json.loads(processo.stdout.strip().splitlines()[-1])
+    medida["processo"] = time.perf_counter() - inicio
+    return medida
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--raiz", default=RAIZ, help="cópia do repositório a medir (padrão: esta)")
+    parser.add_argument("--filho", choices=CENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    raiz = os.path.abspath(args.raiz)
+
+    if args.filho:
+        print(json.dumps(medir_no_processo(args.filho, raiz)))
+        return
+
+    print(f"Partida a frio de {os.path.join(raiz, 'Avaliacao.py')} (mediana de {args.repeticoes} processos)")
+    print(f"{'cenário':>14} | {'processo (s)':>12} | {'streamlit (s)':>13} | {'1ª execução (s)':>15} | {'reexecução (ms)':>15} | módulos pesados do script")
+    print("-" * 120)
+    for cenario in CENARIOS:
+        medidas = [medir(cenario, raiz) for _ in range(args.repeticoes)]
+        mediana = {chave: statistics.median(m[chave] for m in medidas) for chave in ("processo", "importação do streamlit", "primeira execução", "reexecução")}
+        print(
+            f"{cenario:>14} | {mediana['processo']:>12.2f} | {mediana['importação do streamlit']:>13.2f} | "
+            f"{mediana['primeira execução']:>15.2f} | {mediana['reexecução'] * 1000:>15.1f} | {', '.join(medidas[-1]['módulos']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
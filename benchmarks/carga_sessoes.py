@@ -0,0 +1,158 @@
+"""Teste de carga: N sessões simultâneas lendo os dados, com retrato compartilhado ou com cópia por sessão.
+
+Cada sessão é uma thread que repete uma "execução da página": ranking,
+relatório de médias com filtros aleatórios, uma página do resumo e o
+detalhe de uma avaliação. No modo compartilhado a execução segue o caminho
+da página: lê o retrato publicado e faz a consulta de médias no backend
+(backend.medias). No modo "cópia por sessão" cada execução recebe a sua
+própria cópia dos votos (como o st.cache_data devolvia) e refaz os
+cálculos a partir das linhas, como as abas faziam antes do retrato.
+
+Cada medição (modo x sessões) roda em um processo novo, que monta os
+mesmos dados e faz o mesmo aquecimento (uma execução de cada modo) antes
+de ler a memória de base; assim os dois modos partem da mesma base e a
+memória que uma medição não devolveu ao sistema não conta na seguinte.
+
+Uso (na raiz do repositório):
+    python -m benchmarks.carga_sessoes [--linhas 100000] [--sessoes 1 10 50] [--execucoes 20]
+"""
+import argparse
+import gc
+import multiprocessing
+import pickle
+import resource
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from atualizador import AtualizadorDados
+from backends import BackendGoogleSheets
+from benchmarks.gerador import gerar_votos
+from benchmarks.planilha_falsa import planilha_com_votos
+from cache_votos import CacheVotos
+from relatorios import filtrar_resumo, paginar
+
+
+def memoria_residente_mb():
+    """Memória residente atual do processo (Linux); fora do Linux, o pico informado pelo sistema."""
+    try:
+        with open("/proc/self/status") as status:
+            for linha in status:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class MedidorDePico(threading.Thread):
+    """Amostra a memória residente a cada 10 ms e guarda o maior valor."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.pico = memoria_residente_mb()
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(0.01):
+            self.pico = max(self.pico, memoria_residente_mb())
+
+    def parar(self):
+        self._parar.set()
+        self.join()
+        return self.pico
+
+
+def execucao_compartilhada(retrato, backend, rng):
+    anos = list(rng.choice(retrato.agregados['ano_avaliacao'].unique(), 2))
+    retrato.ranking.set_axis(range(1, len(retrato.ranking) + 1))
+    backend.medias(anos, [], [])
+    pagina = paginar(filtrar_resumo(retrato.resumo, anos=anos), 1, 25)
+    if not pagina.empty:
+        retrato.votos.iloc[retrato.linhas_por_avaliacao[pagina['id_avaliacao'].iloc[0]]]
+
+
+def execucao_com_copia(retrato, backend, rng):
+    votos = pickle.loads(pickle.dumps(retrato.votos))
+    anos = list(rng.choice(np.asarray(votos['ano_avaliacao'].unique()), 2))
+    validos = votos[votos['voto'].notna()].copy()
+    validos.groupby('empresa', observed=True)['voto'].mean()
+    votos.groupby('empresa', observed=True)['id_avaliacao'].nunique()
+    filtrado = votos.copy()
+    filtrado = filtrado[filtrado['ano_avaliacao'].isin(anos)]
+    filtrado[filtrado['voto'].notna()].groupby(['empresa', 'categoria'], observed=True)['voto'].mean()
+    resumo = votos[['id_avaliacao', 'ano_avaliacao', 'projeto', 'empresa', 'user_name']].drop_duplicates()
+    resumo = resumo[resumo['ano_avaliacao'].isin(anos)].sort_values(by='id_avaliacao', ascending=False)
+    if not resumo.empty:
+        votos[votos['id_avaliacao'] == resumo['id_avaliacao'].iloc[0]]
+
+
+MODOS = {"compartilhado": execucao_compartilhada, "cópia por sessão": execucao_com_copia}
+
+
+def montar_dados(linhas):
+    """Backend sobre a planilha falsa e o primeiro retrato publicado pelo atualizador."""
+    planilha = planilha_com_votos(gerar_votos(linhas))
+    with tempfile.TemporaryDirectory() as pasta:
+        backend = BackendGoogleSheets(planilha, CacheVotos(":memory:"), caminho_indice_projetos=f"{pasta}/projetos.json")
+        atualizador = AtualizadorDados(backend, intervalo_votos=3600, intervalo_projetos=3600)
+        retrato = atualizador.aguardar_primeiro_retrato(timeout=None)
+    return backend, retrato
+
+
+def medir(linhas, modo, n_sessoes, n_execucoes):
+    """Uma medição em processo próprio: dados, aquecimento de todos os modos e só então a base de memória."""
+    backend, retrato = montar_dados(linhas)
+    rng = np.random.default_rng(0)
+    for execucao in MODOS.values():
+        execucao(retrato, backend, rng)
+    gc.collect()
+    return (len(retrato.resumo),) + rodar(MODOS[modo], retrato, backend, n_sessoes, n_execucoes)
+
+
+def rodar(execucao, retrato, backend, n_sessoes, n_execucoes):
+    tempos = []
+    trava = threading.Lock()
+
+    def sessao(semente):
+        rng = np.random.default_rng(semente)
+        for _ in range(n_execucoes):
+            inicio = time.perf_counter()
+            execucao(retrato, backend, rng)
+            with trava:
+                tempos.append(time.perf_counter() - inicio)
+
+    medidor = MedidorDePico()
+    base = medidor.pico
+    medidor.start()
+    sessoes = [threading.Thread(target=sessao, args=(i,)) for i in range(n_sessoes)]
+    for thread in sessoes:
+        thread.start()
+    for thread in sessoes:
+        thread.join()
+    pico = medidor.parar()
+    return base, pico - base, np.percentile(tempos, 50) * 1000, np.percentile(tempos, 95) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, default=100_000)
+    parser.add_argument("--sessoes", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--execucoes", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.linhas:,} linhas; cada linha da tabela é medida em um processo novo\n")
+    print(f"{'modo':>18} | {'sessões':>7} | {'avaliações':>10} | {'base (MB)':>9} | {'memória extra (MB)':>18} | {'p50 (ms)':>9} | {'p95 (ms)':>9}")
+    print("-" * 98)
+    contexto = multiprocessing.get_context("spawn")
+    for n_sessoes in args.sessoes:
+        for nome in MODOS:
+            with contexto.Pool(1) as processo:
+                avaliacoes, base, extra, p50, p95 = processo.apply(medir, (args.linhas, nome, n_sessoes, args.execucoes))
+            print(f"{nome:>18} | {n_sessoes:>7} | {avaliacoes:>10,} | {base:>9.0f} | {extra:>18.1f} | {p50:>9.1f} | {p95:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Gerador de votos sintéticos, reproduzível pela semente, no formato lido da planilha (tudo texto)."""
+import numpy as np
+import pandas as pd
+
+from armazenamento import COLUNAS_VOTOS
+from constantes import ANOS_AVALIACAO, EMPRESAS, OPCOES_VOTO, PERGUNTAS
+
+COMENTARIOS = ["", "", "", "Atendeu ao cronograma.", "Precisa melhorar a documentação.", "Equipe bem dimensionada.", "Houve retrabalho na montagem."]
+
+
+def gerar_votos(n_linhas, semente=42, n_projetos=150, n_avaliadores=40):
+    """Gera `n_linhas` votos: cada avaliação tem uma linha por pergunta de PERGUNTAS, como o formulário grava."""
+    rng = np.random.default_rng(semente)
+    perguntas = [(categoria, pid, ptexto) for categoria, perguntas_categoria in PERGUNTAS.items() for pid, ptexto in perguntas_categoria.items()]
+    categorias = list(PERGUNTAS)
+    n_avaliacoes = -(-n_linhas // len(perguntas))
+
+    # Uma data por avaliação (em ordem, como na planilha) entre 2020 e o fim de ANOS_AVALIACAO
+    inicio = pd.Timestamp(f"{ANOS_AVALIACAO[0]}-01-01", tz="America/Sao_Paulo")
+    fim = pd.Timestamp(f"{ANOS_AVALIACAO[-1]}-12-31", tz="America/Sao_Paulo")
+    microssegundos = np.sort(rng.integers(0, (fim - inicio) // pd.Timedelta(microseconds=1), n_avaliacoes))
+    datas = inicio + pd.to_timedelta(microssegundos, unit="us")
+    ids = pd.Series(datas).astype(str).to_numpy()
+    anos = datas.year.astype(str).to_numpy()
+
+    projetos = np.array([f"LCP-{1000 + i} - PROJETO {i}" for i in range(n_projetos)])
+    avaliadores = np.array([f"ENGENHEIRO {i}" for i in range(n_avaliadores)])
+    projeto_aval = projetos[rng.integers(0, n_projetos, n_avaliacoes)]
+    empresa_aval = np.array(EMPRESAS)[rng.integers(0, len(EMPRESAS), n_avaliacoes)]
+    avaliador_aval = avaliadores[rng.integers(0, n_avaliadores, n_avaliacoes)]
+    comentario_aval = np.array(COMENTARIOS)[rng.integers(0, len(COMENTARIOS), (n_avaliacoes, len(categorias)))]
+
+    por_linha = np.repeat(np.arange(n_avaliacoes), len(perguntas))[:n_linhas]
+    por_pergunta = np.tile(np.arange(len(perguntas)), n_avaliacoes)[:n_linhas]
+    categoria_linha = np.array([categorias.index(p[0]) for p in perguntas])[por_pergunta]
+
+    # Cerca de 10% de N/A, o resto entre 1 e 5 com leve tendência para notas altas
+    pesos = np.array([0.05, 0.10, 0.25, 0.30, 0.20, 0.10])
+    votos = np.array(OPCOES_VOTO)[rng.choice(len(OPCOES_VOTO), n_linhas, p=pesos)]
+
+    df = pd.DataFrame({
+        "user_name": avaliador_aval[por_linha],
+        "id_avaliacao": ids[por_linha],
+        "ano_avaliacao": anos[por_linha],
+        "projeto": projeto_aval[por_linha],
+        "empresa": empresa_aval[por_linha],
+        "categoria": np.array([p[0] for p in perguntas])[por_pergunta],
+        "pergunta_id": np.array([p[1] for p in perguntas])[por_pergunta],
+        "pergunta_texto": np.array([p[2] for p in perguntas])[por_pergunta],
+        "voto": votos,
+        "comentario": comentario_aval[por_linha, categoria_linha],
+    })
+    return df[COLUNAS_VOTOS].astype(object)
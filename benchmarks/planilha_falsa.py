@@ -0,0 +1,137 @@
+"""Planilha do Google em memória, com a parte da interface do gspread usada pela aplicação.
+
+Serve para rodar as cargas e gravações (cache_votos, armazenamento, atualizador)
+sem rede. Como a API real, os intervalos lidos omitem células vazias no fim
+das linhas e linhas vazias no fim do intervalo.
+"""
+import re
+from collections import Counter
+
+import gspread
+
+from armazenamento import ABA_EXCLUSOES, ABAS_PROJETOS, COLUNAS_EXCLUSOES, COLUNAS_VOTOS, LINHA_CABECALHO_PROJETOS
+
+_INTERVALO = re.compile(r"^([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?$")
+
+
+def _numero_coluna(letras):
+    numero = 0
+    for letra in letras:
+        numero = numero * 26 + ord(letra) - 64
+    return numero
+
+
+def _aparar(linhas):
+    """Remove as células vazias no fim de cada linha e as linhas vazias no fim, como a API faz."""
+    linhas = [list(linha) for linha in linhas]
+    for linha in linhas:
+        while linha and linha[-1] == "":
+            linha.pop()
+    while linhas and not linhas[-1]:
+        linhas.pop()
+    return linhas
+
+
+class AbaFalsa:
+    """Uma aba: lista de linhas (listas de texto), com contagem das chamadas recebidas."""
+
+    def __init__(self, titulo, valores=None):
+        self.title = titulo
+        self.valores = [[str(valor) for valor in linha] for linha in (valores or [])]
+        self.chamadas = Counter()
+
+    def _recortar(self, intervalo):
+        """Células do intervalo A1 ("A5:J", "4:4", "C4:C", "A1"...), sem aparar."""
+        col_ini, lin_ini, col_fim, lin_fim = _INTERVALO.match(intervalo).groups()
+        if col_fim is None:  # célula única, ex.: "A1"
+            col_fim, lin_fim = col_ini, lin_ini
+        primeira_linha = int(lin_ini) if lin_ini else 1
+        ultima_linha = int(lin_fim) if lin_fim else len(self.valores)
+        primeira_coluna = _numero_coluna(col_ini) if col_ini else 1
+        ultima_coluna = _numero_coluna(col_fim) if col_fim else None
+        return [linha[primeira_coluna - 1:ultima_coluna] for linha in self.valores[primeira_linha - 1:ultima_linha]]
+
+    def row_values(self, linha):
+        self.chamadas["row_values"] += 1
+        linhas = _aparar(self.valores[linha - 1:linha])
+        return linhas[0] if linhas else []
+
+    def append_rows(self, linhas, value_input_option=None):
+        self.chamadas["append_rows"] += 1
+        self.valores.extend([str(valor) for valor in linha] for linha in linhas)
+
+    def clear(self):
+        self.chamadas["clear"] += 1
+        self.valores = []
+
+
+class PlanilhaFalsa:
+    """Conjunto de abas, com os métodos do gspread.Spreadsheet usados pela aplicação."""
+
+    def __init__(self, abas):
+        self.abas = list(abas)
+        self.chamadas = Counter()
+
+    def worksheets(self):
+        return list(self.abas)
+
+    def get_worksheet(self, indice):
+        return self.abas[indice]
+
+    def worksheet(self, titulo):
+        for aba in self.abas:
+            if aba.title == titulo:
+                return aba
+        raise gspread.exceptions.WorksheetNotFound(titulo)
+
+    def add_worksheet(self, title, rows=100, cols=26):
+        self.chamadas["add_worksheet"] += 1
+        aba = AbaFalsa(title)
+        self.abas.append(aba)
+        return aba
+
+    def aba_e_intervalo(self, intervalo):
+        """"'Votos'!A5:J" -> (aba Votos, "A5:J"); só o título ("'Votos'") é a aba inteira."""
+        titulo, _, a1 = intervalo.partition("!")
+        return self.worksheet(titulo.strip("'")), a1 or "A:ZZ"
+
+    def values_batch_get(self, intervalos, params=None):
+        self.chamadas["values_batch_get"] += 1
+        colunas = (params or {}).get("majorDimension") == "COLUMNS"
+        resposta = []
+        for intervalo in intervalos:
+            aba, a1 = self.aba_e_intervalo(intervalo)
+            valores = _aparar(aba._recortar(a1))
+            if colunas:
+                largura = max((len(linha) for linha in valores), default=0)
+                valores = _aparar([[linha[i] if i < len(linha) else "" for linha in valores] for i in range(largura)])
+            resposta.append({"range": intervalo, "values": valores})
+        return {"valueRanges": resposta}
+
+    def values_batch_clear(self, params=None, body=None):
+        self.chamadas["values_batch_clear"] += 1
+        for intervalo in body["ranges"]:
+            aba, a1 = self.aba_e_intervalo(intervalo)
+            if a1 != "A:ZZ":
+                raise NotImplementedError("só abas inteiras")
+            aba.valores = []
+
+    def values_batch_update(self, body=None):
+        self.chamadas["values_batch_update"] += 1
+        for dados in body["data"]:
+            aba, a1 = self.aba_e_intervalo(dados["range"])
+            if a1 != "A1":
+                raise NotImplementedError("só a partir de A1")
+            valores = [[str(valor) for valor in linha] for linha in dados["values"]]
+            aba.valores[:len(valores)] = valores
+
+
+def planilha_com_votos(df_votos, projetos=("LCP-1000 - PROJETO 0",)):
+    """Planilha com os votos na primeira aba, as abas de projetos com cabeçalho na linha 4 e a aba de exclusões vazia."""
+    votos = AbaFalsa("Votos", [COLUNAS_VOTOS] + df_votos[COLUNAS_VOTOS].astype(str).values.tolist())
+    abas_projetos = []
+    for aba in ABAS_PROJETOS:
+        linhas = [[""]] * (LINHA_CABECALHO_PROJETOS - 1) + [["ITEM", "WBS", "PROJECT NAME"]]
+        linhas += [[str(i), *projeto.split(" - ", 1)] for i, projeto in enumerate(projetos)]
+        abas_projetos.append(AbaFalsa(aba, linhas))
+    return PlanilhaFalsa([votos] + abas_projetos + [AbaFalsa(ABA_EXCLUSOES, [COLUNAS_EXCLUSOES])])
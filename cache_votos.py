@@ -0,0 +1,375 @@
+"""Base local (SQLite) dos votos: cópia da aba da planilha do Google ou, no backend SQLite, o próprio armazenamento.
+
+A cópia guarda as linhas já lidas e quantas são. A cada atualização, busca
+na planilha apenas a última linha conhecida e as que vieram depois dela: se
+a última linha conhecida continua igual, as novas são simplesmente
+acrescentadas; se mudou (ou sumiu), a aba foi regravada e tudo é recarregado.
+
+Junto com os votos é mantida a tabela `agregados`, com a soma e a contagem
+das notas por (ano_avaliacao, projeto, empresa, categoria). Ela é
+atualizada de forma incremental quando avaliações entram ou saem, e é
+dela que saem o ranking e o relatório de médias.
+
+A tabela de votos tem índices em empresa, projeto, ano_avaliacao, user_name
+e id_avaliacao, usados pelas consultas das abas (ver backends.py).
+
+Avaliações excluídas não saem da tabela de votos na hora: o id delas vai
+para a tabela `exclusoes` (lápides) e todas as leituras passam pela visão
+`votos_ativos`, que as ignora. As linhas só são apagadas de fato em
+compactar(), quando o armazenamento também é regravado sem elas.
+"""
+import json
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from armazenamento import COLUNAS_VOTOS, letra_coluna
+
+CAMINHO_CACHE_VOTOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "votos.sqlite")
+CAMINHO_BANCO_LOCAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "avaliacoes.sqlite")
+
+COLUNAS_AGREGADOS = ["ano_avaliacao", "projeto", "empresa", "categoria", "soma", "n_votos", "n_avaliacoes"]
+COLUNAS_INDEXADAS = ["empresa", "projeto", "ano_avaliacao", "user_name", "id_avaliacao"]
+
+_VOTO_VALIDO = "voto IS NOT NULL AND TRIM(voto) NOT IN ('', 'N/A')"
+
+# Soma e contagens das linhas selecionadas por {filtro}; {sinal} = "-" para descontar uma remoção
+_SQL_AGREGAR = f"""
+    INSERT INTO agregados ({", ".join(COLUNAS_AGREGADOS)})
+    SELECT CAST(CAST(ano_avaliacao AS REAL) AS INTEGER), COALESCE(projeto, ''), COALESCE(empresa, ''), COALESCE(categoria, ''),
+           {{sinal}}SUM(CASE WHEN {_VOTO_VALIDO} THEN CAST(voto AS REAL) ELSE 0 END),
+           {{sinal}}SUM(CASE WHEN {_VOTO_VALIDO} THEN 1 ELSE 0 END),
+           {{sinal}}COUNT(DISTINCT id_avaliacao)
+    FROM votos_ativos
+    WHERE TRIM(ano_avaliacao) GLOB '[0-9]*' AND ({{filtro}})
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (ano_avaliacao, projeto, empresa, categoria) DO UPDATE SET
+        soma = soma + excluded.soma,
+        n_votos = n_votos + excluded.n_votos,
+        n_avaliacoes = n_avaliacoes + excluded.n_avaliacoes
+"""
+
+
+class CacheVotos:
+    """Votos em SQLite: espelho da primeira aba da planilha (atualizado de forma incremental) ou base principal."""
+
+    def __init__(self, caminho=CAMINHO_CACHE_VOTOS):
+        if caminho != ":memory:":
+            os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        self.caminho = caminho
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._lock = threading.RLock()
+        # Uma sincronização por vez; a leitura da planilha é feita fora de _lock
+        self._sincronizacao = threading.Lock()
+        self._alteracoes = 0  # contador de gravações, para a sincronização notar o que mudou enquanto lia
+        self._criar_tabelas()
+
+    def _criar_tabelas(self):
+        colunas = ", ".join(f"{col} TEXT" for col in COLUNAS_VOTOS)
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)")
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS votos (linha INTEGER PRIMARY KEY, {colunas})")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS agregados ("
+                "ano_avaliacao TEXT, projeto TEXT, empresa TEXT, categoria TEXT, "
+                "soma REAL, n_votos INTEGER, n_avaliacoes INTEGER, "
+                "PRIMARY KEY (ano_avaliacao, projeto, empresa, categoria))"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS exclusoes (id_avaliacao TEXT PRIMARY KEY)")
+            self._conn.execute(
+                "CREATE VIEW IF NOT EXISTS votos_ativos AS "
+                "SELECT * FROM votos WHERE NOT EXISTS (SELECT 1 FROM exclusoes WHERE exclusoes.id_avaliacao = votos.id_avaliacao)"
+            )
+            for col in COLUNAS_INDEXADAS:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_votos_{col} ON votos ({col})")
+
+    # --- METADADOS ---
+    def _ler_meta(self, chave, padrao=None):
+        linha = self._conn.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return json.loads(linha[0]) if linha else padrao
+
+    def _gravar_meta(self, chave, valor):
+        self._conn.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", (chave, json.dumps(valor)))
+
+    @property
+    def linhas_lidas(self):
+        """Quantidade de linhas de dados (sem o cabeçalho) já copiadas da planilha."""
+        with self._lock:
+            return self._ler_meta("linhas_lidas", 0)
+
+    @property
+    def cabecalho(self):
+        """Cabeçalho da aba de votos na última leitura (vazio antes da primeira)."""
+        with self._lock:
+            return self._ler_meta("cabecalho", [])
+
+    @property
+    def marca(self):
+        """Muda sempre que linhas entram ou avaliações são excluídas; serve para saber se há algo novo."""
+        with self._lock:
+            return self._ler_meta("linhas_lidas", 0), self._conn.execute("SELECT COUNT(*) FROM exclusoes").fetchone()[0]
+
+    # --- SINCRONIZAÇÃO COM A PLANILHA ---
+    def sincronizar(self, ler):
+        """Traz para a cópia local as linhas acrescentadas e as lápides novas desde a última leitura.
+
+        `ler(intervalo_votos, inicio_exclusoes)` lê, em uma única chamada, o
+        intervalo A1 da aba de votos (None = a aba inteira) e as lápides a
+        partir da posição informada (0 = a primeira); devolve (linhas, ids).
+        Retorna "incremental" ou "completa", conforme o tipo de leitura feita.
+
+        `ler` (a rede) roda fora do lock da base, então as consultas das abas
+        não esperam por ela; o lock só é tomado para gravar o que foi lido. Se
+        a base mudou durante a leitura (compactação, exclusão, outra gravação),
+        o que foi lido é descartado e a leitura é refeita.
+        """
+        with self._sincronizacao:
+            while True:
+                with self._lock:
+                    alteracoes = self._alteracoes
+                    lidas = self._ler_meta("linhas_lidas", 0)
+                    cabecalho = self._ler_meta("cabecalho", [])
+                    exclusoes_lidas = self._ler_meta("exclusoes_lidas", 0)
+                if lidas and cabecalho:
+                    # A última linha conhecida está na linha (lidas + 1) da aba, logo abaixo do cabeçalho
+                    valores, exclusoes = ler(f"A{lidas + 1}:{letra_coluna(len(cabecalho))}", exclusoes_lidas)
+                    valores = [self._normalizar(linha, len(cabecalho)) for linha in valores]
+                    with self._lock:
+                        if self._alteracoes != alteracoes:
+                            continue
+                        if valores and self._projetar(cabecalho, valores[0]) == self._ultima_linha():
+                            with self._conn:
+                                self._inserir(cabecalho, valores[1:], primeira_linha=lidas + 1)
+                                self._agregar("linha > ?", (lidas,))
+                                self._gravar_meta("linhas_lidas", lidas + len(valores) - 1)
+                            self._alteracoes += 1
+                            self._acrescentar_exclusoes_lidas(exclusoes)
+                            return "incremental"
+
+                valores, exclusoes = ler(None, 0)
+                with self._lock:
+                    if self._alteracoes != alteracoes:
+                        continue
+                    self._recarregar(valores)
+                    self._acrescentar_exclusoes_lidas(exclusoes)
+                    return "completa"
+
+    def _recarregar(self, valores):
+        """Descarta a cópia local e grava a aba inteira (cabeçalho + linhas) lida novamente."""
+        cabecalho = [str(valor) for valor in valores[0]] if valores else []
+        linhas = [self._normalizar(linha, len(cabecalho)) for linha in valores[1:]]
+        with self._conn:
+            self._conn.execute("DELETE FROM votos")
+            self._conn.execute("DELETE FROM agregados")
+            # As lápides são lidas de novo desde o início, na mesma leitura
+            self._conn.execute("DELETE FROM exclusoes")
+            self._gravar_meta("exclusoes_lidas", 0)
+            self._inserir(cabecalho, linhas, primeira_linha=1)
+            self._agregar("1")
+            self._gravar_meta("cabecalho", cabecalho)
+            self._gravar_meta("linhas_lidas", len(linhas))
+        self._alteracoes += 1
+
+    @staticmethod
+    def _normalizar(linha, tamanho):
+        """A API omite as células vazias no fim da linha; completa até o tamanho do cabeçalho."""
+        linha = [str(valor) for valor in linha[:tamanho]]
+        return linha + [""] * (tamanho - len(linha))
+
+    @staticmethod
+    def _projetar(cabecalho, linha):
+        """Reordena uma linha da planilha nas colunas de COLUNAS_VOTOS (colunas ausentes ficam None)."""
+        return [linha[cabecalho.index(col)] if col in cabecalho else None for col in COLUNAS_VOTOS]
+
+    def _inserir(self, cabecalho, linhas, primeira_linha):
+        registros = [[primeira_linha + i] + self._projetar(cabecalho, linha) for i, linha in enumerate(linhas)]
+        marcadores = ", ".join("?" * (len(COLUNAS_VOTOS) + 1))
+        self._conn.executemany(f"INSERT INTO votos (linha, {', '.join(COLUNAS_VOTOS)}) VALUES ({marcadores})", registros)
+
+    def _ultima_linha(self):
+        """Última linha copiada, nas colunas de COLUNAS_VOTOS."""
+        registro = self._conn.execute(f"SELECT {', '.join(COLUNAS_VOTOS)} FROM votos ORDER BY linha DESC LIMIT 1").fetchone()
+        return list(registro) if registro else None
+
+    def _agregar(self, filtro, parametros=(), sinal=""):
+        """Soma (ou desconta, com sinal="-") na tabela de agregados as linhas de votos que atendem ao filtro."""
+        self._conn.execute(_SQL_AGREGAR.format(filtro=filtro, sinal=sinal), parametros)
+        self._conn.execute("DELETE FROM agregados WHERE n_avaliacoes <= 0")
+
+    def _ids_brutos(self, ids_avaliacao, tabela="votos_ativos"):
+        """Textos de id_avaliacao gravados na planilha que correspondem aos ids (datas) informados."""
+        ids_gravados = pd.Series([linha[0] for linha in self._conn.execute(f"SELECT DISTINCT id_avaliacao FROM {tabela}")], dtype=object)
+        procurados = pd.to_datetime(pd.Series(list(ids_avaliacao), dtype=object), errors='coerce').dropna()
+        correspondentes = pd.to_datetime(ids_gravados, errors='coerce').isin(procurados)
+        return ids_gravados[correspondentes].tolist()
+
+    def avaliacoes_gravadas(self, ids_avaliacao):
+        """Subconjunto dos ids informados que já tem linhas na base."""
+        ids_avaliacao = list(ids_avaliacao)
+        with self._lock:
+            ids_brutos = self._ids_brutos(ids_avaliacao, tabela="votos")
+        gravados = set(pd.to_datetime(pd.Series(ids_brutos, dtype=object), errors='coerce'))
+        return [id_aval for id_aval in ids_avaliacao if pd.Timestamp(id_aval) in gravados]
+
+    # --- EXCLUSÕES (LÁPIDES) ---
+    @property
+    def exclusoes_lidas(self):
+        """Quantas lápides da aba de exclusões já foram aplicadas (backend Google Sheets)."""
+        with self._lock:
+            return self._ler_meta("exclusoes_lidas", 0)
+
+    def aplicar_exclusoes(self, ids_avaliacao):
+        """Marca as avaliações como excluídas e desconta só as linhas delas dos agregados.
+
+        Ids desconhecidos ou já excluídos são ignorados. Retorna quantas
+        avaliações foram marcadas.
+        """
+        with self._lock:
+            ids_brutos = self._ids_brutos(ids_avaliacao)
+            if not ids_brutos:
+                return 0
+            marcadores = ", ".join("?" * len(ids_brutos))
+            with self._conn:
+                self._agregar(f"id_avaliacao IN ({marcadores})", ids_brutos, sinal="-")
+                self._conn.executemany("INSERT OR IGNORE INTO exclusoes (id_avaliacao) VALUES (?)", [(i,) for i in ids_brutos])
+            self._alteracoes += 1
+            return len(ids_brutos)
+
+    def _acrescentar_exclusoes_lidas(self, ids_avaliacao):
+        """Aplica as lápides lidas da aba de exclusões e avança a posição de leitura."""
+        if ids_avaliacao:
+            self.aplicar_exclusoes(ids_avaliacao)
+            with self._lock, self._conn:
+                self._gravar_meta("exclusoes_lidas", self._ler_meta("exclusoes_lidas", 0) + len(ids_avaliacao))
+
+    def situacao_exclusoes(self):
+        """Avaliações excluídas ainda não compactadas e quantas linhas elas ocupam."""
+        with self._lock:
+            avaliacoes = self._conn.execute("SELECT COUNT(*) FROM exclusoes").fetchone()[0]
+            linhas = self._conn.execute("SELECT COUNT(*) FROM votos WHERE id_avaliacao IN (SELECT id_avaliacao FROM exclusoes)").fetchone()[0]
+        return {"avaliacoes": avaliacoes, "linhas": linhas}
+
+    def compactar(self):
+        """Apaga de fato as linhas excluídas, depois que o armazenamento foi regravado só com os votos ativos.
+
+        As linhas restantes são renumeradas para continuarem alinhadas com a
+        planilha e a contagem de lápides lidas volta a zero.
+        """
+        with self._lock, self._conn:
+            removidas = self._conn.execute("DELETE FROM votos WHERE id_avaliacao IN (SELECT id_avaliacao FROM exclusoes)").rowcount
+            self._conn.execute("DELETE FROM exclusoes")
+            self._renumerar()
+            self._gravar_meta("linhas_lidas", self._conn.execute("SELECT COUNT(*) FROM votos").fetchone()[0])
+            self._gravar_meta("exclusoes_lidas", 0)
+            self._alteracoes += 1
+        return removidas
+
+    def acrescentar_linhas(self, linhas):
+        """Grava linhas novas (na ordem de COLUNAS_VOTOS) direto na base, somando-as aos agregados.
+
+        Usado quando a base local é o próprio armazenamento (backend SQLite).
+        """
+        with self._lock, self._conn:
+            lidas = self._ler_meta("linhas_lidas", 0)
+            self._inserir(COLUNAS_VOTOS, linhas, primeira_linha=lidas + 1)
+            self._agregar("linha > ?", (lidas,))
+            self._gravar_meta("cabecalho", COLUNAS_VOTOS)
+            self._gravar_meta("linhas_lidas", lidas + len(linhas))
+            self._alteracoes += 1
+        return len(linhas)
+
+    def limpar(self):
+        """Apaga todos os votos, agregados e lápides."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM votos")
+            self._conn.execute("DELETE FROM agregados")
+            self._conn.execute("DELETE FROM exclusoes")
+            self._gravar_meta("linhas_lidas", 0)
+            self._gravar_meta("exclusoes_lidas", 0)
+            self._alteracoes += 1
+
+    def _renumerar(self):
+        """Numera as linhas de novo em sequência (1, 2, 3...), mantendo a ordem."""
+        self._conn.execute("DROP TABLE IF EXISTS temp.renumeracao")
+        self._conn.execute(
+            "CREATE TEMP TABLE renumeracao AS "
+            "SELECT linha AS antiga, ROW_NUMBER() OVER (ORDER BY linha) AS nova FROM votos"
+        )
+        self._conn.execute("CREATE UNIQUE INDEX temp.idx_renumeracao ON renumeracao (antiga)")
+        # Passa por números negativos para não colidir com a chave primária durante a troca
+        self._conn.execute("UPDATE votos SET linha = -(SELECT nova FROM renumeracao WHERE antiga = votos.linha)")
+        self._conn.execute("UPDATE votos SET linha = -linha")
+        self._conn.execute("DROP TABLE temp.renumeracao")
+
+    # --- LEITURA ---
+    def dataframe(self):
+        """Devolve os votos ativos (sem as avaliações excluídas), na ordem da planilha, com todas as colunas como texto."""
+        with self._lock:
+            return pd.read_sql_query(f"SELECT {', '.join(COLUNAS_VOTOS)} FROM votos_ativos ORDER BY linha", self._conn)
+
+    def agregados(self):
+        """Tabela de somas e contagens por (ano_avaliacao, projeto, empresa, categoria)."""
+        with self._lock:
+            return pd.read_sql_query(f"SELECT {', '.join(COLUNAS_AGREGADOS)} FROM agregados", self._conn)
+
+    # --- CONSULTAS INDEXADAS ---
+    def lotes_de_votos(self, busca="", anos=None, projetos=None, empresas=None, avaliadores=None, tamanho_lote=5000):
+        """Votos ativos filtrados, na ordem da planilha, em lotes de até `tamanho_lote` linhas (tuplas de texto).
+
+        Cada lote é uma consulta curta (continua da última linha lida), então
+        a base não fica travada enquanto quem consome os lotes trabalha.
+        Os filtros seguem filtrar_resumo: listas vazias não filtram e a busca
+        procura o texto em projeto, empresa e avaliador.
+        """
+        filtros, parametros = ["linha > ?"], [0]
+        for coluna, valores in (("ano_avaliacao", anos), ("projeto", projetos), ("empresa", empresas), ("user_name", avaliadores)):
+            if valores:
+                filtros.append(f"{coluna} IN ({', '.join('?' * len(valores))})")
+                parametros.extend(str(valor) for valor in valores)
+        busca = busca.strip().lower()
+        if busca:
+            filtros.append("(" + " OR ".join(f"INSTR(LOWER({coluna}), ?) > 0" for coluna in ("projeto", "empresa", "user_name")) + ")")
+            parametros.extend([busca] * 3)
+        consulta = f"SELECT linha, {', '.join(COLUNAS_VOTOS)} FROM votos_ativos WHERE {' AND '.join(filtros)} ORDER BY linha LIMIT ?"
+        while True:
+            with self._lock:
+                registros = self._conn.execute(consulta, parametros + [tamanho_lote]).fetchall()
+            if not registros:
+                return
+            yield [registro[1:] for registro in registros]
+            parametros[0] = registros[-1][0]
+
+    def avaliacoes_do_usuario(self, user_name):
+        """Avaliações de um avaliador (projeto, empresa, ano e id), da mais recente para a mais antiga."""
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT projeto, empresa, ano_avaliacao, id_avaliacao, MAX(linha) AS ultima_linha FROM votos_ativos "
+                "WHERE user_name = ? GROUP BY id_avaliacao, projeto, empresa, ano_avaliacao ORDER BY ultima_linha DESC",
+                self._conn, params=(user_name,),
+            )
+        df['id_avaliacao'] = pd.to_datetime(df['id_avaliacao'], errors='coerce')
+        return df.dropna(subset=['id_avaliacao']).drop(columns='ultima_linha')
+
+    def valores_distintos(self, coluna):
+        """Valores distintos, em ordem, de uma das colunas indexadas."""
+        if coluna not in COLUNAS_INDEXADAS:
+            raise ValueError(f"Coluna sem índice: {coluna}")
+        with self._lock:
+            return [valor for (valor,) in self._conn.execute(f"SELECT DISTINCT {coluna} FROM votos_ativos WHERE {coluna} IS NOT NULL ORDER BY {coluna}")]
+
+    def medias(self, anos=None, projetos=None, empresas=None):
+        """Média das notas por empresa e categoria para os filtros informados (listas vazias não filtram)."""
+        filtros, parametros = [], []
+        for coluna, valores in (("ano_avaliacao", anos), ("projeto", projetos), ("empresa", empresas)):
+            if valores:
+                filtros.append(f"{coluna} IN ({', '.join('?' * len(valores))})")
+                parametros.extend(str(valor) for valor in valores)
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT empresa, categoria, SUM(soma) / SUM(n_votos) AS media_avaliacao FROM agregados "
+                f"WHERE {' AND '.join(filtros) or '1'} GROUP BY empresa, categoria HAVING SUM(n_votos) > 0 "
+                "ORDER BY empresa, categoria",
+                self._conn, params=parametros,
+            )
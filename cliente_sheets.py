@@ -0,0 +1,194 @@
+"""Cliente HTTP do gspread com cota por minuto, novas tentativas e contadores.
+
+Todas as chamadas do gspread (API do Sheets e do Drive) passam pelo
+ClienteHTTP, na mesma sessão autorizada, reaproveitada pelas threads do
+processo (página, atualizador e fila de gravação):
+
+- cada chamada reserva antes uma vaga na cota de leituras (GET) ou de
+  escritas (demais métodos) dos últimos 60 s; sem vaga, a thread espera em
+  vez de receber um 429 da API;
+- leituras que falham com 429, 408, erros 5xx ou falha de conexão são
+  tentadas de novo com espera exponencial com jitter (um valor aleatório
+  até o teto da tentativa), respeitando o Retry-After quando a API o informa;
+- escritas só são repetidas quando a cota as recusou (429, ou 403 de cota
+  do Drive), porque aí a API não aplicou o pedido. Com qualquer outra falha
+  (tempo esgotado, conexão caída, 5xx) não dá para saber se um append foi
+  gravado, e repeti-lo duplicaria as linhas: o erro sobe para quem chamou
+  (a fila de gravação sincroniza e descarta as avaliações já gravadas antes
+  de reenviar);
+- chamadas, erros, novas tentativas, esperas e latências ficam em
+  contadores, mostrados na aba de administração (ver situacao()).
+
+A sessão pode ser trocada por qualquer requests.Session; os benchmarks usam
+uma sessão em memória que imita a API (benchmarks/api_sheets_falsa.py).
+"""
+import functools
+import random
+import statistics
+import threading
+import time
+from collections import Counter, deque
+
+import gspread
+import requests
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+
+# Cotas padrão da API do Sheets por usuário; a de leitura vale também para o Drive (abrir a planilha)
+COTA_LEITURAS = 60
+COTA_ESCRITAS = 60
+JANELA_COTA = 60.0
+TENTATIVAS = 6
+ESPERA_INICIAL = 1.0
+ESPERA_MAXIMA = 64.0
+LATENCIAS_GUARDADAS = 500
+CODIGOS_TEMPORARIOS = {408, 429, 500, 502, 503, 504}
+# O Drive responde 403 (e não 429) quando a cota acaba
+MOTIVOS_DE_COTA = {"rateLimitExceeded", "userRateLimitExceeded", "quotaExceeded"}
+
+
+class CotaPorMinuto:
+    """No máximo `limite` chamadas em qualquer intervalo de `janela` segundos (janela deslizante)."""
+
+    def __init__(self, limite, janela=JANELA_COTA, relogio=time.monotonic, dormir=time.sleep):
+        self.limite = limite
+        self.janela = janela
+        self._relogio = relogio
+        self._dormir = dormir
+        self._momentos = deque()
+        self._lock = threading.Lock()
+
+    def reservar(self):
+        """Espera até haver vaga e a ocupa; retorna quantos segundos esperou."""
+        esperado = 0.0
+        while True:
+            with self._lock:
+                agora = self._relogio()
+                while self._momentos and self._momentos[0] <= agora - self.janela:
+                    self._momentos.popleft()
+                if len(self._momentos) < self.limite:
+                    self._momentos.append(agora)
+                    return esperado
+                espera = self._momentos[0] + self.janela - agora
+            self._dormir(espera)
+            esperado += espera
+
+    def em_uso(self):
+        with self._lock:
+            agora = self._relogio()
+            return sum(1 for momento in self._momentos if momento > agora - self.janela)
+
+
+class ClienteHTTP(HTTPClient):
+    """HTTPClient do gspread com cota por minuto, novas tentativas com jitter (escritas só após recusa da cota) e contadores."""
+
+    def __init__(
+        self, auth, session=None, cota_leituras=COTA_LEITURAS, cota_escritas=COTA_ESCRITAS, janela=JANELA_COTA,
+        tentativas=TENTATIVAS, espera_inicial=ESPERA_INICIAL, espera_maxima=ESPERA_MAXIMA, dormir=time.sleep,
+    ):
+        super().__init__(auth, session)
+        self.cotas = {
+            "leitura": CotaPorMinuto(cota_leituras, janela, dormir=dormir),
+            "escrita": CotaPorMinuto(cota_escritas, janela, dormir=dormir),
+        }
+        self.tentativas = tentativas
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self._dormir = dormir
+        self._lock = threading.Lock()
+        self.contadores = {tipo: Counter() for tipo in self.cotas}
+        self.latencias = {tipo: deque(maxlen=LATENCIAS_GUARDADAS) for tipo in self.cotas}
+
+    def request(self, method, endpoint, *args, **kwargs):
+        tipo = "leitura" if method.lower() == "get" else "escrita"
+        for tentativa in range(self.tentativas):
+            espera_cota = self.cotas[tipo].reservar()
+            inicio = time.perf_counter()
+            try:
+                resposta = super().request(method, endpoint, *args, **kwargs)
+            except (APIError, requests.ConnectionError, requests.Timeout) as e:
+                repetir = self._pode_repetir(tipo, e)
+                self._contar(tipo, time.perf_counter() - inicio, espera_cota, erro=e)
+                if not repetir or tentativa == self.tentativas - 1:
+                    raise
+                espera = self._espera(tentativa, e)
+                with self._lock:
+                    self.contadores[tipo]["novas_tentativas"] += 1
+                    self.contadores[tipo]["espera_tentativas"] += espera
+                self._dormir(espera)
+            else:
+                self._contar(tipo, time.perf_counter() - inicio, espera_cota)
+                return resposta
+
+    @classmethod
+    def _pode_repetir(cls, tipo, erro):
+        """Leituras: qualquer falha temporária. Escritas: só as recusadas pela cota (não foram aplicadas)."""
+        if cls._recusada_pela_cota(erro):
+            return True
+        return tipo == "leitura" and cls._temporario(erro)
+
+    @staticmethod
+    def _recusada_pela_cota(erro):
+        if not isinstance(erro, APIError):
+            return False
+        if erro.code == 429:
+            return True
+        motivos = {detalhe.get("reason") for detalhe in (erro.error or {}).get("errors", []) if isinstance(detalhe, dict)}
+        return erro.code == 403 and bool(motivos & MOTIVOS_DE_COTA)
+
+    @staticmethod
+    def _temporario(erro):
+        if not isinstance(erro, APIError):
+            return True  # falha de conexão ou tempo esgotado
+        return erro.code in CODIGOS_TEMPORARIOS
+
+    def _espera(self, tentativa, erro):
+        """Espera exponencial com jitter total; o Retry-After da resposta, se houver, é o mínimo."""
+        espera = random.uniform(0, min(self.espera_maxima, self.espera_inicial * 2 ** tentativa))
+        retry_after = getattr(getattr(erro, "response", None), "headers", {}).get("Retry-After", "")
+        if str(retry_after).isdigit():
+            espera = max(espera, float(retry_after))
+        return espera
+
+    def _contar(self, tipo, segundos, espera_cota, erro=None):
+        with self._lock:
+            contador = self.contadores[tipo]
+            contador["chamadas"] += 1
+            contador["espera_cota"] += espera_cota
+            if erro is not None:
+                contador["erros"] += 1
+                if getattr(erro, "code", None) == 429:
+                    contador["respostas_429"] += 1
+            self.latencias[tipo].append(segundos)
+
+    def situacao(self):
+        """Uma linha por tipo de chamada: contadores, uso da cota e latência (p50 e p95, em ms)."""
+        linhas = []
+        with self._lock:
+            for tipo, contador in self.contadores.items():
+                latencias = sorted(self.latencias[tipo])
+                linhas.append({
+                    "tipo": tipo,
+                    "chamadas": contador["chamadas"],
+                    "erros": contador["erros"],
+                    "respostas 429": contador["respostas_429"],
+                    "novas tentativas": contador["novas_tentativas"],
+                    "cota em uso": f"{self.cotas[tipo].em_uso()}/{self.cotas[tipo].limite}",
+                    "espera pela cota (s)": round(float(contador["espera_cota"]), 1),
+                    "espera entre tentativas (s)": round(float(contador["espera_tentativas"]), 1),
+                    "p50 (ms)": round(statistics.median(latencias) * 1000, 1) if latencias else None,
+                    "p95 (ms)": round(latencias[int(0.95 * (len(latencias) - 1))] * 1000, 1) if latencias else None,
+                })
+        return linhas
+
+
+def conectar(credenciais, sessao=None, **opcoes):
+    """gspread.Client com o ClienteHTTP; `opcoes` são os parâmetros do ClienteHTTP (cotas, tentativas...).
+
+    `credenciais` é o dicionário da conta de serviço; com `sessao`, ele é
+    ignorado e as chamadas vão para essa sessão (ex.: a API em memória dos benchmarks).
+    """
+    cliente_http = functools.partial(ClienteHTTP, **opcoes)
+    if sessao is not None:
+        return gspread.Client(auth=None, session=sessao, http_client=cliente_http)
+    return gspread.service_account_from_dict(credenciais, http_client=cliente_http)
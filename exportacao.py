@@ -0,0 +1,76 @@
+"""Exportação dos votos e dos relatórios em CSV ou XLSX.
+
+Os dados chegam em lotes (listas de linhas) e cada lote é escrito direto em
+um arquivo temporário em disco: nem a tabela inteira nem o arquivo inteiro
+ficam na memória enquanto ele é gerado, por maior que seja o histórico. O
+XLSX usa o modo write-only do openpyxl, que também grava as linhas em disco
+à medida que chegam.
+"""
+import csv
+import io
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+TAMANHO_LOTE = 5000
+TIPOS_MIME = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def lotes_do_dataframe(df, tamanho_lote=TAMANHO_LOTE, index=False):
+    """Linhas de um DataFrame (tuplas) em lotes, para exportar tabelas já calculadas."""
+    for inicio in range(0, len(df), tamanho_lote):
+        yield list(df.iloc[inicio:inicio + tamanho_lote].itertuples(index=index, name=None))
+
+
+def _valor(valor):
+    """Valor de célula aceito pelo openpyxl: nulos ficam vazios e datas perdem o fuso (o Excel não guarda fuso)."""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    if hasattr(valor, "item"):  # tipos do numpy
+        valor = valor.item()
+    if isinstance(valor, datetime):
+        return valor.replace(tzinfo=None)
+    return valor
+
+
+def escrever_csv(destino, cabecalho, lotes):
+    """Escreve o CSV (UTF-8 com BOM, para o Excel reconhecer os acentos) no arquivo binário `destino`."""
+    destino.write("\ufeff".encode("utf-8"))
+    for lote in _com_cabecalho(cabecalho, lotes):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(["" if v is None else v for v in map(_valor, linha)] for linha in lote)
+        destino.write(buffer.getvalue().encode("utf-8"))
+
+
+def escrever_xlsx(destino, cabecalho, lotes, titulo="Dados"):
+    """Escreve uma pasta de trabalho com uma única aba, no modo write-only do openpyxl."""
+    from openpyxl import Workbook  # carregado só quando um XLSX é gerado
+
+    pasta = Workbook(write_only=True)
+    aba = pasta.create_sheet(title=titulo[:31])
+    for lote in _com_cabecalho(cabecalho, lotes):
+        for linha in lote:
+            aba.append([_valor(v) for v in linha])
+    pasta.save(destino)
+
+
+def _com_cabecalho(cabecalho, lotes):
+    yield [list(cabecalho)]
+    yield from lotes
+
+
+def exportar(cabecalho, lotes, formato, titulo="Dados"):
+    """Gera o arquivo no formato pedido ("csv" ou "xlsx") e o devolve aberto, posicionado no início."""
+    destino = tempfile.TemporaryFile()
+    if formato == "csv":
+        escrever_csv(destino, cabecalho, lotes)
+    elif formato == "xlsx":
+        escrever_xlsx(destino, cabecalho, lotes, titulo)
+    else:
+        raise ValueError(f"Formato de exportação desconhecido: {formato}")
+    destino.seek(0)
+    return destino
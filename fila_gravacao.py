@@ -0,0 +1,159 @@
+"""Fila local (SQLite) das avaliações enviadas pelo formulário.
+
+O formulário só grava a avaliação nesta fila, o que é rápido e não depende
+da rede, e responde ao usuário na hora. Uma thread do processo envia as
+avaliações pendentes ao backend em lotes (um único append por lote). Se o
+envio falhar, o lote volta para a fila e é tentado de novo com espera
+crescente (2 s, 4 s, 8 s... até 5 min).
+
+A chave de cada item é o id_avaliacao: enviar o mesmo formulário duas vezes
+não duplica a fila e, antes de cada envio, as avaliações que já estão no
+backend (um envio anterior que deu certo, mas cuja resposta se perdeu) são
+descartadas em vez de reenviadas.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CAMINHO_FILA = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "fila_gravacao.sqlite")
+
+
+def contar_pendentes(caminho=CAMINHO_FILA):
+    """Itens gravados na fila em disco, sem abrir a FilaGravacao nem importar o pandas (0 se ela não existe).
+
+    Usada já na tela de senha, para retomar o envio do que ficou na fila antes
+    de uma queda ou reinício do servidor.
+    """
+    if not os.path.exists(caminho):
+        return 0
+    conn = sqlite3.connect(caminho)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM pendentes").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0  # arquivo sem a tabela (fila nunca usada)
+    finally:
+        conn.close()
+
+
+class FilaGravacao:
+    """Fila persistente de avaliações a gravar no backend, com a thread que a esvazia."""
+
+    def __init__(self, backend, caminho=CAMINHO_FILA, ao_gravar=None, lote_maximo=20, espera_inicial=2, espera_maxima=300):
+        if caminho != ":memory:":
+            os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        self._backend = backend
+        self._ao_gravar = ao_gravar or (lambda: None)
+        self.lote_maximo = lote_maximo
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+
+        self._conn = sqlite3.connect(caminho, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pendentes ("
+                "id_avaliacao TEXT PRIMARY KEY, linhas TEXT, enfileirada_em REAL, "
+                "tentativas INTEGER DEFAULT 0, proxima_tentativa REAL, ultimo_erro TEXT)"
+            )
+            # Itens deixados por um processo anterior vão logo na primeira passada, sem herdar a espera dele
+            self._conn.execute("UPDATE pendentes SET proxima_tentativa = ?", (time.time(),))
+        self.ultimo_envio = None
+        self._acordar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="fila-gravacao", daemon=True)
+        self._thread.start()
+
+    def enfileirar(self, df_novos_votos):
+        """Guarda as linhas de uma avaliação na fila e avisa a thread. Retorna False se o id já estava na fila."""
+        from armazenamento import votos_como_texto
+
+        id_avaliacao = str(df_novos_votos['id_avaliacao'].iloc[0])
+        agora = time.time()
+        with self._lock, self._conn:
+            inseridas = self._conn.execute(
+                "INSERT OR IGNORE INTO pendentes (id_avaliacao, linhas, enfileirada_em, proxima_tentativa) VALUES (?, ?, ?, ?)",
+                (id_avaliacao, json.dumps(votos_como_texto(df_novos_votos)), agora, agora),
+            ).rowcount
+        self._acordar.set()
+        return inseridas == 1
+
+    def solicitar_envio(self):
+        """Antecipa a próxima tentativa de todos os itens pendentes."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE pendentes SET proxima_tentativa = ?", (time.time(),))
+        self._acordar.set()
+
+    def pendentes(self):
+        """Itens na fila, do mais antigo para o mais novo."""
+        import pandas as pd
+
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT id_avaliacao, enfileirada_em, tentativas, proxima_tentativa, ultimo_erro FROM pendentes ORDER BY enfileirada_em",
+                self._conn,
+            )
+        for coluna in ('enfileirada_em', 'proxima_tentativa'):
+            df[coluna] = pd.to_datetime(df[coluna], unit='s', utc=True).dt.tz_convert("America/Sao_Paulo")
+        return df
+
+    def situacao(self):
+        """Profundidade da fila e atraso (segundos) do item mais antigo."""
+        with self._lock:
+            profundidade, mais_antiga = self._conn.execute("SELECT COUNT(*), MIN(enfileirada_em) FROM pendentes").fetchone()
+        return {
+            "profundidade": profundidade,
+            "atraso": time.time() - mais_antiga if mais_antiga is not None else 0.0,
+            "ultimo_envio": self.ultimo_envio,
+        }
+
+    # --- ENVIO ---
+    def _proximo_lote(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id_avaliacao, linhas, tentativas FROM pendentes WHERE proxima_tentativa <= ? ORDER BY enfileirada_em LIMIT ?",
+                (time.time(), self.lote_maximo),
+            ).fetchall()
+
+    def _enviar(self, lote):
+        import pandas as pd
+
+        from armazenamento import COLUNAS_VOTOS
+
+        ids = [id_avaliacao for id_avaliacao, _, _ in lote]
+        try:
+            self._backend.sincronizar()
+            ja_gravadas = {str(id_aval) for id_aval in self._backend.avaliacoes_gravadas(ids)}
+            linhas = [linha for id_avaliacao, linhas_json, _ in lote if id_avaliacao not in ja_gravadas for linha in json.loads(linhas_json)]
+            if linhas:
+                self._backend.acrescentar(pd.DataFrame(linhas, columns=COLUNAS_VOTOS))
+        except Exception as e:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "UPDATE pendentes SET tentativas = ?, proxima_tentativa = ?, ultimo_erro = ? WHERE id_avaliacao = ?",
+                    [
+                        (tentativas + 1, time.time() + min(self.espera_maxima, self.espera_inicial * 2 ** tentativas), str(e), id_avaliacao)
+                        for id_avaliacao, _, tentativas in lote
+                    ],
+                )
+            return
+
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM pendentes WHERE id_avaliacao = ?", [(id_avaliacao,) for id_avaliacao in ids])
+        self.ultimo_envio = time.time()
+        try:
+            self._ao_gravar()
+        except Exception:
+            # Falhar ao atualizar o retrato não desfaz a gravação; a thread do atualizador recarrega depois
+            pass
+
+    def _executar(self):
+        while True:
+            lote = self._proximo_lote()
+            if lote:
+                self._enviar(lote)
+                continue
+            with self._lock:
+                (proxima,) = self._conn.execute("SELECT MIN(proxima_tentativa) FROM pendentes").fetchone()
+            self._acordar.wait(None if proxima is None else max(proxima - time.time(), 0))
+            self._acordar.clear()
@@ -0,0 +1,54 @@
+"""Conteúdo fixo do formulário de NOVA AVALIAÇÃO, montado uma única vez (na importação do módulo).
+
+Os critérios de cada categoria (legenda geral das notas + RUBRICA de cada
+pergunta) viram um único texto Markdown, desenhado com um st.markdown dentro
+do popover, em vez de um DataFrame e um st.table por pergunta a cada
+execução. As chaves e rótulos dos widgets de cada categoria também ficam
+prontos; só os widgets em si precisam ser recriados a cada execução.
+"""
+from constantes import PERGUNTAS, RUBRICA
+
+LEGENDA_GERAL = [
+    ("1", "Needs improvement"),
+    ("2", "Meets partially the expectations"),
+    ("3", "Meets the expectations"),
+    ("4", "Exceed partially the expectations"),
+    ("5", "Exceed the expectations"),
+]
+
+
+def _tabela_markdown(cabecalho, linhas):
+    def celula(valor):
+        return str(valor).replace("|", "\\|").replace("\n", " ")
+
+    partes = ["| " + " | ".join(cabecalho) + " |", "|" + "---|" * len(cabecalho)]
+    partes += ["| " + " | ".join(celula(valor) for valor in linha) + " |" for linha in linhas]
+    return "\n".join(partes)
+
+
+def _criterios_da_categoria(categoria, perguntas_categoria):
+    partes = [f"### Critérios para: **{categoria}**", _tabela_markdown(["Nota", "Significado"], LEGENDA_GERAL), "---"]
+    for pid, ptexto in perguntas_categoria.items():
+        partes.append(f"##### Pergunta {pid}: {ptexto}")
+        if categoria in RUBRICA and pid in RUBRICA[categoria]:
+            partes.append(_tabela_markdown(["Nota", "Descrição do Critério"], enumerate(RUBRICA[categoria][pid], start=1)))
+        else:
+            partes.append(":warning: Critérios para esta pergunta não definidos.")
+    return "\n\n".join(partes)
+
+
+# Texto do popover "Ver Critérios" de cada categoria
+CRITERIOS_POR_CATEGORIA = {
+    categoria: _criterios_da_categoria(categoria, perguntas_categoria)
+    for categoria, perguntas_categoria in PERGUNTAS.items()
+}
+
+# Por categoria: (categoria, [(chave do voto, rótulo da pergunta)], chave do comentário)
+LAYOUT_FORMULARIO = [
+    (
+        categoria,
+        [(f"vote_{categoria}_{pid}", f"**{pid}** - {ptexto}") for pid, ptexto in perguntas_categoria.items()],
+        f"comment_{categoria}",
+    )
+    for categoria, perguntas_categoria in PERGUNTAS.items()
+]
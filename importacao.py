@@ -0,0 +1,239 @@
+"""Importação em lote de avaliações antigas a partir de arquivos XLSX ou CSV.
+
+O arquivo tem uma linha por pergunta, como a aba de votos, e a primeira
+linha é o cabeçalho (os nomes de COLUNAS_VOTOS; pergunta_texto e comentario
+são opcionais). Ele é lido em lotes: o XLSX no modo read-only do openpyxl,
+que não carrega a pasta de trabalho inteira, e o CSV com o leitor em
+pedaços do pandas.
+
+Cada lote é validado com operações vetorizadas contra EMPRESAS, PERGUNTAS,
+OPCOES_VOTO e ANOS_AVALIACAO. Depois, avaliação por avaliação (mesmo
+id_avaliacao): uma avaliação só é aceita inteira e com todas as perguntas
+do formulário (como as enviadas pela aplicação; a contagem de avaliações
+do ranking depende disso), e as que já estão no
+armazenamento são recusadas, para que importar o mesmo arquivo de novo não
+duplique votos. As aceitas são gravadas em lotes de avaliações inteiras
+(lotes_de_avaliacoes); se um lote falhar, a importação continua dele,
+depois de conferir quais avaliações já chegaram ao armazenamento
+(separar_ja_gravadas).
+"""
+import csv
+import io
+import os
+from datetime import timedelta, timezone
+
+import pandas as pd
+
+from armazenamento import COLUNAS_VOTOS
+from constantes import ANOS_AVALIACAO, EMPRESAS, OPCOES_VOTO, PERGUNTAS, TEXTOS_PERGUNTAS
+
+TAMANHO_LOTE = 5000
+COLUNAS_OPCIONAIS = ["pergunta_texto", "comentario"]
+COLUNAS_OBRIGATORIAS = [col for col in COLUNAS_VOTOS if col not in COLUNAS_OPCIONAIS]
+COLUNAS_REJEITADAS = ["linha", "id_avaliacao", "motivo"]
+
+# Os ids são gravados como o formulário grava (horário de Brasília, com microssegundos e fuso -03:00):
+# o pandas só interpreta a coluna inteira se todos os ids tiverem o mesmo formato e o mesmo fuso
+FUSO_IDS = timezone(timedelta(hours=-3))
+EMPRESAS_POR_NOME = {empresa.upper(): empresa for empresa in EMPRESAS}
+PERGUNTAS_VALIDAS = {f"{categoria}|{pid}" for categoria, perguntas_categoria in PERGUNTAS.items() for pid in perguntas_categoria}
+
+
+# --- LEITURA EM LOTES ---
+def _cabecalho(valores):
+    return [str(valor).strip().lower() if valor is not None else "" for valor in valores]
+
+
+def _conferir_cabecalho(cabecalho):
+    faltando = [col for col in COLUNAS_OBRIGATORIAS if col not in cabecalho]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes no cabeçalho: {', '.join(faltando)}")
+
+
+def _lote(linhas, cabecalho, primeira_linha):
+    """DataFrame (tudo object) de um lote, com o número de cada linha no arquivo."""
+    lote = pd.DataFrame(linhas, columns=cabecalho, dtype=object)
+    lote = lote.loc[:, [col for col in dict.fromkeys(cabecalho) if col in COLUNAS_VOTOS]]
+    lote.insert(0, "linha", range(primeira_linha, primeira_linha + len(lote)))
+    return lote
+
+
+def _lotes_xlsx(arquivo, tamanho_lote):
+    from openpyxl import load_workbook  # o CSV não precisa do openpyxl
+
+    pasta = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = pasta.worksheets[0].iter_rows(values_only=True)
+        cabecalho = _cabecalho(next(linhas, ()))
+        _conferir_cabecalho(cabecalho)
+        lote, primeira_linha = [], 2
+        for numero, linha in enumerate(linhas, start=2):
+            if all(valor is None or valor == "" for valor in linha):
+                continue
+            if not lote:
+                primeira_linha = numero
+            lote.append(tuple(linha[:len(cabecalho)]) + (None,) * (len(cabecalho) - len(linha)))
+            if len(lote) == tamanho_lote:
+                yield _lote(lote, cabecalho, primeira_linha)
+                lote = []
+        if lote:
+            yield _lote(lote, cabecalho, primeira_linha)
+    finally:
+        pasta.close()
+
+
+def _lotes_csv(arquivo, tamanho_lote):
+    texto = io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+    primeira = texto.readline()
+    # O Excel em português grava CSV com ponto e vírgula
+    separador = ";" if primeira.count(";") > primeira.count(",") else ","
+    cabecalho = _cabecalho(next(csv.reader([primeira], delimiter=separador), []))
+    _conferir_cabecalho(cabecalho)
+    leitor = pd.read_csv(texto, sep=separador, header=None, names=cabecalho, dtype=str, keep_default_na=False, chunksize=tamanho_lote)
+    linha = 2
+    try:
+        for pedaco in leitor:
+            yield _lote(pedaco.to_numpy(dtype=object), cabecalho, linha)
+            linha += len(pedaco)
+    finally:
+        texto.detach()  # sem fechar o arquivo recebido
+
+
+def ler_lotes(arquivo, nome_arquivo, tamanho_lote=TAMANHO_LOTE):
+    """Lotes (DataFrames) das linhas do arquivo; `arquivo` é um arquivo binário aberto (ou o upload do Streamlit)."""
+    extensao = os.path.splitext(nome_arquivo)[1].lower()
+    if extensao == ".xlsx":
+        return _lotes_xlsx(arquivo, tamanho_lote)
+    if extensao == ".csv":
+        return _lotes_csv(arquivo, tamanho_lote)
+    raise ValueError(f"Formato de importação desconhecido: {extensao or nome_arquivo}")
+
+
+# --- VALIDAÇÃO ---
+def _texto(coluna):
+    return coluna.astype(object).where(coluna.notna(), "").astype(str).str.strip()
+
+
+def _inteiro_como_texto(coluna):
+    """'3', 3, 3.0 -> '3'; o que não for número inteiro volta como o texto original (em maiúsculas)."""
+    numeros = pd.to_numeric(coluna, errors='coerce')
+    inteiros = numeros.notna() & (numeros == numeros.round())
+    texto = _texto(coluna).str.upper()
+    texto[inteiros] = numeros[inteiros].astype('int64').astype(str)
+    return texto
+
+
+def _ids_padronizados(coluna):
+    """Ids como o formulário grava; datas sem fuso são horário de Brasília. Ids inválidos ficam vazios."""
+    texto = _texto(coluna)
+    com_fuso = texto.str.contains(r"(?:[+-]\d{2}:?\d{2}|Z)$", regex=True)
+    momentos = pd.concat([
+        pd.to_datetime(texto[com_fuso], errors='coerce', format='mixed', utc=True).dt.tz_convert(FUSO_IDS),
+        pd.to_datetime(texto[~com_fuso], errors='coerce', format='mixed').dt.tz_localize(FUSO_IDS),
+    ]).reindex(texto.index)
+    ids = momentos.dt.strftime("%Y-%m-%d %H:%M:%S.%f") + "-03:00"
+    return ids.where(momentos.notna(), "")
+
+
+def validar_lote(lote):
+    """Valida as linhas de um lote; retorna (votos aceitos em COLUNAS_VOTOS + 'linha', rejeitadas em COLUNAS_REJEITADAS)."""
+    votos = pd.DataFrame({"linha": lote["linha"]})
+    votos["user_name"] = _texto(lote["user_name"])
+    votos["id_avaliacao"] = _ids_padronizados(lote["id_avaliacao"])
+    votos["ano_avaliacao"] = _inteiro_como_texto(lote["ano_avaliacao"])
+    votos["projeto"] = _texto(lote["projeto"])
+    votos["empresa"] = _texto(lote["empresa"]).str.upper().map(EMPRESAS_POR_NOME)
+    votos["categoria"] = _texto(lote["categoria"]).str.upper()
+    votos["pergunta_id"] = _texto(lote["pergunta_id"])
+    votos["pergunta_texto"] = votos["pergunta_id"].map(TEXTOS_PERGUNTAS)
+    votos["voto"] = _inteiro_como_texto(lote["voto"])
+    votos["comentario"] = _texto(lote["comentario"]) if "comentario" in lote else ""
+
+    # Na ordem: cada linha recebe o primeiro motivo que se aplicar
+    problemas = [
+        (votos["id_avaliacao"] == "", "id_avaliacao não é uma data válida"),
+        (votos["user_name"] == "", "user_name vazio"),
+        (votos["projeto"] == "", "projeto vazio"),
+        (~votos["ano_avaliacao"].isin([str(ano) for ano in ANOS_AVALIACAO]), "ano_avaliacao fora de ANOS_AVALIACAO"),
+        (votos["empresa"].isna(), "empresa fora de EMPRESAS"),
+        (~(votos["categoria"] + "|" + votos["pergunta_id"]).isin(PERGUNTAS_VALIDAS), "categoria/pergunta_id fora de PERGUNTAS"),
+        (~votos["voto"].isin(OPCOES_VOTO), "voto fora de OPCOES_VOTO"),
+    ]
+    motivo = pd.Series(None, index=votos.index, dtype=object)
+    for condicao, descricao in reversed(problemas):
+        motivo[condicao] = descricao
+
+    recusadas = motivo.notna()
+    rejeitadas = pd.DataFrame({"linha": lote["linha"][recusadas], "id_avaliacao": _texto(lote["id_avaliacao"])[recusadas], "motivo": motivo[recusadas]})
+    return votos[~recusadas], rejeitadas
+
+
+def _rejeitar_avaliacoes(votos, recusadas, motivo):
+    """Separa as linhas das avaliações marcadas em `recusadas` (máscara por linha) como rejeitadas."""
+    # Sem a coluna "linha" (votos já guardados para gravar), o número da linha fica vazio
+    rejeitadas = votos.loc[recusadas].reindex(columns=["linha", "id_avaliacao"]).assign(motivo=motivo)
+    return votos[~recusadas], rejeitadas
+
+
+def separar_ja_gravadas(votos, avaliacoes_gravadas):
+    """Separa as linhas das avaliações que `avaliacoes_gravadas` (função do backend) diz já estarem no armazenamento."""
+    if avaliacoes_gravadas is None or votos.empty:
+        return votos, pd.DataFrame(columns=COLUNAS_REJEITADAS)
+    gravadas = avaliacoes_gravadas(pd.to_datetime(votos["id_avaliacao"].drop_duplicates()).tolist())
+    ids_gravados = set(_ids_padronizados(pd.Series([str(id_aval) for id_aval in gravadas], dtype=object)))
+    return _rejeitar_avaliacoes(votos, votos["id_avaliacao"].isin(ids_gravados), "avaliação já registrada")
+
+
+def validar_arquivo(arquivo, nome_arquivo, avaliacoes_gravadas=None, tamanho_lote=TAMANHO_LOTE):
+    """Valida o arquivo inteiro, lote a lote e depois por avaliação.
+
+    `avaliacoes_gravadas` é a função do backend que diz quais ids já estão
+    no armazenamento. Retorna um dicionário com "votos" (linhas aceitas, em
+    COLUNAS_VOTOS), "rejeitadas" (linha no arquivo, id e motivo), "linhas"
+    (linhas lidas) e "avaliacoes" (avaliações aceitas).
+    """
+    aceitos, rejeitadas, linhas = [], [], 0
+    for lote in ler_lotes(arquivo, nome_arquivo, tamanho_lote):
+        linhas += len(lote)
+        votos_lote, rejeitadas_lote = validar_lote(lote)
+        aceitos.append(votos_lote)
+        rejeitadas.append(rejeitadas_lote)
+
+    votos = pd.concat(aceitos, ignore_index=True) if aceitos else pd.DataFrame(columns=["linha"] + COLUNAS_VOTOS)
+    rejeitadas = pd.concat(rejeitadas, ignore_index=True) if rejeitadas else pd.DataFrame(columns=COLUNAS_REJEITADAS)
+
+    # Uma avaliação só entra inteira: se alguma linha dela foi recusada, as demais também são
+    ids_recusados = set(_ids_padronizados(rejeitadas["id_avaliacao"])) - {""}
+    votos, incompletas = _rejeitar_avaliacoes(votos, votos["id_avaliacao"].isin(ids_recusados), "avaliação com outras linhas rejeitadas")
+
+    # O id identifica a avaliação: não pode ser compartilhado por contextos diferentes nem repetir pergunta
+    contextos = votos.groupby("id_avaliacao")[["user_name", "ano_avaliacao", "projeto", "empresa"]].transform("nunique").max(axis=1)
+    votos, ambiguas = _rejeitar_avaliacoes(votos, contextos > 1, "id_avaliacao repetido em avaliações diferentes")
+    repetidas = votos.duplicated(["id_avaliacao", "categoria", "pergunta_id"], keep=False)
+    votos, duplicadas = _rejeitar_avaliacoes(votos, votos["id_avaliacao"].isin(votos.loc[repetidas, "id_avaliacao"]), "pergunta repetida na avaliação")
+    # Sem perguntas repetidas ou fora de PERGUNTAS, a avaliação completa tem exatamente uma linha por pergunta
+    respondidas = votos.groupby("id_avaliacao")["pergunta_id"].transform("size")
+    votos, faltando = _rejeitar_avaliacoes(votos, respondidas < len(PERGUNTAS_VALIDAS), "avaliação sem todas as perguntas do formulário")
+
+    votos, ja_gravadas = separar_ja_gravadas(votos, avaliacoes_gravadas)
+
+    rejeitadas = pd.concat([rejeitadas, incompletas, ambiguas, duplicadas, faltando, ja_gravadas], ignore_index=True)
+    return {
+        "votos": votos[COLUNAS_VOTOS].reset_index(drop=True),
+        "rejeitadas": rejeitadas.sort_values("linha", kind="stable").reset_index(drop=True),
+        "linhas": linhas,
+        "avaliacoes": votos["id_avaliacao"].nunique(),
+    }
+
+
+# --- GRAVAÇÃO ---
+def lotes_de_avaliacoes(votos, tamanho_lote=TAMANHO_LOTE):
+    """Divide as linhas aceitas em lotes de avaliações inteiras, com no máximo `tamanho_lote` linhas cada.
+
+    Toda avaliação aceita tem uma linha por pergunta do formulário, então
+    basta contar avaliações; nenhuma fica dividida entre duas gravações.
+    """
+    avaliacoes_por_lote = max(1, tamanho_lote // len(PERGUNTAS_VALIDAS))
+    numero_lote = pd.factorize(votos["id_avaliacao"])[0] // avaliacoes_por_lote
+    for _, lote in votos.groupby(numero_lote, sort=True):
+        yield lote
@@ -0,0 +1,125 @@
+"""Medição de cada execução da página e das chamadas à API do Google Sheets.
+
+Cada execução da página (rerun) abre uma Execucao e marca o início de cada
+fase (conexão, carga dos votos, imagem de fundo, cálculo e desenho de cada
+aba...): a fase anterior termina quando a próxima começa. Para cada fase
+ficam o tempo e as chamadas à API feitas pela própria execução.
+
+As chamadas à API são contadas por um hook de resposta na sessão HTTP do
+gspread: número de chamadas e bytes trafegados (pedido + resposta), por
+thread (a da página, a do atualizador e a da fila de gravação).
+
+O Medidor guarda as últimas JANELA execuções do processo e, se pedido,
+acrescenta cada fase medida a um arquivo JSON Lines.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+JANELA = 200
+CAMINHO_METRICAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "metricas.jsonl")
+
+
+class Execucao:
+    """Fases de uma execução da página, marcadas em sequência."""
+
+    def __init__(self, medidor):
+        self.medidor = medidor
+        self.momento = datetime.now()
+        self.fases = {}
+        self._atual = None
+
+    def fase(self, nome):
+        """Encerra a fase em andamento e começa `nome` (None só encerra)."""
+        agora = time.perf_counter()
+        chamadas, bytes_api = self.medidor.api_da_thread()
+        if self._atual is not None:
+            nome_atual, inicio, chamadas_inicio, bytes_inicio = self._atual
+            self.medidor.registrar_fase(self, nome_atual, {
+                "segundos": agora - inicio,
+                "chamadas_api": chamadas - chamadas_inicio,
+                "bytes_api": bytes_api - bytes_inicio,
+            })
+        self._atual = (nome, agora, chamadas, bytes_api) if nome is not None else None
+
+    def encerrar(self):
+        self.fase(None)
+
+
+class Medidor:
+    """Execuções recentes do processo e contadores da API, compartilhados entre as sessões."""
+
+    def __init__(self, janela=JANELA, caminho_log=CAMINHO_METRICAS):
+        self.execucoes = deque(maxlen=janela)
+        self.api_por_thread = {}
+        self.caminho_log = caminho_log
+        self.gravar_log = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # --- API DO GOOGLE SHEETS ---
+    def instrumentar_sessao(self, sessao):
+        """Conta as respostas de uma sessão do requests (a do gspread: client.http_client.session)."""
+        ganchos = sessao.hooks.setdefault("response", [])
+        if self._registrar_resposta not in ganchos:
+            ganchos.append(self._registrar_resposta)
+
+    def _registrar_resposta(self, resposta, *args, **kwargs):
+        corpo = getattr(resposta.request, "body", None) or b""
+        tamanho = len(resposta.content or b"") + len(corpo)
+        self._local.chamadas = getattr(self._local, "chamadas", 0) + 1
+        self._local.bytes = getattr(self._local, "bytes", 0) + tamanho
+        with self._lock:
+            totais = self.api_por_thread.setdefault(threading.current_thread().name, {"chamadas": 0, "bytes": 0})
+            totais["chamadas"] += 1
+            totais["bytes"] += tamanho
+
+    def api_da_thread(self):
+        """Chamadas e bytes acumulados pela thread atual."""
+        return getattr(self._local, "chamadas", 0), getattr(self._local, "bytes", 0)
+
+    # --- EXECUÇÕES DA PÁGINA ---
+    def nova_execucao(self):
+        execucao = Execucao(self)
+        with self._lock:
+            self.execucoes.append(execucao)
+        return execucao
+
+    def registrar_fase(self, execucao, nome, medida):
+        with self._lock:
+            execucao.fases[nome] = medida
+        if self.gravar_log:
+            os.makedirs(os.path.dirname(self.caminho_log), exist_ok=True)
+            with open(self.caminho_log, "a", encoding="utf-8") as arquivo:
+                arquivo.write(json.dumps({"execucao": execucao.momento.isoformat(), "fase": nome, **medida}, ensure_ascii=False) + "\n")
+
+    def fases(self):
+        """Uma linha por fase medida nas execuções recentes (momento, fase, segundos, chamadas_api, bytes_api)."""
+        import pandas as pd  # o medidor roda já na tela de senha, que não importa o pandas
+
+        with self._lock:
+            registros = [
+                {"momento": execucao.momento, "fase": nome, **medida}
+                for execucao in self.execucoes for nome, medida in execucao.fases.items()
+            ]
+        return pd.DataFrame(registros, columns=["momento", "fase", "segundos", "chamadas_api", "bytes_api"])
+
+    def percentis(self):
+        """p50, p95 e máximo (em ms) de cada fase nas execuções recentes, das fases mais lentas para as mais rápidas."""
+        import pandas as pd
+
+        df = self.fases()
+        if df.empty:
+            return pd.DataFrame(columns=["fase", "execuções", "p50 (ms)", "p95 (ms)", "máx. (ms)", "chamadas API (média)"])
+        grupos = df.groupby("fase")
+        tabela = pd.DataFrame({
+            "execuções": grupos.size(),
+            "p50 (ms)": grupos["segundos"].quantile(0.5) * 1000,
+            "p95 (ms)": grupos["segundos"].quantile(0.95) * 1000,
+            "máx. (ms)": grupos["segundos"].max() * 1000,
+            "chamadas API (média)": grupos["chamadas_api"].mean(),
+        })
+        return tabela.sort_values("p95 (ms)", ascending=False).round(1).reset_index()
@@ -0,0 +1,91 @@
+"""Cálculos do ranking, do relatório de médias e das listas de avaliações.
+
+O ranking e as médias partem da tabela de agregados (soma e contagem das
+notas por ano, projeto, empresa e categoria), que é pequena: filtrar e
+somar de novo essa tabela substitui percorrer todos os votos a cada
+interação. As listas de avaliações são filtradas e paginadas antes de
+qualquer coisa ser desenhada na tela.
+"""
+import math
+
+import pandas as pd
+
+COLUNAS_RESUMO = ['id_avaliacao', 'ano_avaliacao', 'projeto', 'empresa', 'user_name']
+
+
+def filtrar_agregados(df_agregados, anos=None, projetos=None, empresas=None):
+    """Aplica os filtros do relatório de médias; listas vazias não filtram."""
+    df = df_agregados
+    if anos:
+        df = df[df['ano_avaliacao'].isin(anos)]
+    if projetos:
+        df = df[df['projeto'].isin(projetos)]
+    if empresas:
+        df = df[df['empresa'].isin(empresas)]
+    return df
+
+
+def medias_por_categoria(df_agregados):
+    """Média das notas por empresa e categoria (colunas empresa, categoria, media_avaliacao)."""
+    somas = df_agregados.groupby(['empresa', 'categoria'], as_index=False)[['soma', 'n_votos']].sum()
+    somas = somas[somas['n_votos'] > 0]
+    somas['media_avaliacao'] = somas['soma'] / somas['n_votos']
+    return somas[['empresa', 'categoria', 'media_avaliacao']]
+
+
+def medias_por_pergunta(df_votos):
+    """Média e número de notas de cada pergunta (categoria, pergunta_id, media_avaliacao, n_votos); N/A não conta."""
+    validos = df_votos[df_votos['voto'].notna()]
+    return (
+        validos.groupby(['categoria', 'pergunta_id'], observed=True)['voto']
+        .agg(media_avaliacao='mean', n_votos='count')
+        .reset_index()
+    )
+
+
+def ranking_geral(df_agregados):
+    """Média geral de cada empresa e o número de avaliações recebidas, ordenados pela média."""
+    somas = df_agregados.groupby('empresa')[['soma', 'n_votos']].sum()
+    somas = somas[somas['n_votos'] > 0]
+    media = (somas['soma'] / somas['n_votos']).rename('Média Geral')
+
+    # Toda avaliação tem linhas em todas as categorias (o formulário e a importação exigem todas as perguntas);
+    # o máximo entre as categorias conta cada avaliação uma vez
+    contagem = (
+        df_agregados.groupby(['ano_avaliacao', 'projeto', 'empresa'])['n_avaliacoes'].max()
+        .groupby('empresa').sum()
+        .rename('Nº de Avaliações')
+    )
+    ranking = pd.concat([media, contagem], axis=1, join='inner').rename_axis('empresa').reset_index()
+    ranking['Nº de Avaliações'] = ranking['Nº de Avaliações'].astype(int)
+    return ranking.sort_values(by='Média Geral', ascending=False).reset_index(drop=True)
+
+
+def resumo_avaliacoes(df_votos):
+    """Uma linha por avaliação (data, ano, projeto, empresa e avaliador), da mais recente para a mais antiga."""
+    return df_votos[COLUNAS_RESUMO].drop_duplicates().sort_values(by='id_avaliacao', ascending=False).reset_index(drop=True)
+
+
+def filtrar_resumo(df_resumo, busca="", anos=None, projetos=None, empresas=None, avaliadores=None):
+    """Filtra o resumo de avaliações; a busca procura o texto (sem diferenciar maiúsculas) em projeto, empresa e avaliador."""
+    df = df_resumo
+    for coluna, valores in (('ano_avaliacao', anos), ('projeto', projetos), ('empresa', empresas), ('user_name', avaliadores)):
+        if valores:
+            df = df[df[coluna].isin(valores)]
+    busca = busca.strip()
+    if busca:
+        encontrados = pd.Series(False, index=df.index)
+        for coluna in ('projeto', 'empresa', 'user_name'):
+            encontrados |= df[coluna].astype(str).str.contains(busca, case=False, regex=False)
+        df = df[encontrados]
+    return df
+
+
+def total_de_paginas(n_itens, tamanho_pagina):
+    return max(1, math.ceil(n_itens / tamanho_pagina))
+
+
+def paginar(df, pagina, tamanho_pagina):
+    """Linhas da página informada (a primeira página é 1)."""
+    inicio = (pagina - 1) * tamanho_pagina
+    return df.iloc[inicio:inicio + tamanho_pagina]
@@ -0,0 +1,185 @@
+"""Gera um relatório HTML por fornecedor (todas as empresas de EMPRESAS) para um ano de avaliação.
+
+Roda sem o Streamlit, a partir da base local dos votos (a cópia SQLite que a
+aplicação mantém sincronizada com a planilha, ou a base do backend SQLite).
+Cada relatório traz o gráfico das médias por categoria, a tabela das médias
+por pergunta com o critério da RUBRICA correspondente à nota média, os
+projetos avaliados e os comentários. Um index.html lista o ranking do ano
+com os links.
+
+Os relatórios são montados em paralelo, um fornecedor por tarefa, em um
+pool de processos. O plotly.js é gravado uma única vez na pasta de saída e
+os relatórios o referenciam, então funcionam sem internet.
+
+Uso (na raiz do repositório):
+    python relatorios_fornecedores.py --ano 2024 [--base .cache/votos.sqlite] [--saida relatorios_2024] [--processos 4]
+"""
+import argparse
+import html
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from armazenamento import preparar_votos
+from cache_votos import CAMINHO_CACHE_VOTOS, CacheVotos
+from constantes import ANOS_AVALIACAO, EMPRESAS, PERGUNTAS, RUBRICA
+from relatorios import filtrar_agregados, medias_por_categoria, medias_por_pergunta, ranking_geral
+
+ESTILO = """
+body { font-family: Arial, sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; margin: 1em 0; }
+th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: left; vertical-align: top; }
+th { background: #f0f0f0; }
+.numero { text-align: right; }
+"""
+
+
+def nome_de_arquivo(empresa):
+    return re.sub(r"[^A-Za-z0-9]+", "_", empresa).strip("_").lower() + ".html"
+
+
+def _pagina(titulo, corpo):
+    return (
+        f"<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'><title>{html.escape(titulo)}</title>"
+        f"<style>{ESTILO}</style></head><body>{corpo}</body></html>"
+    )
+
+
+def _tabela(cabecalho, linhas):
+    celulas = "".join(f"<th>{html.escape(str(coluna))}</th>" for coluna in cabecalho)
+    corpo = "".join(
+        "<tr>" + "".join(
+            f"<td class='numero'>{valor:.2f}</td>" if isinstance(valor, float) else f"<td>{html.escape(str(valor))}</td>"
+            for valor in linha
+        ) + "</tr>"
+        for linha in linhas
+    )
+    return f"<table><tr>{celulas}</tr>{corpo}</table>"
+
+
+def criterio_da_nota(categoria, pergunta_id, media):
+    """Descrição da RUBRICA para a nota média arredondada (1 a 5)."""
+    criterios = RUBRICA.get(categoria, {}).get(pergunta_id)
+    if not criterios:
+        return "Critérios para esta pergunta não definidos."
+    nota = min(max(int(round(media)), 1), 5)
+    return f"{nota} - {criterios[nota - 1]}"
+
+
+def gerar_relatorio(tarefa):
+    """Monta e grava o relatório de um fornecedor. Roda nos processos do pool."""
+    import plotly.express as px  # importado só nos processos que desenham
+
+    empresa, ano, votos, medias, posicao, pasta = tarefa
+    partes = [f"<h1>{html.escape(empresa)}</h1><p><a href='index.html'>← Ranking {ano}</a></p>"]
+
+    if votos.empty:
+        partes.append(f"<p>Nenhuma avaliação registrada em {ano}.</p>")
+    else:
+        # Sem posição: a empresa foi avaliada, mas só recebeu N/A
+        resumo = f"<b>Avaliações:</b> {votos['id_avaliacao'].nunique()}"
+        if posicao is not None:
+            resumo = f"<b>Média geral:</b> {posicao['media']:.2f} | {resumo} | <b>Posição no ranking:</b> {posicao['posicao']}º de {posicao['total']}"
+        partes.append(f"<p>{resumo}</p>")
+
+        fig = px.bar(medias, x='categoria', y='media_avaliacao', color='categoria', text_auto='.2f', range_y=[0, 5], height=400)
+        fig.update_layout(showlegend=False, xaxis_title=None, yaxis_title="Média")
+        partes.append("<h2>Médias por categoria</h2>" + fig.to_html(full_html=False, include_plotlyjs=False))
+
+        por_pergunta = medias_por_pergunta(votos)
+        linhas = [
+            (linha.categoria, f"{linha.pergunta_id} - {PERGUNTAS.get(linha.categoria, {}).get(linha.pergunta_id, '')}",
+             float(linha.media_avaliacao), int(linha.n_votos), criterio_da_nota(linha.categoria, linha.pergunta_id, linha.media_avaliacao))
+            for linha in por_pergunta.itertuples(index=False)
+        ]
+        partes.append("<h2>Médias por pergunta</h2>" + _tabela(["Categoria", "Pergunta", "Média", "Notas", "Critério da nota média (RUBRICA)"], linhas))
+
+        projetos = votos.groupby('projeto', observed=True)['id_avaliacao'].nunique().sort_index()
+        partes.append("<h2>Projetos avaliados</h2>" + _tabela(["Projeto", "Avaliações"], projetos.items()))
+
+        comentarios = votos[['projeto', 'categoria', 'comentario']].drop_duplicates()
+        comentarios = comentarios[comentarios['comentario'].notna() & (comentarios['comentario'].astype(str).str.strip() != "")]
+        if not comentarios.empty:
+            partes.append("<h2>Comentários</h2>" + _tabela(["Projeto", "Categoria", "Comentário"], comentarios.itertuples(index=False)))
+
+    caminho = os.path.join(pasta, nome_de_arquivo(empresa))
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        arquivo.write(_pagina(f"{empresa} - {ano}", "<script src='plotly.min.js'></script>" + "".join(partes)))
+    return caminho
+
+
+def tarefas_do_ano(caminho_base, ano, pasta):
+    """Uma tarefa por empresa de EMPRESAS, com os votos e as médias do ano já separados; e o ranking do ano."""
+    banco = CacheVotos(caminho_base)
+    votos = preparar_votos(banco.dataframe())
+    votos = votos[votos['ano_avaliacao'].astype(str) == str(ano)]
+    # ano_avaliacao é texto na base, como nos votos acima; --ano chega como int
+    agregados = filtrar_agregados(banco.agregados(), anos=[str(ano)])
+
+    ranking = ranking_geral(agregados)
+    posicoes = {
+        linha.empresa: {"posicao": i + 1, "total": len(ranking), "media": linha[1]}
+        for i, linha in enumerate(ranking.itertuples(index=False))
+    }
+    medias = medias_por_categoria(agregados)
+    votos_por_empresa = dict(tuple(votos.groupby('empresa', observed=True)))
+    medias_por_empresa = dict(tuple(medias.groupby('empresa')))
+
+    tarefas = [
+        (empresa, ano, votos_por_empresa.get(empresa, votos.iloc[0:0]), medias_por_empresa.get(empresa, medias.iloc[0:0]), posicoes.get(empresa), pasta)
+        for empresa in EMPRESAS
+    ]
+    return tarefas, ranking
+
+
+def gravar_indice(pasta, ano, ranking):
+    linhas = [
+        (i + 1, f"<a href='{nome_de_arquivo(linha.empresa)}'>{html.escape(linha.empresa)}</a>", linha[1], linha[2])
+        for i, linha in enumerate(ranking.itertuples(index=False))
+    ]
+    corpo = "".join(
+        f"<tr><td>{posicao}</td><td>{link}</td><td class='numero'>{media:.2f}</td><td class='numero'>{n}</td></tr>"
+        for posicao, link, media, n in linhas
+    )
+    sem_avaliacao = sorted(set(EMPRESAS) - set(ranking['empresa']))
+    lista = "".join(f"<li><a href='{nome_de_arquivo(empresa)}'>{html.escape(empresa)}</a></li>" for empresa in sem_avaliacao)
+    with open(os.path.join(pasta, "index.html"), "w", encoding="utf-8") as arquivo:
+        arquivo.write(_pagina(f"Ranking {ano}", (
+            f"<h1>Ranking de fornecedores - {ano}</h1>"
+            f"<table><tr><th>Posição</th><th>Empresa</th><th>Média Geral</th><th>Nº de Avaliações</th></tr>{corpo}</table>"
+            + (f"<h2>Sem avaliações em {ano}</h2><ul>{lista}</ul>" if lista else "")
+        )))
+
+
+def gravar_plotlyjs(pasta):
+    from plotly.offline import get_plotlyjs
+
+    with open(os.path.join(pasta, "plotly.min.js"), "w", encoding="utf-8") as arquivo:
+        arquivo.write(get_plotlyjs())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ano", type=int, required=True, choices=ANOS_AVALIACAO)
+    parser.add_argument("--base", default=CAMINHO_CACHE_VOTOS, help="base SQLite dos votos (padrão: a cópia local mantida pela aplicação)")
+    parser.add_argument("--saida", help="pasta dos relatórios (padrão: relatorios_<ano>)")
+    parser.add_argument("--processos", type=int, default=os.cpu_count(), help="tamanho do pool de processos")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.base):
+        parser.error(f"base de votos não encontrada: {args.base}")
+    pasta = args.saida or f"relatorios_{args.ano}"
+    os.makedirs(pasta, exist_ok=True)
+
+    inicio = time.perf_counter()
+    tarefas, ranking = tarefas_do_ano(args.base, args.ano, pasta)
+    gravar_plotlyjs(pasta)
+    gravar_indice(pasta, args.ano, ranking)
+    with ProcessPoolExecutor(max_workers=args.processos) as pool:
+        caminhos = list(pool.map(gerar_relatorio, tarefas))
+    print(f"{len(caminhos)} relatórios de {args.ano} gravados em {pasta}/ em {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""acrescentar_votos: uma avaliação nova só acrescenta linhas ao fim da aba de votos."""
+import pytest
+
+from armazenamento import COLUNAS_VOTOS, acrescentar_votos
+from benchmarks.gerador import gerar_votos
+from benchmarks.planilha_falsa import AbaFalsa, planilha_com_votos
+
+PERGUNTAS_POR_AVALIACAO = 16
+
+
+@pytest.fixture
+def planilha():
+    return planilha_com_votos(gerar_votos(PERGUNTAS_POR_AVALIACAO * 3, semente=1))
+
+
+@pytest.fixture
+def nova():
+    return gerar_votos(PERGUNTAS_POR_AVALIACAO, semente=2)
+
+
+def test_so_acrescenta_as_linhas_novas(planilha, nova):
+    aba = planilha.get_worksheet(0)
+    antes = [list(linha) for linha in aba.valores]
+
+    assert acrescentar_votos(aba, nova, COLUNAS_VOTOS) == len(nova)
+    assert aba.valores[:len(antes)] == antes
+    assert aba.valores[len(antes):] == nova[COLUNAS_VOTOS].astype(str).values.tolist()
+    # Uma única chamada de append, sem limpar nem regravar nada
+    assert aba.chamadas == {"append_rows": 1}
+    assert planilha.chamadas == {}
+
+
+def test_linhas_seguem_a_ordem_do_cabecalho_da_aba(nova):
+    cabecalho = list(reversed(COLUNAS_VOTOS))
+    aba = AbaFalsa("Votos", [cabecalho])
+
+    acrescentar_votos(aba, nova)
+    assert aba.chamadas == {"row_values": 1, "append_rows": 1}
+    assert aba.valores[1:] == nova[cabecalho].astype(str).values.tolist()
+
+
+def test_aba_vazia_recebe_o_cabecalho_junto(nova):
+    aba = AbaFalsa("Votos")
+
+    acrescentar_votos(aba, nova)
+    assert aba.chamadas["append_rows"] == 1
+    assert aba.valores[0] == COLUNAS_VOTOS
+    assert len(aba.valores) == len(nova) + 1
+
+
+def test_formula_vira_texto(nova):
+    aba = AbaFalsa("Votos", [COLUNAS_VOTOS])
+    nova["comentario"] = "=HYPERLINK(\"http://exemplo\")"
+
+    acrescentar_votos(aba, nova, COLUNAS_VOTOS)
+    assert {linha[COLUNAS_VOTOS.index("comentario")] for linha in aba.valores[1:]} == {"'=HYPERLINK(\"http://exemplo\")"}
+
+
+def test_nada_a_gravar_nao_chama_a_api(nova):
+    aba = AbaFalsa("Votos", [COLUNAS_VOTOS])
+
+    assert acrescentar_votos(aba, nova.iloc[0:0], COLUNAS_VOTOS) == 0
+    assert aba.chamadas == {}
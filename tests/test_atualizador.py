@@ -0,0 +1,58 @@
+"""AtualizadorDados: as cargas pela rede não prendem as páginas nem os salvamentos."""
+import threading
+import time
+
+import pytest
+
+from atualizador import AtualizadorDados
+from backends import BackendSQLite
+from benchmarks.gerador import gerar_votos
+from cache_votos import CacheVotos
+
+PERGUNTAS_POR_AVALIACAO = 16
+
+
+class BackendProjetosLentos(BackendSQLite):
+    """Votos no SQLite; a lista de projetos só volta quando `liberar` é acionado (planilha lenta)."""
+
+    def __init__(self):
+        super().__init__(CacheVotos(":memory:"), projetos=["LCP-1 - TESTE"])
+        self.liberar = threading.Event()
+
+    def projetos(self):
+        self.liberar.wait(10)
+        return super().projetos()
+
+
+@pytest.fixture
+def backend():
+    backend = BackendProjetosLentos()
+    backend.acrescentar(gerar_votos(PERGUNTAS_POR_AVALIACAO * 3, semente=3))
+    yield backend
+    backend.liberar.set()
+
+
+def test_primeira_carga_lenta_tem_limite_de_espera(backend):
+    atualizador = AtualizadorDados(backend, intervalo_votos=3600, intervalo_projetos=3600)
+
+    inicio = time.perf_counter()
+    retrato = atualizador.aguardar_primeiro_retrato(timeout=0.2)
+    assert time.perf_counter() - inicio < 1
+    assert not atualizador.carregado and retrato.projetos == []
+
+    backend.liberar.set()
+    retrato = atualizador.aguardar_primeiro_retrato(timeout=5)
+    assert atualizador.carregado and retrato.projetos == ["LCP-1 - TESTE"]
+
+
+def test_salvamento_nao_espera_a_carga_de_projetos(backend):
+    atualizador = AtualizadorDados(backend, intervalo_votos=3600, intervalo_projetos=3600)
+    atualizador.aguardar_primeiro_retrato(timeout=0.2)  # a thread está parada na lista de projetos
+    novas = gerar_votos(PERGUNTAS_POR_AVALIACAO, semente=4)
+    backend.acrescentar(novas)
+
+    inicio = time.perf_counter()
+    retrato = atualizador.atualizar_votos()
+    assert time.perf_counter() - inicio < 1
+    assert len(retrato.votos) == PERGUNTAS_POR_AVALIACAO * 4
+    assert retrato.resumo["id_avaliacao"].nunique() == 4
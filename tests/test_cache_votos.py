@@ -0,0 +1,186 @@
+"""CacheVotos: sincronização com a aba de votos, lápides, compactação e agregados."""
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from armazenamento import COLUNAS_VOTOS, ler_votos_e_exclusoes
+from backends import BackendGoogleSheets, BackendSQLite
+from benchmarks.gerador import gerar_votos
+from benchmarks.planilha_falsa import planilha_com_votos
+from cache_votos import CacheVotos
+
+PERGUNTAS_POR_AVALIACAO = 16
+SEM_COMPACTACAO_AUTOMATICA = 10**9
+
+
+def agregados_pelo_pandas(votos):
+    """A tabela `agregados` recalculada do zero, a partir dos votos ativos."""
+    votos = votos.assign(
+        ano_avaliacao=votos["ano_avaliacao"].astype(int).astype(str),  # a coluna da tabela é texto
+        nota=pd.to_numeric(votos["voto"].where(~votos["voto"].str.strip().isin(["", "N/A"])), errors="coerce"),
+    )
+    esperado = votos.groupby(["ano_avaliacao", "projeto", "empresa", "categoria"]).agg(
+        soma=("nota", "sum"), n_votos=("nota", "count"), n_avaliacoes=("id_avaliacao", "nunique"),
+    )
+    return esperado.reset_index()
+
+
+def conferir_agregados(banco, votos_ativos):
+    chaves = ["ano_avaliacao", "projeto", "empresa", "categoria"]
+    obtido = banco.agregados().sort_values(chaves).reset_index(drop=True)
+    esperado = agregados_pelo_pandas(votos_ativos).sort_values(chaves).reset_index(drop=True)
+    pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False)
+
+
+@pytest.fixture
+def votos():
+    return gerar_votos(PERGUNTAS_POR_AVALIACAO * 30, semente=7)
+
+
+@pytest.fixture
+def planilha(votos):
+    return planilha_com_votos(votos)
+
+
+@pytest.fixture
+def backend_sheets(planilha, tmp_path):
+    return BackendGoogleSheets(
+        planilha, CacheVotos(":memory:"), caminho_indice_projetos=str(tmp_path / "projetos.json"),
+        limiar_compactacao=SEM_COMPACTACAO_AUTOMATICA,
+    )
+
+
+# --- SINCRONIZAÇÃO ---
+def test_primeira_sincronizacao_le_a_aba_inteira(backend_sheets, votos):
+    assert backend_sheets.sincronizar() == "completa"
+    assert backend_sheets.banco.linhas_lidas == len(votos)
+    pd.testing.assert_frame_equal(backend_sheets.votos(), votos.astype(str).reset_index(drop=True))
+
+
+def test_linhas_novas_sao_lidas_de_forma_incremental(backend_sheets, planilha, votos):
+    backend_sheets.sincronizar()
+    novas = gerar_votos(PERGUNTAS_POR_AVALIACAO * 2, semente=8)
+    planilha.get_worksheet(0).valores.extend(novas[COLUNAS_VOTOS].astype(str).values.tolist())
+
+    assert backend_sheets.sincronizar() == "incremental"
+    assert backend_sheets.banco.linhas_lidas == len(votos) + len(novas)
+    esperado = pd.concat([votos, novas], ignore_index=True).astype(str)
+    pd.testing.assert_frame_equal(backend_sheets.votos(), esperado)
+    conferir_agregados(backend_sheets.banco, esperado)
+
+
+def test_sem_novidades_a_sincronizacao_continua_incremental(backend_sheets, votos):
+    backend_sheets.sincronizar()
+    assert backend_sheets.sincronizar() == "incremental"
+    assert backend_sheets.banco.linhas_lidas == len(votos)
+
+
+def test_aba_regravada_recarrega_tudo(backend_sheets, planilha, votos):
+    backend_sheets.sincronizar()
+    # A última linha conhecida mudou: a aba foi regravada por outro processo
+    aba = planilha.get_worksheet(0)
+    restantes = votos.iloc[:-PERGUNTAS_POR_AVALIACAO]
+    aba.valores = [COLUNAS_VOTOS] + restantes.astype(str).values.tolist()
+
+    assert backend_sheets.sincronizar() == "completa"
+    assert backend_sheets.banco.linhas_lidas == len(restantes)
+    pd.testing.assert_frame_equal(backend_sheets.votos(), restantes.astype(str).reset_index(drop=True))
+    conferir_agregados(backend_sheets.banco, restantes.astype(str))
+
+
+def leitura_da_planilha(planilha):
+    """O `ler` que o BackendGoogleSheets passa para CacheVotos.sincronizar."""
+    return lambda intervalo, inicio: ler_votos_e_exclusoes(planilha, planilha.get_worksheet(0).title, intervalo, inicio)
+
+
+def test_consultas_nao_esperam_a_leitura_da_planilha(backend_sheets, planilha):
+    backend_sheets.sincronizar()
+    banco, ler = backend_sheets.banco, leitura_da_planilha(planilha)
+    lendo, liberar = threading.Event(), threading.Event()
+
+    def ler_devagar(intervalo, inicio):
+        lendo.set()
+        liberar.wait(5)
+        return ler(intervalo, inicio)
+
+    sincronizacao = threading.Thread(target=banco.sincronizar, args=(ler_devagar,))
+    sincronizacao.start()
+    try:
+        assert lendo.wait(5)
+        inicio = time.perf_counter()
+        assert not banco.medias().empty and not banco.dataframe().empty
+        assert banco.situacao_exclusoes() == {"avaliacoes": 0, "linhas": 0}
+        assert time.perf_counter() - inicio < 1 and sincronizacao.is_alive()
+    finally:
+        liberar.set()
+        sincronizacao.join()
+
+
+def test_base_alterada_durante_a_leitura_e_lida_de_novo(backend_sheets, planilha, votos):
+    backend_sheets.sincronizar()
+    banco, ler = backend_sheets.banco, leitura_da_planilha(planilha)
+    excluidos = ids_excluidos(votos)
+    restantes = votos[~votos["id_avaliacao"].isin(excluidos)].astype(str)
+    chamadas = []
+
+    def ler_com_compactacao_no_meio(intervalo, inicio):
+        lido = ler(intervalo, inicio)
+        if not chamadas:
+            # Outro processo compacta a planilha enquanto esta leitura estava na rede
+            planilha.get_worksheet(0).valores = [COLUNAS_VOTOS] + restantes.values.tolist()
+            banco.aplicar_exclusoes(excluidos)
+            banco.compactar()
+        chamadas.append(intervalo)
+        return lido
+
+    assert banco.sincronizar(ler_com_compactacao_no_meio) == "incremental"
+    assert len(chamadas) == 2
+    assert banco.linhas_lidas == len(restantes)
+    pd.testing.assert_frame_equal(banco.dataframe(), restantes.reset_index(drop=True))
+    conferir_agregados(banco, restantes)
+
+
+# --- LÁPIDES E COMPACTAÇÃO ---
+def ids_excluidos(votos, quantidade=5):
+    return votos["id_avaliacao"].drop_duplicates().iloc[::3].head(quantidade).tolist()
+
+
+def test_lapides_e_compactacao_no_sqlite(votos):
+    backend = BackendSQLite(CacheVotos(":memory:"), limiar_compactacao=SEM_COMPACTACAO_AUTOMATICA)
+    backend.acrescentar(votos)
+    excluidos = ids_excluidos(votos)
+    ativos = votos[~votos["id_avaliacao"].isin(excluidos)].astype(str).reset_index(drop=True)
+
+    backend.excluir_avaliacoes(pd.to_datetime(excluidos).tolist())
+    assert backend.banco.situacao_exclusoes() == {"avaliacoes": len(excluidos), "linhas": len(excluidos) * PERGUNTAS_POR_AVALIACAO}
+    pd.testing.assert_frame_equal(backend.votos(), ativos)
+    conferir_agregados(backend.banco, ativos)
+
+    backend.compactar()
+    assert backend.banco.situacao_exclusoes() == {"avaliacoes": 0, "linhas": 0}
+    assert backend.banco.linhas_lidas == len(ativos)
+    pd.testing.assert_frame_equal(backend.votos(), ativos)
+    conferir_agregados(backend.banco, ativos)
+
+
+def test_lapides_e_compactacao_no_google_sheets(backend_sheets, planilha, votos, tmp_path):
+    backend_sheets.sincronizar()
+    excluidos = ids_excluidos(votos)
+    ativos = votos[~votos["id_avaliacao"].isin(excluidos)].astype(str).reset_index(drop=True)
+
+    backend_sheets.excluir_avaliacoes(pd.to_datetime(excluidos).tolist())
+    pd.testing.assert_frame_equal(backend_sheets.votos(), ativos)
+    conferir_agregados(backend_sheets.banco, ativos)
+
+    backend_sheets.compactar()
+    conferir_agregados(backend_sheets.banco, ativos)
+    # A planilha foi regravada só com os votos ativos: outro processo, partindo do zero, lê o mesmo
+    outro = BackendGoogleSheets(planilha, CacheVotos(":memory:"), caminho_indice_projetos=str(tmp_path / "outro.json"))
+    assert outro.sincronizar() == "completa"
+    pd.testing.assert_frame_equal(outro.votos(), ativos)
+    conferir_agregados(outro.banco, ativos)
+    # Depois da compactação a leitura incremental continua alinhada com a aba
+    assert backend_sheets.sincronizar() == "incremental"
+    assert backend_sheets.banco.linhas_lidas == len(ativos)
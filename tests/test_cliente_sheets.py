@@ -0,0 +1,150 @@
+"""ClienteHTTP e CotaPorMinuto: cota por minuto e novas tentativas com jitter depois de 429 e 5xx."""
+import json
+import random
+
+import pytest
+import requests
+from gspread.exceptions import APIError
+
+from cliente_sheets import ClienteHTTP, CotaPorMinuto
+
+URL = "https://sheets.googleapis.com/v4/spreadsheets/planilha"
+
+
+class SessaoRoteirizada(requests.Session):
+    """Responde, em ordem, os status (ou exceções) do roteiro; depois dele, sempre 200."""
+
+    def __init__(self, roteiro):
+        super().__init__()
+        self.roteiro = list(roteiro)
+        self.chamadas = 0
+
+    def request(self, method, url, **kwargs):
+        self.chamadas += 1
+        passo = self.roteiro.pop(0) if self.roteiro else 200
+        if isinstance(passo, Exception):
+            raise passo
+        status, cabecalhos, motivo = passo if isinstance(passo, tuple) else (passo, {}, None)
+        resposta = requests.Response()
+        resposta.status_code = status
+        erro = {"code": status, "message": "falha", "status": "ERRO"}
+        if motivo:
+            erro["errors"] = [{"reason": motivo}]
+        resposta._content = json.dumps({} if status == 200 else {"error": erro}).encode("utf-8")
+        resposta.headers.update(cabecalhos)
+        resposta.url = url
+        return resposta
+
+
+def cliente(roteiro, **opcoes):
+    esperas = []
+    sessao = SessaoRoteirizada(roteiro)
+    opcoes = {"espera_inicial": 1.0, "espera_maxima": 64.0, **opcoes}
+    return ClienteHTTP(None, session=sessao, dormir=esperas.append, **opcoes), sessao, esperas
+
+
+@pytest.mark.parametrize("falha", [429, 500, 502, 503, 504, 408, requests.ConnectionError("caiu"), requests.Timeout("demorou")])
+def test_leitura_e_repetida_depois_de_falha_temporaria(falha):
+    http, sessao, esperas = cliente([falha])
+
+    assert http.request("get", URL).status_code == 200
+    assert sessao.chamadas == 2
+    assert len(esperas) == 1
+    assert http.contadores["leitura"]["novas_tentativas"] == 1
+
+
+def test_leitura_com_erro_definitivo_nao_e_repetida():
+    http, sessao, esperas = cliente([400])
+
+    with pytest.raises(APIError):
+        http.request("get", URL)
+    assert sessao.chamadas == 1 and esperas == []
+
+
+@pytest.mark.parametrize("recusa", [429, (403, {}, "rateLimitExceeded"), (403, {}, "userRateLimitExceeded")])
+def test_escrita_recusada_pela_cota_e_repetida(recusa):
+    http, sessao, _ = cliente([recusa])
+
+    assert http.request("post", URL + ":batchUpdate").status_code == 200
+    assert sessao.chamadas == 2
+
+
+@pytest.mark.parametrize("falha", [500, 503, (403, {}, "forbidden"), requests.ConnectionError("caiu"), requests.Timeout("demorou")])
+def test_escrita_que_pode_ter_sido_aplicada_nao_e_repetida(falha):
+    http, sessao, esperas = cliente([falha])
+
+    with pytest.raises((APIError, requests.ConnectionError, requests.Timeout)):
+        http.request("post", URL + "/values/Votos:append")
+    assert sessao.chamadas == 1 and esperas == []
+
+
+def test_esperas_exponenciais_com_jitter():
+    random.seed(3)
+    http, sessao, esperas = cliente([503] * 5, tentativas=6, espera_maxima=8.0)
+
+    http.request("get", URL)
+    tetos = [min(8.0, 1.0 * 2 ** tentativa) for tentativa in range(5)]
+    assert all(0 <= espera <= teto for espera, teto in zip(esperas, tetos))
+    # Jitter: as esperas não são o próprio teto (nem iguais entre si)
+    assert esperas != tetos and len(set(esperas)) == len(esperas)
+    assert http.contadores["leitura"]["erros"] == 5
+
+
+def test_retry_after_e_a_espera_minima():
+    http, _, esperas = cliente([(429, {"Retry-After": "7"}, None)], espera_inicial=0.1)
+
+    http.request("get", URL)
+    assert esperas[0] >= 7
+
+
+def test_desiste_depois_das_tentativas():
+    http, sessao, esperas = cliente([503] * 10, tentativas=3)
+
+    with pytest.raises(APIError):
+        http.request("get", URL)
+    assert sessao.chamadas == 3 and len(esperas) == 2
+
+
+def test_contadores_de_429():
+    http, _, _ = cliente([429, 429])
+
+    http.request("get", URL)
+    (leitura,) = [linha for linha in http.situacao() if linha["tipo"] == "leitura"]
+    assert leitura["chamadas"] == 3 and leitura["respostas 429"] == 2 and leitura["novas tentativas"] == 2
+
+
+# --- COTA POR MINUTO ---
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+        self.esperas = []
+
+    def __call__(self):
+        return self.agora
+
+    def dormir(self, segundos):
+        self.esperas.append(segundos)
+        self.agora += segundos
+
+
+def test_cota_espera_a_vaga_mais_antiga_liberar():
+    relogio = Relogio()
+    cota = CotaPorMinuto(2, janela=60, relogio=relogio, dormir=relogio.dormir)
+
+    assert cota.reservar() == 0
+    relogio.agora = 10
+    assert cota.reservar() == 0
+    relogio.agora = 15
+    # Terceira chamada na janela: espera até a primeira sair dela (t = 60)
+    assert cota.reservar() == pytest.approx(45)
+    assert cota.em_uso() == 2
+
+
+def test_cota_janela_deslizante_sem_espera():
+    relogio = Relogio()
+    cota = CotaPorMinuto(2, janela=60, relogio=relogio, dormir=relogio.dormir)
+
+    for momento in (0, 30, 61, 91, 122):
+        relogio.agora = momento
+        assert cota.reservar() == 0
+    assert relogio.esperas == []
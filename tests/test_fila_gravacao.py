@@ -0,0 +1,87 @@
+"""FilaGravacao: reenvio idempotente das avaliações pendentes."""
+import time
+
+import pytest
+
+from backends import BackendSQLite
+from benchmarks.gerador import gerar_votos
+from cache_votos import CacheVotos
+from fila_gravacao import FilaGravacao, contar_pendentes
+
+PERGUNTAS_POR_AVALIACAO = 16
+
+
+class BackendComFalhas(BackendSQLite):
+    """Grava no SQLite, mas as primeiras `falhas` gravações levantam erro depois de gravar (resposta perdida)."""
+
+    def __init__(self, falhas=0):
+        super().__init__(CacheVotos(":memory:"))
+        self.falhas = falhas
+        self.gravacoes = 0
+
+    def acrescentar(self, df_novos_votos):
+        self.gravacoes += 1
+        gravadas = super().acrescentar(df_novos_votos)
+        if self.falhas:
+            self.falhas -= 1
+            raise ConnectionError("conexão perdida antes da resposta")
+        return gravadas
+
+
+class BackendForaDoAr(BackendSQLite):
+    def __init__(self):
+        super().__init__(CacheVotos(":memory:"))
+
+    def sincronizar(self):
+        raise ConnectionError("sem rede")
+
+
+def esperar_fila_vazia(caminho, limite=10):
+    fim = time.monotonic() + limite
+    while contar_pendentes(caminho) and time.monotonic() < fim:
+        time.sleep(0.02)
+    assert contar_pendentes(caminho) == 0
+
+
+def avaliacao(semente):
+    return gerar_votos(PERGUNTAS_POR_AVALIACAO, semente=semente)
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    return str(tmp_path / "fila.sqlite")
+
+
+def test_enfileirar_o_mesmo_id_duas_vezes(caminho):
+    fila = FilaGravacao(BackendForaDoAr(), caminho, espera_inicial=60)
+    votos = avaliacao(1)
+    assert fila.enfileirar(votos) is True
+    assert fila.enfileirar(votos) is False
+    assert contar_pendentes(caminho) == 1
+
+
+def test_gravacao_com_resposta_perdida_nao_duplica(caminho):
+    backend = BackendComFalhas(falhas=1)
+    fila = FilaGravacao(backend, caminho, espera_inicial=0.01)
+    fila.enfileirar(avaliacao(1))
+    esperar_fila_vazia(caminho)
+
+    # A nova tentativa encontra a avaliação já gravada e só a tira da fila
+    assert backend.gravacoes == 1
+    assert backend.banco.linhas_lidas == PERGUNTAS_POR_AVALIACAO
+
+
+def test_reenvio_depois_de_reiniciar_nao_duplica(caminho):
+    ja_gravada, pendente = avaliacao(1), avaliacao(2)
+    FilaGravacao(BackendForaDoAr(), caminho, espera_inicial=60).enfileirar(ja_gravada)
+    FilaGravacao(BackendForaDoAr(), caminho, espera_inicial=60).enfileirar(pendente)
+    assert contar_pendentes(caminho) == 2
+
+    # O processo anterior chegou a gravar a primeira antes de cair
+    backend = BackendComFalhas()
+    backend.acrescentar(ja_gravada)
+    FilaGravacao(backend, caminho)
+    esperar_fila_vazia(caminho)
+
+    assert backend.banco.linhas_lidas == 2 * PERGUNTAS_POR_AVALIACAO
+    assert backend.votos()["id_avaliacao"].nunique() == 2
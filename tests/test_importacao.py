@@ -0,0 +1,126 @@
+"""validar_arquivo: regras de rejeição da importação em lote."""
+import io
+
+import pandas as pd
+import pytest
+
+from armazenamento import COLUNAS_VOTOS
+from benchmarks.gerador import gerar_votos
+from cache_votos import CacheVotos
+from importacao import lotes_de_avaliacoes, validar_arquivo
+
+PERGUNTAS_POR_AVALIACAO = 16
+N_AVALIACOES = 6
+
+
+def como_csv(votos, colunas=COLUNAS_VOTOS):
+    return io.BytesIO(votos[colunas].to_csv(index=False).encode("utf-8"))
+
+
+def linhas_da_avaliacao(indice):
+    """Linhas, no arquivo, da avaliação `indice` (a linha 1 é o cabeçalho)."""
+    primeira = 2 + indice * PERGUNTAS_POR_AVALIACAO
+    return list(range(primeira, primeira + PERGUNTAS_POR_AVALIACAO))
+
+
+@pytest.fixture
+def votos():
+    return gerar_votos(PERGUNTAS_POR_AVALIACAO * N_AVALIACOES, semente=11).reset_index(drop=True)
+
+
+def test_arquivo_valido_e_aceito_inteiro(votos):
+    resultado = validar_arquivo(como_csv(votos), "avaliacoes.csv")
+    assert resultado["linhas"] == len(votos)
+    assert resultado["avaliacoes"] == N_AVALIACOES
+    assert resultado["rejeitadas"].empty
+    assert resultado["votos"]["id_avaliacao"].nunique() == N_AVALIACOES
+
+
+def alterar_celula(coluna, valor):
+    def alterar(votos):
+        votos.loc[0, coluna] = valor
+    return alterar
+
+
+def repetir_pergunta(votos):
+    votos.loc[1, ["categoria", "pergunta_id"]] = votos.loc[0, ["categoria", "pergunta_id"]].values
+
+
+def remover_pergunta(votos):
+    votos.drop(index=PERGUNTAS_POR_AVALIACAO - 1, inplace=True)
+
+
+COM_OUTRAS_REJEITADAS = "avaliação com outras linhas rejeitadas"
+
+
+@pytest.mark.parametrize("alterar, motivo_da_linha, motivo_das_demais", [
+    # Sem id válido a linha não se liga à avaliação; as outras 15 ficam incompletas
+    (alterar_celula("id_avaliacao", "ontem"), "id_avaliacao não é uma data válida", "avaliação sem todas as perguntas do formulário"),
+    (alterar_celula("user_name", " "), "user_name vazio", COM_OUTRAS_REJEITADAS),
+    (alterar_celula("projeto", ""), "projeto vazio", COM_OUTRAS_REJEITADAS),
+    (alterar_celula("ano_avaliacao", "1999"), "ano_avaliacao fora de ANOS_AVALIACAO", COM_OUTRAS_REJEITADAS),
+    (alterar_celula("empresa", "FORNECEDOR DESCONHECIDO"), "empresa fora de EMPRESAS", COM_OUTRAS_REJEITADAS),
+    (alterar_celula("pergunta_id", "pergunta_inexistente"), "categoria/pergunta_id fora de PERGUNTAS", COM_OUTRAS_REJEITADAS),
+    (alterar_celula("voto", "7"), "voto fora de OPCOES_VOTO", COM_OUTRAS_REJEITADAS),
+])
+def test_linha_invalida_recusa_a_avaliacao_inteira(votos, alterar, motivo_da_linha, motivo_das_demais):
+    alterar(votos)
+    resultado = validar_arquivo(como_csv(votos), "avaliacoes.csv")
+
+    rejeitadas = resultado["rejeitadas"].set_index("linha")["motivo"]
+    assert rejeitadas[2] == motivo_da_linha
+    assert (rejeitadas[linhas_da_avaliacao(0)[1:]] == motivo_das_demais).all()
+    assert sorted(rejeitadas.index) == linhas_da_avaliacao(0)
+    assert resultado["avaliacoes"] == N_AVALIACOES - 1
+
+
+@pytest.mark.parametrize("alterar, motivo", [
+    (repetir_pergunta, "pergunta repetida na avaliação"),
+    (remover_pergunta, "avaliação sem todas as perguntas do formulário"),
+])
+def test_avaliacao_mal_formada_e_recusada(votos, alterar, motivo):
+    alterar(votos)
+    resultado = validar_arquivo(como_csv(votos), "avaliacoes.csv")
+
+    assert set(resultado["rejeitadas"]["motivo"]) == {motivo}
+    assert set(resultado["rejeitadas"]["id_avaliacao"]) == {votos.loc[0, "id_avaliacao"]}
+    assert resultado["avaliacoes"] == N_AVALIACOES - 1
+
+
+def test_id_compartilhado_por_avaliacoes_diferentes_e_recusado(votos):
+    segunda = votos.index.isin(range(PERGUNTAS_POR_AVALIACAO, 2 * PERGUNTAS_POR_AVALIACAO))
+    votos.loc[segunda, "id_avaliacao"] = votos.loc[0, "id_avaliacao"]
+    votos.loc[segunda, "projeto"] = "LCP-9999 - OUTRO PROJETO"
+    resultado = validar_arquivo(como_csv(votos), "avaliacoes.csv")
+
+    assert set(resultado["rejeitadas"]["motivo"]) == {"id_avaliacao repetido em avaliações diferentes"}
+    assert sorted(resultado["rejeitadas"]["linha"]) == linhas_da_avaliacao(0) + linhas_da_avaliacao(1)
+    assert resultado["avaliacoes"] == N_AVALIACOES - 2
+
+
+def test_avaliacao_ja_registrada_e_recusada(votos):
+    banco = CacheVotos(":memory:")
+    banco.acrescentar_linhas(votos.head(PERGUNTAS_POR_AVALIACAO)[COLUNAS_VOTOS].values.tolist())
+    resultado = validar_arquivo(como_csv(votos), "avaliacoes.csv", banco.avaliacoes_gravadas)
+
+    assert set(resultado["rejeitadas"]["motivo"]) == {"avaliação já registrada"}
+    assert sorted(resultado["rejeitadas"]["linha"]) == linhas_da_avaliacao(0)
+    assert resultado["avaliacoes"] == N_AVALIACOES - 1
+
+
+def test_cabecalho_sem_coluna_obrigatoria(votos):
+    with pytest.raises(ValueError, match="empresa"):
+        validar_arquivo(como_csv(votos, [col for col in COLUNAS_VOTOS if col != "empresa"]), "avaliacoes.csv")
+
+
+def test_formato_desconhecido(votos):
+    with pytest.raises(ValueError, match="Formato de importação desconhecido"):
+        validar_arquivo(como_csv(votos), "avaliacoes.txt")
+
+
+def test_lotes_de_avaliacoes_nao_dividem_avaliacoes(votos):
+    aceitos = validar_arquivo(como_csv(votos), "avaliacoes.csv")["votos"]
+    lotes = list(lotes_de_avaliacoes(aceitos, tamanho_lote=PERGUNTAS_POR_AVALIACAO * 4))
+
+    assert [len(lote) for lote in lotes] == [PERGUNTAS_POR_AVALIACAO * 4, PERGUNTAS_POR_AVALIACAO * 2]
+    pd.testing.assert_frame_equal(pd.concat(lotes), aceitos)
@@ -0,0 +1,83 @@
+"""carregar_indice_projetos: lista de projetos lida só das abas de projetos, com índice local."""
+import os
+
+import gspread
+import pytest
+
+from armazenamento import ABAS_PROJETOS, COLUNAS_VOTOS, carregar_indice_projetos
+from benchmarks.gerador import gerar_votos
+from benchmarks.planilha_falsa import planilha_com_votos
+
+PROJETOS = ("LCP-2 - PONTE", "LCP-1 - TORRE", "OUTRO-3 - FORA DO LCP")
+
+
+class PlanilhaRegistrada:
+    """Repassa as leituras para a planilha em memória, guardando os intervalos pedidos."""
+
+    def __init__(self, planilha):
+        self.planilha = planilha
+        self.intervalos = []
+
+    def values_batch_get(self, intervalos, params=None):
+        self.intervalos.extend(intervalos)
+        return self.planilha.values_batch_get(intervalos, params)
+
+
+@pytest.fixture
+def planilha():
+    return planilha_com_votos(gerar_votos(32, semente=3), projetos=PROJETOS)
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    return str(tmp_path / "projetos.json")
+
+
+def abas_lidas(intervalos):
+    return {intervalo.partition("!")[0].strip("'") for intervalo in intervalos}
+
+
+def test_le_so_as_colunas_das_abas_de_projetos(planilha, caminho):
+    registrada = PlanilhaRegistrada(planilha)
+
+    assert carregar_indice_projetos(registrada, caminho) == ["LCP-1 - TORRE", "LCP-2 - PONTE"]
+    assert abas_lidas(registrada.intervalos) == set(ABAS_PROJETOS)
+    # Cabeçalho (linha 4) e depois só as colunas WBS e PROJECT NAME de cada aba
+    assert sorted(registrada.intervalos) == sorted(
+        [f"'{aba}'!4:4" for aba in ABAS_PROJETOS] + [f"'{aba}'!{col}4:{col}" for aba in ABAS_PROJETOS for col in "BC"]
+    )
+
+
+def test_votos_novos_nao_invalidam_o_indice(planilha, caminho):
+    carregar_indice_projetos(planilha, caminho)
+    gravado = os.stat(caminho).st_mtime_ns
+    planilha.get_worksheet(0).valores.extend(gerar_votos(16, semente=4)[COLUNAS_VOTOS].values.tolist())
+
+    registrada = PlanilhaRegistrada(planilha)
+    assert carregar_indice_projetos(registrada, caminho) == ["LCP-1 - TORRE", "LCP-2 - PONTE"]
+    # Posições já conhecidas: uma leitura só das colunas, e o índice não é regravado
+    assert len(registrada.intervalos) == 2 * len(ABAS_PROJETOS)
+    assert os.stat(caminho).st_mtime_ns == gravado
+
+
+def test_projeto_alterado_atualiza_a_lista(planilha, caminho):
+    carregar_indice_projetos(planilha, caminho)
+    planilha.worksheet("Capex").valores[4][2] = "PONTE NOVA"  # primeiro projeto, logo abaixo do cabeçalho
+
+    assert carregar_indice_projetos(planilha, caminho) == ["LCP-1 - TORRE", "LCP-2 - PONTE", "LCP-2 - PONTE NOVA"]
+
+
+def test_coluna_movida_e_localizada_de_novo(planilha, caminho):
+    carregar_indice_projetos(planilha, caminho)
+    for aba in ABAS_PROJETOS:
+        for linha in planilha.worksheet(aba).valores:
+            linha.insert(0, "")
+
+    assert carregar_indice_projetos(planilha, caminho) == ["LCP-1 - TORRE", "LCP-2 - PONTE"]
+
+
+def test_aba_de_projetos_ausente(planilha, caminho):
+    planilha.abas = [aba for aba in planilha.abas if aba.title != ABAS_PROJETOS[0]]
+
+    with pytest.raises(gspread.exceptions.WorksheetNotFound):
+        carregar_indice_projetos(planilha, caminho)
@@ -0,0 +1,46 @@
+"""relatorios_fornecedores: tarefas e ranking de um ano a partir da base local."""
+import pytest
+
+from armazenamento import COLUNAS_VOTOS
+from benchmarks.gerador import gerar_votos
+from cache_votos import CacheVotos
+from relatorios_fornecedores import gerar_relatorio, gravar_indice, tarefas_do_ano
+
+PERGUNTAS_POR_AVALIACAO = 16
+
+
+@pytest.fixture
+def base(tmp_path):
+    votos = gerar_votos(PERGUNTAS_POR_AVALIACAO * 300, semente=5)
+    caminho = str(tmp_path / "votos.sqlite")
+    CacheVotos(caminho).acrescentar_linhas(votos[COLUNAS_VOTOS].values.tolist())
+    return caminho, votos
+
+
+def test_ranking_e_medias_do_ano(base, tmp_path):
+    caminho, votos = base
+    ano = 2024  # o --ano da linha de comando chega como int
+    do_ano = votos[votos["ano_avaliacao"] == str(ano)]
+
+    tarefas, ranking = tarefas_do_ano(caminho, ano, str(tmp_path))
+
+    assert set(ranking["empresa"]) == set(do_ano["empresa"])
+    avaliadas = [tarefa for tarefa in tarefas if not tarefa[2].empty]
+    assert {tarefa[0] for tarefa in avaliadas} == set(do_ano["empresa"])
+    for empresa, _, votos_empresa, medias, posicao, _ in avaliadas:
+        assert not medias.empty and set(medias["empresa"]) == {empresa}
+        assert posicao is not None and posicao["total"] == len(ranking)
+        assert votos_empresa["id_avaliacao"].nunique() == do_ano.loc[do_ano["empresa"] == empresa, "id_avaliacao"].nunique()
+
+
+def test_relatorio_e_indice_com_dados(base, tmp_path):
+    caminho, _ = base
+    tarefas, ranking = tarefas_do_ano(caminho, 2024, str(tmp_path))
+
+    gravar_indice(str(tmp_path), 2024, ranking)
+    indice = (tmp_path / "index.html").read_text(encoding="utf-8")
+    assert indice.count("<tr>") == len(ranking) + 1
+
+    avaliada = next(tarefa for tarefa in tarefas if tarefa[4] is not None)
+    relatorio = open(gerar_relatorio(avaliada), encoding="utf-8").read()
+    assert "Média geral" in relatorio and "Posição no ranking" in relatorio and "Médias por categoria" in relatorio